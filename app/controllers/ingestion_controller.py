@@ -3,6 +3,9 @@ import logging
 from typing import List, Optional
 from app.services.coinglass_service import CoinglassService
 from app.services.cryptoquant_service import CryptoQuantService
+from app.services.freshness_runner import FreshnessRunner
+from app.services.scheduler import CadenceScheduler
+from app.services.worker import PipelineWorker, parse_pipeline_spec
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +37,35 @@ class IngestionController:
             if "service" in locals():
                 service.close()
 
+    def run_scheduler(self, pipelines: Optional[List[str]] = None):
+        """Run Coinglass pipelines on their candle cadence until interrupted."""
+        try:
+            service = CoinglassService(ensure_tables=False)
+            CadenceScheduler(service, pipelines=pipelines).run_forever()
+            return {"status": "stopped"}
+        except KeyboardInterrupt:
+            self.logger.info("Cadence scheduler stopped")
+            return {"status": "stopped"}
+        except Exception as e:
+            self.logger.error(f"Cadence scheduler failed: {e}", exc_info=True)
+            return {"error": str(e)}
+        finally:
+            if "service" in locals():
+                service.close()
+
+    def run_worker(self, pipelines: Optional[List[str]] = None, delay: float = 10.0, schedule: bool = False):
+        """Host pipelines in this process, reusing one service across cycles, until stopped."""
+        try:
+            spec = parse_pipeline_spec(pipelines or [], default_delay=delay)
+            PipelineWorker(spec, default_delay=delay, schedule=schedule).run_forever()
+            return {"status": "stopped"}
+        except KeyboardInterrupt:
+            self.logger.info("Worker stopped")
+            return {"status": "stopped"}
+        except Exception as e:
+            self.logger.error(f"Worker failed: {e}", exc_info=True)
+            return {"error": str(e)}
+
     def run_initial_scrape(self, months: int = 1):
         """Run initial historical data scrape."""
         try:
@@ -58,11 +90,23 @@ class IngestionController:
             if "service" in locals():
                 service.close()
 
-    def check_freshness(self):
-        """Check data freshness for all pipelines."""
+    def compact_fear_greed(self):
+        """Collapse duplicate fear & greed snapshots."""
         try:
             service = CoinglassService(ensure_tables=False)
-            return service.check_and_log_freshness()
+            return service.compact_fear_greed_index()
+        except Exception as e:
+            self.logger.error(f"Fear & greed compaction failed: {e}", exc_info=True)
+            return {"error": str(e)}
+        finally:
+            if "service" in locals():
+                service.close()
+
+    def check_freshness(self, use_cache: bool = True):
+        """Check data freshness for all pipelines (latest background snapshot when recent)."""
+        try:
+            service = CoinglassService(ensure_tables=False)
+            return service.check_and_log_freshness(use_cache=use_cache)
         except Exception as e:
             self.logger.error(f"Freshness check failed: {e}", exc_info=True)
             return {"error": str(e)}
@@ -70,6 +114,15 @@ class IngestionController:
             if "service" in locals():
                 service.close()
 
+    def run_freshness_loop(self):
+        """Run the freshness sweep on its own cadence until stopped."""
+        try:
+            FreshnessRunner().run_forever()
+            return {"status": "stopped"}
+        except Exception as e:
+            self.logger.error(f"Freshness monitor failed: {e}", exc_info=True)
+            return {"error": str(e)}
+
     def run_cryptoquant(self, pipelines: Optional[List[str]] = None):
         """Run CryptoQuant pipelines."""
         try:
@@ -27,6 +27,18 @@ class Settings:
         "NAME": os.getenv("DB_NAME"),
     }
 
+    # Rows per multi-row INSERT ... ON DUPLICATE KEY UPDATE statement
+    DB_BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", "500"))
+
+    # Connection pool (get_connection() borrows from it)
+    DB_POOL_ENABLED = os.getenv("DB_POOL_ENABLED", "true").lower() in ("1", "true", "yes")
+    DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    # Connections kept open (opened at startup); ones beyond it are closed after this many idle seconds
+    DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+    # Seconds to wait for a free connection when the pool is exhausted
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
     @property
     def DB_SQLALCHEMY_URL(self) -> str:
         pwd = self.DB["PASSWORD"]
@@ -38,6 +50,83 @@ class Settings:
 
     # ---------- Coinglass ----------
     COINGLASS_API_KEY = os.getenv("COINGLASS_API_KEY")
+    # Max in-flight requests for the async client
+    COINGLASS_MAX_CONCURRENCY = int(os.getenv("COINGLASS_MAX_CONCURRENCY", "10"))
+    # Candles re-requested behind each series' last stored time (incremental fetching)
+    WATERMARK_OVERLAP_BARS = int(os.getenv("WATERMARK_OVERLAP_BARS", "2"))
+
+    # Pipelines run_selected_pipelines runs at once, each on its own pooled connection (1 = sequential)
+    PIPELINE_MAX_PARALLEL = int(os.getenv("PIPELINE_MAX_PARALLEL", "4"))
+    # Pipelines still running after this many seconds are reported as failed, and ones that cannot
+    # start within this many seconds per round of PIPELINE_MAX_PARALLEL are cancelled (0 = no limit)
+    PIPELINE_TIMEOUT_SECONDS = float(os.getenv("PIPELINE_TIMEOUT_SECONDS", "900"))
+    # Concurrent API fetches inside one pipeline (exchange x symbol x interval grid; 1 = serial)
+    PIPELINE_FANOUT_WORKERS = int(os.getenv("PIPELINE_FANOUT_WORKERS", "5"))
+    # Fetched batches buffered ahead of the DB writer; fetchers block when it is full
+    PIPELINE_STAGE_QUEUE_SIZE = int(os.getenv("PIPELINE_STAGE_QUEUE_SIZE", "10"))
+    # Most fetched batches the writer coalesces into one bulk write and commit
+    PIPELINE_STAGE_MAX_BATCH = int(os.getenv("PIPELINE_STAGE_MAX_BATCH", "20"))
+
+    # Liquidation heatmaps: write only the child rows that changed since the last fetch
+    # (false = delete and reinsert every child set; needs migrate_tables.py on older databases)
+    HEATMAP_DIFF_REFRESH = os.getenv("HEATMAP_DIFF_REFRESH", "true").lower() in ("1", "true", "yes")
+    # Where heatmap matrices go: rows (child tables), blob (compressed snapshots in
+    # cg_liquidation_heatmap_matrix, one per changed fetch) or both
+    HEATMAP_STORAGE_MODE = os.getenv("HEATMAP_STORAGE_MODE", "rows").lower()
+    # Keep every changed heatmap / option OI snapshot in cg_snapshot_history (delta-encoded)
+    SNAPSHOT_HISTORY_ENABLED = os.getenv("SNAPSHOT_HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+    # Versions per keyframe; bounds how many deltas a historical read replays
+    SNAPSHOT_KEYFRAME_INTERVAL = int(os.getenv("SNAPSHOT_KEYFRAME_INTERVAL", "24"))
+
+    # ---------- Historical backfill (--historical) ----------
+    # (pipeline, series, window) work items run at once, each on its own pooled connection
+    BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "8"))
+    # Days of history per work item
+    BACKFILL_WINDOW_DAYS = int(os.getenv("BACKFILL_WINDOW_DAYS", "30"))
+    # Consecutive empty windows after which a series' older windows are skipped (0 = never)
+    BACKFILL_PRUNE_AFTER_EMPTY = int(os.getenv("BACKFILL_PRUNE_AFTER_EMPTY", "2"))
+    # Seconds between progress lines
+    BACKFILL_PROGRESS_SECONDS = float(os.getenv("BACKFILL_PROGRESS_SECONDS", "30"))
+
+    # ---------- Freshness monitoring ----------
+    # Streams checked at once, each on its own pooled read connection (1 = sequential)
+    FRESHNESS_MAX_PARALLEL = int(os.getenv("FRESHNESS_MAX_PARALLEL", "4"))
+    # Streams whose check runs longer than this many seconds are reported as errors, and ones that cannot
+    # start within this many seconds per round of FRESHNESS_MAX_PARALLEL are cancelled (0 = no limit)
+    FRESHNESS_STREAM_TIMEOUT_SECONDS = float(os.getenv("FRESHNESS_STREAM_TIMEOUT_SECONDS", "30"))
+    # Cadence of the background freshness sweep (--freshness-loop, continuous mode, worker)
+    FRESHNESS_INTERVAL_SECONDS = float(os.getenv("FRESHNESS_INTERVAL_SECONDS", "300"))
+    # Latest sweep published as JSON; --freshness reads it while it is younger than the max age
+    FRESHNESS_CACHE_PATH = os.getenv("FRESHNESS_CACHE_PATH", str(ROOT_DIR / "data" / "freshness.json"))
+    FRESHNESS_CACHE_MAX_AGE_SECONDS = float(os.getenv("FRESHNESS_CACHE_MAX_AGE_SECONDS", "900"))
+    # Run the freshness sweep as a thread inside --worker (one worker per deployment should)
+    FRESHNESS_IN_WORKER = os.getenv("FRESHNESS_IN_WORKER", "false").lower() in ("1", "true", "yes")
+
+    # ---------- Cadence scheduler (--schedule) ----------
+    # Seconds after a candle closes before it is fetched
+    SCHEDULER_SETTLE_SECONDS = float(os.getenv("SCHEDULER_SETTLE_SECONDS", "15"))
+    # Cadence for pipelines without candle intervals (ETF lists, sentiment, heatmaps...)
+    SCHEDULER_DEFAULT_SECONDS = float(os.getenv("SCHEDULER_DEFAULT_SECONDS", "60"))
+
+    # ---------- Coinglass rate limit ----------
+    # Subscription plan (hobbyist/startup/standard/professional/enterprise) sets the budget
+    COINGLASS_PLAN = os.getenv("COINGLASS_PLAN", "standard")
+    # Explicit requests/minute, overrides the plan budget
+    COINGLASS_RATE_LIMIT = float(os.getenv("COINGLASS_RATE_LIMIT", "0"))
+    # Per-endpoint token cost, e.g. "futures/liquidation/aggregated-heatmap/model3=5"
+    COINGLASS_ENDPOINT_WEIGHTS = os.getenv("COINGLASS_ENDPOINT_WEIGHTS", "")
+    COINGLASS_RATE_LIMIT_ENABLED = os.getenv("COINGLASS_RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+    # SQLite file holding the shared bucket; mount the same volume in every container
+    RATE_LIMIT_DB_PATH = os.getenv("RATE_LIMIT_DB_PATH", str(ROOT_DIR / "data" / "rate_limit.sqlite3"))
+
+    # ---------- HTTP (shared by all API clients) ----------
+    # Pooled connections kept per host
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+    HTTP_KEEPALIVE = os.getenv("HTTP_KEEPALIVE", "true").lower() in ("1", "true", "yes")
+    # Idle seconds before a pooled connection is dropped (async client)
+    HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+    # Ask for gzip/deflate responses
+    HTTP_COMPRESSION = os.getenv("HTTP_COMPRESSION", "true").lower() in ("1", "true", "yes")
 
     # ---------- CryptoQuant ----------
     CRYPTOQUANT_API_KEY = os.getenv("CRYPTOQUANT_API_KEY")
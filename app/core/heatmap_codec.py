@@ -0,0 +1,135 @@
+# app/core/heatmap_codec.py
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+# Column layout of each blob: (name, array typecode, index in the (sequence_order, *values) row).
+# 8-byte columns come first so every column of a decompressed buffer stays 8-byte aligned.
+Y_AXIS_COLUMNS = (("price_level", "d", 1),)
+LEVERAGE_COLUMNS = (("liquidation_amount", "d", 3), ("x_position", "i", 1), ("y_position", "i", 2))
+CANDLE_COLUMNS = (
+    ("timestamp", "q", 1),
+    ("open_price", "d", 2),
+    ("high_price", "d", 3),
+    ("low_price", "d", 4),
+    ("close_price", "d", 5),
+    ("volume", "d", 6),
+)
+
+# Stand-ins for NULLs: NaN in float columns, -1 in integer columns
+_NULL = {"d": float("nan"), "i": -1, "q": -1}
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def pack_columns(rows: Sequence[Tuple], columns: Sequence[Tuple[str, str, int]], level: int = 6) -> bytes:
+    """Pack rows into one zlib-compressed buffer of little-endian columns, one after another."""
+    parts = []
+    for _, typecode, idx in columns:
+        null = _NULL[typecode]
+        column = array(typecode, (null if row[idx] is None else row[idx] for row in rows))
+        if not _LITTLE_ENDIAN:
+            column.byteswap()
+        parts.append(column.tobytes())
+    return zlib.compress(b"".join(parts), level)
+
+
+def unpack_columns(blob: bytes, count: int, columns: Sequence[Tuple[str, str, int]]) -> Dict[str, memoryview]:
+    """
+    Decompress a pack_columns() blob into typed views, one per column.
+
+    The views slice the decompressed buffer without copying it again, and
+    support the buffer protocol: numpy.frombuffer(view, dtype=view.format)
+    wraps a column as an ndarray for free. Big-endian hosts get swapped copies.
+    """
+    view = memoryview(zlib.decompress(blob))
+    result: Dict[str, memoryview] = {}
+    offset = 0
+    for name, typecode, _ in columns:
+        size = array(typecode).itemsize * count
+        column = view[offset:offset + size].cast(typecode)
+        if not _LITTLE_ENDIAN:
+            swapped = array(typecode, column)
+            swapped.byteswap()
+            column = memoryview(swapped)
+        result[name] = column
+        offset += size
+    if offset != len(view):
+        raise ValueError(f"Heatmap blob holds {len(view)} bytes, expected {offset} for {count} rows")
+    return result
+
+
+@dataclass
+class HeatmapMatrix:
+    """
+    One stored liquidation heatmap snapshot as typed column views.
+
+    Cell i sits at (x_position[i], y_position[i]) with liquidation_amount[i];
+    y_axis[y] is the price of row y and candle columns share an index.
+    """
+
+    symbol: str
+    range: str
+    fetch_time: int
+    y_axis: memoryview
+    x_position: memoryview
+    y_position: memoryview
+    liquidation_amount: memoryview
+    candles: Dict[str, memoryview]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(rows, columns) of the dense matrix: price levels x time buckets."""
+        width = max(self.x_position) + 1 if len(self.x_position) else 0
+        return len(self.y_axis), width
+
+    def dense(self) -> List[List[float]]:
+        """The matrix as nested lists (rows = y_axis), zeros where no cell was reported."""
+        height, width = self.shape
+        grid = [[0.0] * width for _ in range(height)]
+        for x, y, amount in zip(self.x_position, self.y_position, self.liquidation_amount):
+            if 0 <= y < height and x >= 0 and amount == amount:
+                grid[y][x] = amount
+        return grid
+
+
+def decode_heatmap(
+    symbol: str,
+    range_param: str,
+    fetch_time: int,
+    counts: Tuple[int, int, int],
+    blobs: Tuple[bytes, bytes, bytes],
+) -> HeatmapMatrix:
+    """Build a HeatmapMatrix from (y_count, cell_count, candle_count) and the three blobs."""
+    y_count, cell_count, candle_count = counts
+    y_axis_blob, leverage_blob, candles_blob = blobs
+    cells = unpack_columns(leverage_blob, cell_count, LEVERAGE_COLUMNS)
+    return HeatmapMatrix(
+        symbol=symbol,
+        range=range_param,
+        fetch_time=fetch_time,
+        y_axis=unpack_columns(y_axis_blob, y_count, Y_AXIS_COLUMNS)["price_level"],
+        x_position=cells["x_position"],
+        y_position=cells["y_position"],
+        liquidation_amount=cells["liquidation_amount"],
+        candles=unpack_columns(candles_blob, candle_count, CANDLE_COLUMNS),
+    )
+
+
+def encode_heatmap(
+    child_rows: Dict[str, List[Tuple]], level: int = 6
+) -> Tuple[Tuple[int, int, int], Tuple[bytes, bytes, bytes]]:
+    """Pack parsed heatmap child rows (see CoinglassRepository._heatmap_child_rows) into counts and blobs."""
+    y_axis = child_rows.get("y_axis", [])
+    cells = child_rows.get("liquidation_leverage_data", [])
+    candles = child_rows.get("price_candlesticks", [])
+    return (
+        (len(y_axis), len(cells), len(candles)),
+        (
+            pack_columns(y_axis, Y_AXIS_COLUMNS, level),
+            pack_columns(cells, LEVERAGE_COLUMNS, level),
+            pack_columns(candles, CANDLE_COLUMNS, level),
+        ),
+    )
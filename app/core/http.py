@@ -0,0 +1,89 @@
+# app/core/http.py
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+
+
+class PoolStats:
+    """Thread-safe hit/miss counters for a connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.hits + self.misses, "hits": self.hits, "misses": self.misses}
+
+
+class PooledSession(requests.Session):
+    """
+    requests.Session with a sized keep-alive pool and gzip negotiation.
+
+    A "miss" is a request that had to open a new TCP/TLS connection, a "hit"
+    is one that reused a pooled connection.
+    """
+
+    def __init__(self, pool_size: int, keepalive: bool = True, compression: bool = True):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=False)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self._adapter = adapter
+        if compression:
+            self.headers["Accept-Encoding"] = "gzip, deflate"
+        if not keepalive:
+            self.headers["Connection"] = "close"
+
+    def stats(self) -> Dict[str, int]:
+        requests_made = 0
+        connections_opened = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_made += pool.num_requests
+            connections_opened += pool.num_connections
+        return {
+            "requests": requests_made,
+            "hits": max(requests_made - connections_opened, 0),
+            "misses": connections_opened,
+        }
+
+
+_sessions: Dict[str, PooledSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name: str) -> PooledSession:
+    """Return the process-wide pooled session for `name` (one per API provider)."""
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = PooledSession(
+                pool_size=settings.HTTP_POOL_SIZE,
+                keepalive=settings.HTTP_KEEPALIVE,
+                compression=settings.HTTP_COMPRESSION,
+            )
+            _sessions[name] = session
+        return session
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters for every pooled session created in this process."""
+    with _sessions_lock:
+        return {name: session.stats() for name, session in _sessions.items()}
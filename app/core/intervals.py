@@ -0,0 +1,65 @@
+# app/core/intervals.py
+import re
+import time
+from typing import Dict, Optional
+
+_UNIT_MS = {
+    "m": 60 * 1000,
+    "h": 60 * 60 * 1000,
+    "d": 24 * 60 * 60 * 1000,
+    "w": 7 * 24 * 60 * 60 * 1000,
+}
+
+# Coinglass uses both "4h" and "h4" style interval names
+_SUFFIX_RE = re.compile(r"^(\d+)([mhdw])$")
+_PREFIX_RE = re.compile(r"^([mhdw])(\d+)$")
+
+
+def interval_to_ms(interval: str) -> Optional[int]:
+    """Length of one candle in milliseconds, or None for an unknown interval."""
+    value = (interval or "").strip().lower()
+    match = _SUFFIX_RE.match(value)
+    if match:
+        return int(match.group(1)) * _UNIT_MS[match.group(2)]
+    match = _PREFIX_RE.match(value)
+    if match:
+        return int(match.group(2)) * _UNIT_MS[match.group(1)]
+    return None
+
+
+def incremental_start_time(
+    watermark: Optional[int],
+    interval: Optional[str],
+    fallback_start: int,
+    overlap_bars: int = 2,
+    overlap_ms: Optional[int] = None,
+) -> int:
+    """
+    start_time for the next fetch of one series.
+
+    Resumes from the last persisted `time` (the watermark) minus a small
+    overlap, so the still-open candle and late revisions are refetched.
+    Never reaches further back than `fallback_start`, the fixed window the
+    pipeline used before it had a watermark.
+    """
+    if watermark is None:
+        return fallback_start
+    if overlap_ms is None:
+        overlap_ms = overlap_bars * (interval_to_ms(interval or "") or _UNIT_MS["h"])
+    return max(int(watermark) - overlap_ms, fallback_start)
+
+
+def watermark_time_params(watermark: Optional[int], interval: Optional[str], overlap_bars: int = 2) -> Dict[str, int]:
+    """
+    start_time/end_time for a pipeline that otherwise takes the API's default window.
+
+    Empty for a series with no rows yet, so its first fetch still gets the
+    default window; otherwise the range from the watermark (minus overlap)
+    to now, so steady-state cycles only fetch the newest candles.
+    """
+    if watermark is None:
+        return {}
+    return {
+        "start_time": incremental_start_time(watermark, interval, 0, overlap_bars),
+        "end_time": int(time.time() * 1000),
+    }
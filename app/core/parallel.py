@@ -0,0 +1,120 @@
+# app/core/parallel.py
+import logging
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (group, name) of every task still running in this process, including ones a
+# previous call gave up on; they are skipped until their thread really ends
+_in_flight: Set[Tuple[str, str]] = set()
+_in_flight_lock = threading.Lock()
+
+
+def in_flight(group: str) -> Set[str]:
+    """Names of `group` tasks still running in this process."""
+    with _in_flight_lock:
+        return {name for task_group, name in _in_flight if task_group == group}
+
+
+def run_with_deadline(
+    group: str,
+    tasks: Dict[str, Callable[[], Any]],
+    max_workers: int,
+    timeout: float,
+    on_error: Callable[[str, str], Any],
+    on_skip: Optional[Callable[[str, str], Any]] = None,
+    log: Optional[logging.Logger] = None,
+) -> Dict[str, Any]:
+    """
+    Run named zero-argument tasks on `max_workers` threads and collect their results.
+
+    A task still running `timeout` seconds after it started is reported
+    through on_error() and abandoned. The whole run also has a deadline of
+    `timeout` per round of `max_workers` tasks; tasks still queued when it
+    passes, or when every worker is held by an abandoned task, are
+    cancelled and reported through on_error() instead of waiting forever.
+    A task of the same group and name still running from an earlier call
+    (e.g. abandoned last cycle) is not started again; on_skip() (default
+    on_error()) reports it. timeout <= 0 disables both limits.
+    Results keep `tasks` order.
+    """
+    log = log or logger
+    on_skip = on_skip or on_error
+    results: Dict[str, Any] = {}
+
+    with _in_flight_lock:
+        busy = [name for name in tasks if (group, name) in _in_flight]
+        runnable = [name for name in tasks if (group, name) not in _in_flight]
+        _in_flight.update((group, name) for name in runnable)
+    for name in busy:
+        log.warning(f"⏭️ {group} '{name}' is still running from a previous run, skipping")
+        results[name] = on_skip(name, "Still running from a previous run")
+
+    def _release(name: str) -> None:
+        with _in_flight_lock:
+            _in_flight.discard((group, name))
+
+    started: Dict[str, float] = {}
+
+    def _run(name: str) -> Any:
+        started[name] = time.time()
+        try:
+            return tasks[name]()
+        finally:
+            _release(name)
+
+    def _released_if_cancelled(name: str) -> Callable[[Future], None]:
+        # A cancelled task never reaches _run(), so free its slot here
+        return lambda future: _release(name) if future.cancelled() else None
+
+    deadline = None
+    if timeout > 0 and runnable:
+        deadline = time.time() + timeout * math.ceil(len(runnable) / max(1, max_workers))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=group)
+    futures: Dict[Future, str] = {}
+    abandoned: Set[Future] = set()
+    try:
+        for name in runnable:
+            future = executor.submit(_run, name)
+            future.add_done_callback(_released_if_cancelled(name))
+            futures[future] = name
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    log.error(f"❌ {group} '{name}' failed: {e}")
+                    results[name] = on_error(name, str(e))
+
+            if timeout <= 0:
+                continue
+            now = time.time()
+            for future in list(pending):
+                name = futures[future]
+                if name in started and now - started[name] > timeout:
+                    log.error(f"⏱️ {group} '{name}' timed out after {timeout:g}s")
+                    results[name] = on_error(name, f"Timed out after {timeout:g}s")
+                    pending.discard(future)
+                    abandoned.add(future)
+
+            stuck = sum(1 for future in abandoned if not future.done())
+            if pending and (now >= deadline or stuck >= max_workers):
+                for future in list(pending):
+                    if future.cancel():
+                        name = futures[future]
+                        log.error(f"⏱️ {group} '{name}' did not start before the deadline, cancelled")
+                        results[name] = on_error(name, "Not started before the deadline")
+                        pending.discard(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {name: results[name] for name in tasks if name in results}
@@ -0,0 +1,194 @@
+# app/core/rate_limiter.py
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Coinglass API v4 request budget per minute, by subscription plan
+PLAN_LIMITS_PER_MINUTE: Dict[str, int] = {
+    "hobbyist": 30,
+    "startup": 80,
+    "standard": 300,
+    "professional": 1200,
+    "enterprise": 6000,
+}
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket shared by every process that points at the same SQLite file.
+
+    The bucket holds at most `capacity` tokens and refills at
+    `rate_per_minute / 60` tokens per second. Each request takes
+    `weight(endpoint)` tokens; when the bucket is short, the caller waits
+    exactly as long as the refill needs instead of sleeping a fixed delay.
+    State lives in one row updated under `BEGIN IMMEDIATE`, so all
+    docker-compose containers mounting the same volume draw from one budget.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_minute: float,
+        db_path: str,
+        capacity: Optional[float] = None,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.name = name
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.db_path = db_path
+        self.weights = dict(weights or {})
+        self._local = threading.local()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self) -> None:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS token_buckets (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (self.name, self.capacity, time.time()),
+        )
+
+    def weight(self, endpoint: str) -> float:
+        return self.weights.get(endpoint.strip("/"), 1.0)
+
+    def try_acquire(self, endpoint: str = "") -> float:
+        """
+        Take tokens for one request to `endpoint` if the bucket has them.
+
+        Returns:
+            0.0 when the request may proceed, otherwise the seconds to wait
+            before trying again.
+        """
+        cost = min(self.weight(endpoint), self.capacity)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            if row is None:
+                tokens, updated_at = self.capacity, now
+            else:
+                tokens, updated_at = row
+            tokens = min(self.capacity, tokens + max(now - updated_at, 0) * self.rate_per_second)
+
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate_per_second
+
+            conn.execute(
+                "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (self.name, tokens, now),
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def acquire(self, endpoint: str = "") -> float:
+        """Block until a request to `endpoint` is allowed. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(endpoint)
+            if wait <= 0:
+                if waited >= 1:
+                    logger.debug(f"⏳ Rate limit: waited {waited:.1f}s for {endpoint}")
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def acquire_async(self, endpoint: str = "") -> float:
+        """
+        asyncio variant of acquire(); never blocks the event loop.
+
+        try_acquire() can wait up to 30s on the SQLite lock while other
+        containers hold it, so it runs on the default executor.
+        """
+        waited = 0.0
+        while True:
+            wait = await asyncio.get_running_loop().run_in_executor(None, self.try_acquire, endpoint)
+            if wait <= 0:
+                if waited >= 1:
+                    logger.debug(f"⏳ Rate limit: waited {waited:.1f}s for {endpoint}")
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+def _parse_weights(raw: Optional[str]) -> Dict[str, float]:
+    """Parse "endpoint=weight,endpoint=weight" into a dict."""
+    weights: Dict[str, float] = {}
+    if not raw:
+        return weights
+    for item in raw.split(","):
+        if "=" not in item:
+            continue
+        endpoint, weight = item.split("=", 1)
+        try:
+            weights[endpoint.strip().strip("/")] = float(weight)
+        except ValueError:
+            logger.warning(f"Ignoring invalid rate limit weight: {item}")
+    return weights
+
+
+_limiters: Dict[str, TokenBucketRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_coinglass_limiter() -> Optional[TokenBucketRateLimiter]:
+    """
+    Process-wide limiter for Coinglass requests, or None when disabled.
+
+    Budget comes from COINGLASS_RATE_LIMIT (requests/minute) or, when unset,
+    from the COINGLASS_PLAN table above.
+    """
+    if not settings.COINGLASS_RATE_LIMIT_ENABLED:
+        return None
+
+    with _limiters_lock:
+        limiter = _limiters.get("coinglass")
+        if limiter is None:
+            rate = settings.COINGLASS_RATE_LIMIT or PLAN_LIMITS_PER_MINUTE.get(
+                settings.COINGLASS_PLAN.lower(), PLAN_LIMITS_PER_MINUTE["standard"]
+            )
+            limiter = TokenBucketRateLimiter(
+                name="coinglass",
+                rate_per_minute=rate,
+                db_path=settings.RATE_LIMIT_DB_PATH,
+                weights=_parse_weights(settings.COINGLASS_ENDPOINT_WEIGHTS),
+            )
+            logger.info(f"Coinglass rate limit: {rate} req/min ({settings.COINGLASS_PLAN} plan)")
+            _limiters["coinglass"] = limiter
+        return limiter
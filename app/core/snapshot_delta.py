@@ -0,0 +1,49 @@
+# app/core/snapshot_delta.py
+import hashlib
+import json
+import zlib
+from typing import Any, Dict, List
+
+# A snapshot is a dict of named lists ("sets"), e.g. {"y_axis": [...], "price_candlesticks": [[...], ...]}.
+# A delta against the previous snapshot lists, per changed set, its new length and the
+# (index, value) pairs that differ; sets that disappeared are listed under "drop".
+Snapshot = Dict[str, List[Any]]
+
+
+def snapshot_hash(sets: Snapshot) -> str:
+    """Content hash of a snapshot, independent of set order."""
+    return hashlib.sha1(json.dumps(sets, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def diff_snapshot(previous: Snapshot, current: Snapshot) -> Dict[str, Any]:
+    """Delta that turns `previous` into `current` under apply_delta()."""
+    changed = {}
+    for name, values in current.items():
+        before = previous.get(name, [])
+        if values == before:
+            continue
+        changed[name] = {
+            "n": len(values),
+            "c": [[i, value] for i, value in enumerate(values) if i >= len(before) or before[i] != value],
+        }
+    return {"sets": changed, "drop": sorted(set(previous) - set(current))}
+
+
+def apply_delta(state: Snapshot, delta: Dict[str, Any]) -> Snapshot:
+    """New snapshot with `delta` applied; sets the delta doesn't touch are shared with `state`."""
+    result = {name: values for name, values in state.items() if name not in delta.get("drop", [])}
+    for name, change in delta.get("sets", {}).items():
+        values = list(result.get(name, [])[:change["n"]])
+        values.extend([None] * (change["n"] - len(values)))
+        for i, value in change["c"]:
+            values[i] = value
+        result[name] = values
+    return result
+
+
+def encode_payload(obj: Any) -> bytes:
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode())
+
+
+def decode_payload(payload: bytes) -> Any:
+    return json.loads(zlib.decompress(payload))
@@ -1,24 +1,284 @@
 # app/database/connection.py
 import pymysql
 import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _connect():
+    return pymysql.connect(
+        host=settings.DB["HOST"],
+        port=settings.DB["PORT"],
+        user=settings.DB["USER"],
+        password=settings.DB["PASSWORD"],
+        database=settings.DB["NAME"],
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=False,
+    )
+
+
+class PooledConnection:
+    """
+    A pymysql connection borrowed from a ConnectionPool.
+
+    Behaves like the raw connection; close() hands it back to the pool
+    instead of closing the socket, so existing `conn.close()` calls keep working.
+    A query or commit that raises OperationalError marks the connection
+    broken, and the pool replaces it instead of reusing it.
+    """
+
+    def __init__(self, pool: "ConnectionPool", raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+        self._broken = False
+
+    def __getattr__(self, name: str) -> Any:
+        if self._released:
+            raise pymysql.err.InterfaceError(0, "Connection was returned to the pool")
+        return getattr(self._raw, name)
+
+    def _guard(self, func, *args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except pymysql.err.OperationalError:
+            self._broken = True
+            raise
+
+    def cursor(self, *args, **kwargs) -> "_PooledCursor":
+        return _PooledCursor(self, self.__getattr__("cursor")(*args, **kwargs))
+
+    def commit(self) -> None:
+        self._guard(self.__getattr__("commit"))
+
+    @property
+    def open(self) -> bool:
+        return not self._released and self._raw.open
+
+    def close(self) -> None:
+        if not self._released:
+            self._released = True
+            self._pool.release(self._raw, broken=self._broken)
+
+    def __enter__(self) -> "PooledConnection":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class _PooledCursor:
+    """Cursor of a PooledConnection; OperationalErrors from queries flag the connection."""
+
+    def __init__(self, conn: PooledConnection, raw):
+        self._conn = conn
+        self._raw = raw
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def execute(self, query, args=None):
+        return self._conn._guard(self._raw.execute, query, args)
+
+    def executemany(self, query, args):
+        return self._conn._guard(self._raw.executemany, query, args)
+
+    def __enter__(self) -> "_PooledCursor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._raw.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of pymysql connections.
+
+    - Keeps at least `min_size` connections open (prewarm() opens them up front,
+      and discarded ones are replaced) and never opens more than `max_size`.
+    - Pings each connection on borrow and replaces it if the server dropped it.
+    - Closes connections idle longer than `idle_timeout` (down to `min_size`).
+    - Rolls back on return; connections whose query, commit or rollback
+      raised OperationalError are discarded and replaced.
+    - thread_connection() pins one connection per thread, so concurrent workers
+      each keep their own connection instead of reconnecting per call.
+    """
+
+    def __init__(self, min_size: int = 1, max_size: int = 10, idle_timeout: float = 300.0, timeout: float = 30.0):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._idle: Deque[Tuple[Any, float]] = deque()
+        self._in_use = 0
+        self._opening = 0
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    @property
+    def size(self) -> int:
+        return self._in_use + len(self._idle)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"in_use": self._in_use, "idle": len(self._idle), "max_size": self.max_size}
+
+    def _healthy(self, raw) -> bool:
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except pymysql.err.Error:
+            return False
+
+    def _discard(self, raw) -> None:
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self) -> None:
+        # Caller holds self._cond; oldest idle connections sit at the left
+        now = time.time()
+        while self._idle and self.size > self.min_size and now - self._idle[0][1] > self.idle_timeout:
+            raw, _ = self._idle.popleft()
+            self._discard(raw)
+
+    def prewarm(self) -> None:
+        """Open connections until the pool holds `min_size`; a failed connect is retried on the next top-up."""
+        while True:
+            with self._cond:
+                if self.size + self._opening >= self.min_size:
+                    return
+                self._opening += 1
+            try:
+                raw = _connect()
+            except Exception as e:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                logger.warning(f"Could not open pooled database connection: {e}")
+                return
+            with self._cond:
+                self._opening -= 1
+                self._idle.append((raw, time.time()))
+                self._cond.notify()
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Borrow a healthy connection, waiting up to `timeout` seconds when the pool is exhausted."""
+        deadline = time.time() + (self.timeout if timeout is None else timeout)
+        with self._cond:
+            self._evict_idle()
+            while not self._idle and self._in_use + self._opening >= self.max_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise pymysql.err.OperationalError(
+                        2013, f"Connection pool exhausted ({self.max_size} connections in use)"
+                    )
+                self._cond.wait(remaining)
+            raw = self._idle.pop()[0] if self._idle else None
+            self._in_use += 1
+
+        try:
+            if raw is not None and not self._healthy(raw):
+                logger.info("Pooled database connection went stale, reconnecting")
+                self._discard(raw)
+                raw = None
+            if raw is None:
+                raw = _connect()
+                logger.info("Database connection established")
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw)
+
+    def release(self, raw, broken: bool = False) -> None:
+        """Return a raw connection; it is rolled back first and replaced if it is broken or fails."""
+        keep = raw.open and not broken
+        if keep:
+            try:
+                raw.rollback()
+            except Exception:
+                keep = False
+
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((raw, time.time()))
+            self._evict_idle()
+            self._cond.notify()
+        if not keep:
+            self._discard(raw)
+            self.prewarm()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def thread_connection(self) -> PooledConnection:
+        """The connection pinned to the calling thread, borrowed on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or not conn.open:
+            conn = self.acquire()
+            self._local.conn = conn
+        return conn
+
+    def release_thread_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn.close()
+
+    def close_all(self) -> None:
+        """Close idle connections; connections still borrowed close when returned."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self.min_size = 0
+        for raw, _ in idle:
+            self._discard(raw)
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide connection pool sized by DB_POOL_* settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+                timeout=settings.DB_POOL_TIMEOUT,
+            )
+            _pool.prewarm()
+        return _pool
+
+
 def get_connection():
-    """Get database connection."""
+    """Get database connection (borrowed from the pool unless DB_POOL_ENABLED=false)."""
     try:
-        conn = pymysql.connect(
-            host=settings.DB["HOST"],
-            port=settings.DB["PORT"],
-            user=settings.DB["USER"],
-            password=settings.DB["PASSWORD"],
-            database=settings.DB["NAME"],
-            charset="utf8mb4",
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=False,
-        )
+        if settings.DB_POOL_ENABLED:
+            return get_pool().acquire()
+        conn = _connect()
         logger.info("Database connection established")
         return conn
     except Exception as e:
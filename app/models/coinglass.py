@@ -390,7 +390,8 @@ COINGLASS_TABLES = {
         INDEX idx_symbol (symbol),
         INDEX idx_current_price (current_price),
         INDEX idx_market_cap (market_cap),
-        INDEX idx_volume_usd_24h (volume_usd_24h)
+        INDEX idx_volume_usd_24h (volume_usd_24h),
+        INDEX idx_updated_at (updated_at)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """,
     "cg_spot_pairs_markets": """
@@ -446,7 +447,8 @@ COINGLASS_TABLES = {
         INDEX idx_exchange_name (exchange_name),
         INDEX idx_current_price (current_price),
         INDEX idx_volume_usd_24h (volume_usd_24h),
-        INDEX idx_time_intervals (created_at)
+        INDEX idx_time_intervals (created_at),
+        INDEX idx_updated_at (updated_at)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """,
 
@@ -566,6 +568,10 @@ COINGLASS_TABLES = {
         id BIGINT AUTO_INCREMENT PRIMARY KEY,
         symbol VARCHAR(20) NOT NULL,
         `range` VARCHAR(10) NOT NULL,
+        -- SHA-1 of each child set as last written (diff refresh)
+        y_axis_hash CHAR(40) NULL,
+        leverage_data_hash CHAR(40) NULL,
+        price_candlesticks_hash CHAR(40) NULL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
         UNIQUE KEY uk_symbol_range (symbol, `range`),
@@ -581,7 +587,7 @@ COINGLASS_TABLES = {
         price_level DECIMAL(18,8) NOT NULL,
         sequence_order INT NOT NULL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        INDEX idx_liquidation_heatmap_id (liquidation_heatmap_id),
+        UNIQUE KEY uk_heatmap_sequence (liquidation_heatmap_id, sequence_order),
         INDEX idx_sequence_order (sequence_order),
         FOREIGN KEY (liquidation_heatmap_id) REFERENCES cg_liquidation_heatmap(id) ON DELETE CASCADE
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
@@ -596,7 +602,7 @@ COINGLASS_TABLES = {
         y_position INT,
         liquidation_amount DECIMAL(20,8),
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        INDEX idx_liquidation_heatmap_id (liquidation_heatmap_id),
+        UNIQUE KEY uk_heatmap_sequence (liquidation_heatmap_id, sequence_order),
         INDEX idx_sequence_order (sequence_order),
         FOREIGN KEY (liquidation_heatmap_id) REFERENCES cg_liquidation_heatmap(id) ON DELETE CASCADE
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
@@ -614,13 +620,49 @@ COINGLASS_TABLES = {
         close_price DECIMAL(20,8),
         volume DECIMAL(20,8),
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        INDEX idx_liquidation_heatmap_id (liquidation_heatmap_id),
+        UNIQUE KEY uk_heatmap_sequence (liquidation_heatmap_id, sequence_order),
         INDEX idx_sequence_order (sequence_order),
         INDEX idx_timestamp (timestamp),
         FOREIGN KEY (liquidation_heatmap_id) REFERENCES cg_liquidation_heatmap(id) ON DELETE CASCADE
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """,
 
+    # Compressed column snapshots of the heatmap (HEATMAP_STORAGE_MODE=blob/both), see app.core.heatmap_codec
+    "cg_liquidation_heatmap_matrix": """
+    CREATE TABLE IF NOT EXISTS cg_liquidation_heatmap_matrix (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        symbol VARCHAR(20) NOT NULL,
+        `range` VARCHAR(10) NOT NULL,
+        fetch_time BIGINT NOT NULL,
+        content_hash CHAR(40) NOT NULL,
+        y_count INT NOT NULL,
+        cell_count INT NOT NULL,
+        candle_count INT NOT NULL,
+        y_axis_blob MEDIUMBLOB NOT NULL,
+        leverage_blob MEDIUMBLOB NOT NULL,
+        candles_blob MEDIUMBLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uk_symbol_range_fetch (symbol, `range`, fetch_time)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
+    # Version history of overwritten snapshots (liquidation heatmap, option exchange OI):
+    # keyframes hold the full snapshot, other versions a delta against the previous one
+    "cg_snapshot_history": """
+    CREATE TABLE IF NOT EXISTS cg_snapshot_history (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        dataset VARCHAR(50) NOT NULL,
+        series_key VARCHAR(255) NOT NULL,
+        version_time BIGINT NOT NULL,
+        is_keyframe TINYINT(1) NOT NULL,
+        chain_position INT NOT NULL,
+        content_hash CHAR(40) NOT NULL,
+        payload MEDIUMBLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uk_dataset_series_version (dataset, series_key, version_time)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+
     # ----- Futures Basis Tables -----
     "cg_futures_basis_history": """
     CREATE TABLE IF NOT EXISTS cg_futures_basis_history (
@@ -849,7 +891,8 @@ COINGLASS_TABLES = {
         UNIQUE KEY uk_symbol_unit_range (symbol, unit, `range`),
         INDEX idx_symbol (symbol),
         INDEX idx_unit (unit),
-        INDEX idx_range (`range`)
+        INDEX idx_range (`range`),
+        INDEX idx_updated_at (updated_at)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """,
 
@@ -889,9 +932,12 @@ COINGLASS_TABLES = {
     CREATE TABLE IF NOT EXISTS cg_fear_greed_index (
         id BIGINT AUTO_INCREMENT PRIMARY KEY,
         fetch_timestamp BIGINT NOT NULL,
+        content_hash CHAR(40) NULL,
+        value_count INT NULL,
         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-        INDEX idx_fetch_timestamp (fetch_timestamp)
+        INDEX idx_fetch_timestamp (fetch_timestamp),
+        INDEX idx_updated_at (updated_at)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """,
 
@@ -1153,4 +1199,51 @@ COINGLASS_TABLES = {
         INDEX idx_time (time)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
     """,
+
+    # ----- Ingestion Stats Ledger -----
+    "cg_ingestion_stats": """
+    CREATE TABLE IF NOT EXISTS cg_ingestion_stats (
+        table_name VARCHAR(64) NOT NULL,
+        series_key VARCHAR(255) NOT NULL,
+        row_count BIGINT NOT NULL DEFAULT 0,
+        min_time BIGINT NULL,
+        max_time BIGINT NULL,
+        last_write_at TIMESTAMP(3) NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (table_name, series_key)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+}
+
+# Tables tracked in cg_ingestion_stats: table -> (time column, series columns).
+# The repository updates one ledger row per series on every bulk upsert, so
+# status and freshness read row counts and min/max time without scanning the
+# table. A None time column records write time (ms), matching updated_at.
+INGESTION_LEDGER = {
+    "cg_funding_rate_history": ("time", ("exchange", "pair", "interval")),
+    "cg_open_interest_aggregated_history": ("time", ("symbol", "interval")),
+    "cg_long_short_global_account_ratio_history": ("time", ("exchange", "pair", "interval")),
+    "cg_long_short_top_account_ratio_history": ("time", ("exchange", "pair", "interval")),
+    "cg_liquidation_aggregated_history": ("time", ("symbol", "interval")),
+    "cg_futures_basis_history": ("time", ("exchange", "pair", "interval")),
+    "cg_spot_orderbook_history": ("time", ("exchange", "pair", "interval", "range_percent")),
+    "cg_spot_orderbook_aggregated": ("time", ("exchange_name", "symbol", "interval", "range_percent")),
+    "cg_spot_coins_markets": (None, ()),
+    "cg_spot_pairs_markets": (None, ("exchange_name",)),
+    "cg_spot_price_history": ("time", ("exchange", "symbol", "interval")),
+    "cg_bitcoin_etf_list": ("update_timestamp", ()),
+    "cg_bitcoin_etf_premium_discount_history": ("timestamp", ("ticker",)),
+    "cg_bitcoin_etf_flows_history": ("timestamp", ()),
+    "cg_bitcoin_etf_flows_details": ("timestamp", ("etf_ticker",)),
+    "cg_bitcoin_vs_global_m2_growth": ("timestamp", ()),
+    "cg_hyperliquid_whale_alert": ("create_time", ("symbol",)),
+    "cg_whale_transfer": ("block_timestamp", ()),
+    "cg_open_interest_aggregated_stablecoin_history": ("time", ("exchange_list", "symbol", "interval")),
+    "cg_futures_footprint_history": ("time", ("exchange", "symbol", "interval")),
+    "cg_spot_large_orderbook_history": ("start_time", ("exchange_name", "symbol", "order_state")),
+    "cg_spot_large_orderbook": ("current_time", ("exchange_name", "symbol")),
+    "cg_spot_aggregated_taker_volume_history": ("time", ("exchange_name", "symbol", "interval")),
+    "cg_spot_taker_volume_history": ("time", ("exchange", "symbol", "interval")),
+    "cg_spot_ask_bids_history": ("time", ("exchange_name", "symbol", "interval", "range_percent")),
+    "cg_spot_aggregated_ask_bids_history": ("time", ("exchange_name", "symbol", "interval", "range_percent")),
 }
@@ -1,10 +1,21 @@
 # app/monitoring/freshness_monitor.py
+import functools
+import json
 import logging
+import os
+import time
 from datetime import datetime, timedelta, timezone, tzinfo
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
 
+from app.core.config import settings
+from app.core.intervals import interval_to_ms
+from app.core.parallel import run_with_deadline
+from app.database.connection import get_connection
+from app.models.coinglass import INGESTION_LEDGER
+from app.repositories.coinglass_repository import CoinglassRepository
+
 # Define WIB timezone (UTC+7)
 class WIB(tzinfo):
     def utcoffset(self, dt):
@@ -18,6 +29,9 @@ wib_tz = WIB()
 
 logger = logging.getLogger(__name__)
 
+# A candle series is stale once its latest candle is this many intervals old (plus the VERY_FRESH grace)
+SERIES_STALE_INTERVALS = 2
+
 
 class FreshnessStatus(Enum):
     VERY_FRESH = "very_fresh"      # < 1 hour old
@@ -35,6 +49,8 @@ class FreshnessConfig:
     time_column: str
     time_format: str = "timestamp_ms"  # "timestamp_ms", "timestamp_s", "datetime"
     expected_max_age_hours: Dict[FreshnessStatus, float] = None
+    # Unique-key prefix identifying one series, e.g. (exchange, pair, interval); from INGESTION_LEDGER
+    series_columns: Tuple[str, ...] = ()
 
     def __post_init__(self):
         if self.expected_max_age_hours is None:
@@ -61,10 +77,64 @@ class FreshnessResult:
     cycle_duration_minutes: Optional[float] = None  # Time taken for last cycle
     error_message: Optional[str] = None
     recommendations: List[str] = None
+    # Minutes since each series' latest record ("Binance:BTCUSDT:1h" -> 42), most lagging first
+    series_lag_minutes: Dict[str, int] = None
+    stale_series: List[str] = None
 
     def __post_init__(self):
         if self.recommendations is None:
             self.recommendations = []
+        if self.series_lag_minutes is None:
+            self.series_lag_minutes = {}
+        if self.stale_series is None:
+            self.stale_series = []
+
+
+def save_freshness_snapshot(results: Dict[str, FreshnessResult], path: Optional[str] = None) -> None:
+    """Publish a sweep's results as JSON (written to a temp file, then renamed into place)."""
+    path = path or settings.FRESHNESS_CACHE_PATH
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    payload = {
+        "checked_at": time.time(),
+        "results": {
+            name: dict(asdict(result), status=result.status.value)
+            for name, result in results.items()
+        },
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def load_freshness_snapshot(
+    path: Optional[str] = None, max_age_seconds: Optional[float] = None
+) -> Optional[Tuple[float, Dict[str, FreshnessResult]]]:
+    """
+    Latest published sweep as (checked_at, results), or None when it is
+    missing, unreadable or older than `max_age_seconds`.
+    """
+    path = path or settings.FRESHNESS_CACHE_PATH
+    max_age_seconds = settings.FRESHNESS_CACHE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+    try:
+        with open(path) as f:
+            payload = json.load(f)
+        checked_at = float(payload["checked_at"])
+        if max_age_seconds > 0 and time.time() - checked_at > max_age_seconds:
+            return None
+        results = {
+            name: FreshnessResult(**dict(data, status=FreshnessStatus(data["status"])))
+            for name, data in payload["results"].items()
+        }
+        return checked_at, results
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read freshness snapshot {path}: {e}")
+        return None
 
 
 class DataFreshnessMonitor:
@@ -158,32 +228,28 @@ class DataFreshnessMonitor:
             FreshnessStatus.MODERATE: 72.0,
         }
 
-    def check_stream_freshness(self, stream_name: str) -> FreshnessResult:
-        """Check freshness for a specific data stream."""
+        # Per-series freshness for tables keyed by series, so one stalled series isn't masked by the rest
+        for config in self.stream_configs.values():
+            tracked = INGESTION_LEDGER.get(config.table_name)
+            if tracked and tracked[1] and not config.series_columns:
+                config.series_columns = tracked[1]
+
+    def check_stream_freshness(self, stream_name: str, conn=None) -> FreshnessResult:
+        """Check freshness for a specific data stream (on `conn` when given, else the monitor's connection)."""
         if stream_name not in self.stream_configs:
-            return FreshnessResult(
-                stream_name=stream_name,
-                status=FreshnessStatus.ERROR,
-                total_records=0,
-                latest_timestamp=None,
-                latest_datetime=None,
-                earliest_timestamp=None,
-                hours_since_latest=None,
-                records_last_24h=0,
-                avg_records_per_hour=None,
-                data_gaps_hours=[],
-                error_message=f"Unknown stream: {stream_name}"
-            )
+            return self._error_result(stream_name, f"Unknown stream: {stream_name}")
 
         config = self.stream_configs[stream_name]
         now = datetime.now(wib_tz)
 
         try:
-            with self.conn.cursor() as cur:
-                # Get basic statistics
-                stats_query = self._build_stats_query(config)
-                cur.execute(stats_query)
-                stats_row = cur.fetchone()
+            with (conn or self.conn).cursor() as cur:
+                # Get basic statistics (from the ingestion stats ledger when it tracks this table)
+                stats_row = self._read_ledger_stats(cur, config)
+                if stats_row is None:
+                    stats_query = self._build_stats_query(config)
+                    cur.execute(stats_query)
+                    stats_row = cur.fetchone()
 
                 if not stats_row or stats_row['total_records'] == 0:
                     return FreshnessResult(
@@ -216,8 +282,10 @@ class DataFreshnessMonitor:
                 # Determine freshness status
                 status = self._determine_freshness_status(hours_since_latest, config)
 
-                # Get data continuity analysis (hourly gaps in last 24h)
-                data_gaps_hours = self._analyze_data_continuity(cur, config, now)
+                # Hourly gaps in last 24h, records this cycle and cycle duration in one grouped query
+                data_gaps_hours, records_this_cycle, cycle_duration_minutes = self._analyze_recent_activity(
+                    cur, config, now
+                )
 
                 # Calculate average records per hour
                 total_records = stats_row['total_records']
@@ -227,19 +295,18 @@ class DataFreshnessMonitor:
                 else:
                     avg_records_per_hour = None
 
-                # Generate recommendations (will be called after getting cycle data)
-                recommendations = []
-
-                # Get records from latest cycle (last hour instead of 24h)
-                records_this_cycle = self._get_records_this_cycle(cur, config, now)
-
-                # Calculate cycle duration (time between recent data insertions)
-                cycle_duration_minutes = self._calculate_cycle_duration(cur, config, now)
+                # Lag per series (exchange/symbol/interval...) and the ones falling behind
+                series_lag_minutes, stale_series = self._analyze_series_lags(cur, config, now)
 
                 # Generate recommendations with cycle data
                 recommendations = self._generate_recommendations(
                     status, hours_since_latest, data_gaps_hours, records_this_cycle
                 )
+                if stale_series:
+                    recommendations.append(
+                        f"{len(stale_series)}/{len(series_lag_minutes)} series stalled - check fetches for: "
+                        + ", ".join(stale_series[:5])
+                    )
 
                 return FreshnessResult(
                     stream_name=stream_name,
@@ -253,31 +320,84 @@ class DataFreshnessMonitor:
                     avg_records_per_hour=avg_records_per_hour,
                     data_gaps_hours=data_gaps_hours,
                     cycle_duration_minutes=cycle_duration_minutes,
-                    recommendations=recommendations
+                    recommendations=recommendations,
+                    series_lag_minutes=series_lag_minutes,
+                    stale_series=stale_series
                 )
 
         except Exception as e:
             self.logger.error(f"Error checking freshness for {stream_name}: {e}", exc_info=True)
-            return FreshnessResult(
-                stream_name=stream_name,
-                status=FreshnessStatus.ERROR,
-                total_records=0,
-                latest_timestamp=None,
-                latest_datetime=None,
-                earliest_timestamp=None,
-                hours_since_latest=None,
-                records_last_24h=0,
-                avg_records_per_hour=None,
-                data_gaps_hours=[],
-                error_message=str(e)
-            )
-
-    def check_all_streams_freshness(self) -> Dict[str, FreshnessResult]:
-        """Check freshness for all data streams."""
-        results = {}
-        for stream_name in self.stream_configs.keys():
-            results[stream_name] = self.check_stream_freshness(stream_name)
-        return results
+            return self._error_result(stream_name, str(e))
+
+    def _error_result(self, stream_name: str, message: str) -> FreshnessResult:
+        return FreshnessResult(
+            stream_name=stream_name,
+            status=FreshnessStatus.ERROR,
+            total_records=0,
+            latest_timestamp=None,
+            latest_datetime=None,
+            earliest_timestamp=None,
+            hours_since_latest=None,
+            records_last_24h=0,
+            avg_records_per_hour=None,
+            data_gaps_hours=[],
+            error_message=message
+        )
+
+    def check_all_streams_freshness(
+        self, max_parallel: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Dict[str, FreshnessResult]:
+        """
+        Check freshness for all data streams.
+
+        With FRESHNESS_MAX_PARALLEL > 1 streams are checked concurrently, each
+        on its own pooled connection, and a stream still running after
+        FRESHNESS_STREAM_TIMEOUT_SECONDS is reported as an error instead of
+        holding up the report. Streams that cannot start before the sweep's
+        deadline (run_with_deadline) are cancelled, and a stream whose
+        abandoned check from an earlier sweep is still running is skipped;
+        both are reported as errors. Results keep stream_configs order.
+        """
+        stream_names = list(self.stream_configs.keys())
+        max_parallel = settings.FRESHNESS_MAX_PARALLEL if max_parallel is None else max_parallel
+        timeout = settings.FRESHNESS_STREAM_TIMEOUT_SECONDS if timeout is None else timeout
+
+        if min(max_parallel, len(stream_names)) <= 1:
+            results = {}
+            for stream_name in stream_names:
+                results[stream_name] = self.check_stream_freshness(stream_name)
+            return results
+
+        return self._check_parallel(stream_names, max_parallel, timeout)
+
+    def _check_on_own_connection(self, stream_name: str, timeout: float) -> FreshnessResult:
+        conn = get_connection()
+        if not conn:
+            return self._error_result(stream_name, "Failed to connect to database")
+        try:
+            # Let the server abort SELECTs past the deadline too, so abandoned checks free their connection
+            self._set_max_execution_time(conn, int(timeout * 1000))
+            return self.check_stream_freshness(stream_name, conn=conn)
+        finally:
+            self._set_max_execution_time(conn, 0)
+            conn.close()
+
+    def _set_max_execution_time(self, conn, milliseconds: int) -> None:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"SET SESSION MAX_EXECUTION_TIME = {max(0, milliseconds)}")
+        except Exception:
+            pass  # Not supported by this server (e.g. MariaDB); the client-side timeout still applies
+
+    def _check_parallel(self, stream_names: List[str], max_parallel: int, timeout: float) -> Dict[str, FreshnessResult]:
+        return run_with_deadline(
+            "freshness",
+            {name: functools.partial(self._check_on_own_connection, name, timeout) for name in stream_names},
+            min(max_parallel, len(stream_names)),
+            timeout,
+            on_error=self._error_result,
+            log=self.logger,
+        )
 
     def log_freshness_status(self, results: Dict[str, FreshnessResult]) -> None:
         """Log freshness status for all streams with visual indicators."""
@@ -333,6 +453,15 @@ class DataFreshnessMonitor:
 
         self.logger.info("=" * 80)
 
+    def log_freshness_alerts(self, results: Dict[str, FreshnessResult]) -> List[str]:
+        """Log alerts for streams that need attention and return them."""
+        alerts = self.get_freshness_alerts(results)
+        if alerts:
+            self.logger.warning("🚨 FRESHNESS ALERTS:")
+            for alert in alerts:
+                self.logger.warning(f"   {alert}")
+        return alerts
+
     def get_freshness_alerts(self, results: Dict[str, FreshnessResult]) -> List[str]:
         """Generate alerts for streams that need attention."""
         alerts = []
@@ -349,17 +478,23 @@ class DataFreshnessMonitor:
             elif result.records_last_24h == 0 and result.status not in [FreshnessStatus.NO_DATA, FreshnessStatus.ERROR]:
                 alerts.append(f"⚠️  NO CYCLE DATA: {stream_name} - No data in current cycle")
 
+            if result.stale_series and result.status not in [FreshnessStatus.NO_DATA, FreshnessStatus.ERROR]:
+                alerts.append(
+                    f"⚠️  STALLED SERIES: {stream_name} - {len(result.stale_series)} series behind "
+                    f"(worst: {result.stale_series[0]}, {result.series_lag_minutes.get(result.stale_series[0], 0) / 60:.1f}h)"
+                )
+
         return alerts
 
     def _build_stats_query(self, config: FreshnessConfig) -> str:
         """Build query to get basic statistics for a table."""
         if config.time_format == "datetime":
-            # For datetime columns, convert to timestamp
+            # For datetime columns, aggregate the raw column (index-resolvable) and convert the result
             return f"""
                 SELECT
                     COUNT(*) as total_records,
-                    MAX(UNIX_TIMESTAMP({config.time_column}) * 1000) as latest_timestamp,
-                    MIN(UNIX_TIMESTAMP({config.time_column}) * 1000) as earliest_timestamp
+                    UNIX_TIMESTAMP(MAX({config.time_column})) * 1000 as latest_timestamp,
+                    UNIX_TIMESTAMP(MIN({config.time_column})) * 1000 as earliest_timestamp
                 FROM {config.table_name}
             """
         else:
@@ -372,6 +507,62 @@ class DataFreshnessMonitor:
                 FROM {config.table_name}
             """
 
+    def _ledger_tracks(self, config: FreshnessConfig) -> bool:
+        """Whether cg_ingestion_stats tracks this table by the same time column as the stream."""
+        tracked = INGESTION_LEDGER.get(config.table_name)
+        if tracked is None:
+            return False
+        if tracked[0] is None:
+            return config.time_format == "datetime"
+        return tracked[0] == config.time_column and config.time_format != "datetime"
+
+    def _read_ledger_stats(self, cur, config: FreshnessConfig) -> Optional[Dict[str, Any]]:
+        """
+        total_records / latest_timestamp / earliest_timestamp from cg_ingestion_stats.
+
+        Returns None (scan the table instead) when the ledger does not track the
+        table by the same time column, has no rows for it yet, or is missing.
+        """
+        if not self._ledger_tracks(config):
+            return None
+
+        try:
+            cur.execute(
+                """
+                SELECT SUM(row_count) as total_records, MAX(max_time) as latest_timestamp,
+                       MIN(min_time) as earliest_timestamp
+                FROM cg_ingestion_stats
+                WHERE table_name = %s
+                """,
+                (config.table_name,),
+            )
+            row = cur.fetchone()
+        except Exception as e:
+            self.logger.debug(f"Ingestion stats unavailable for {config.table_name}: {e}")
+            return None
+        if not row or row['total_records'] is None:
+            return None
+        return {
+            'total_records': int(row['total_records']),
+            'latest_timestamp': row['latest_timestamp'],
+            'earliest_timestamp': row['earliest_timestamp'],
+        }
+
+    def _time_bound(self, config: FreshnessConfig, timestamp_ms: int) -> str:
+        """
+        SQL literal comparable with the raw time column, so range filters stay sargable.
+
+        Datetime columns get FROM_UNIXTIME(<constant>): MySQL folds it once into
+        a DATETIME in the session time zone (the one UNIX_TIMESTAMP(col) reads
+        them in), so `col >= bound` is an index range scan instead of
+        converting every row.
+        """
+        if config.time_format == "datetime":
+            return f"FROM_UNIXTIME({timestamp_ms / 1000:.3f})"
+        if config.time_format == "timestamp_s":
+            return str(timestamp_ms // 1000)
+        return str(timestamp_ms)
+
     def _parse_timestamps(self, latest_ts, earliest_ts, config: FreshnessConfig) -> Tuple[Optional[int], Optional[int]]:
         """Parse timestamps based on format configuration."""
         if config.time_format == "datetime":
@@ -400,102 +591,153 @@ class DataFreshnessMonitor:
         else:
             return FreshnessStatus.STALE
 
-    def _get_records_this_cycle(self, cur, config: FreshnessConfig, now: datetime) -> int:
-        """Get number of records in the latest cycle (last 1 hour)."""
+    def _analyze_recent_activity(
+        self, cur, config: FreshnessConfig, now: datetime
+    ) -> Tuple[List[int], int, Optional[float]]:
+        """
+        Hourly gaps over the last 24 hours, records in the latest cycle (last hour)
+        and cycle duration, from a single grouped query.
+
+        Rows since `now - 24h` are bucketed per hour relative to that cutoff
+        (bucket 23 is the last hour; later buckets hold rows stamped ahead of
+        `now`). The timestamp of the second most recent record rides along as a
+        scalar subquery, so the cycle duration needs no extra round trip
+        unless the window is empty; then it comes from the two latest records.
+        """
         try:
-            cutoff_timestamp = int((now - timedelta(hours=1)).timestamp() * 1000)
-
+            window_start = int((now - timedelta(hours=24)).timestamp() * 1000)
             if config.time_format == "datetime":
-                query = f"""
-                    SELECT COUNT(*) as count
-                    FROM {config.table_name}
-                    WHERE UNIX_TIMESTAMP({config.time_column}) * 1000 >= {cutoff_timestamp}
-                """
+                time_expr = f"UNIX_TIMESTAMP({config.time_column}) * 1000"
+            elif config.time_format == "timestamp_s":
+                time_expr = f"{config.time_column} * 1000"
             else:
-                query = f"""
-                    SELECT COUNT(*) as count
-                    FROM {config.table_name}
-                    WHERE {config.time_column} >= {cutoff_timestamp}
-                """
+                time_expr = config.time_column
+            window_bound = self._time_bound(config, window_start)
 
+            query = f"""
+                SELECT
+                    FLOOR(({time_expr} - {window_start}) / 3600000) as bucket,
+                    COUNT(*) as count,
+                    MAX({time_expr}) as latest_timestamp,
+                    (
+                        SELECT {time_expr}
+                        FROM {config.table_name}
+                        ORDER BY {config.time_column} DESC
+                        LIMIT 1 OFFSET 1
+                    ) as previous_timestamp
+                FROM {config.table_name}
+                WHERE {config.time_column} >= {window_bound}
+                GROUP BY bucket
+            """
             cur.execute(query)
-            row = cur.fetchone()
-            return row['count'] if row else 0
-        except Exception as e:
-            self.logger.warning(f"Error getting cycle records for {config.table_name}: {e}")
-            return 0
+            rows = cur.fetchall()
 
-    def _calculate_cycle_duration(self, cur, config: FreshnessConfig, now: datetime) -> Optional[float]:
-        """Calculate cycle duration based on time between recent data insertions."""
-        try:
-            # Get timestamps of the 2 most recent records
-            if config.time_format == "datetime":
-                query = f"""
-                    SELECT UNIX_TIMESTAMP({config.time_column}) * 1000 as timestamp_ms
-                    FROM {config.table_name}
-                    ORDER BY {config.time_column} DESC
-                    LIMIT 2
-                """
+            counts = {int(row['bucket']): row['count'] for row in rows}
+            gaps = [23 - bucket for bucket in range(23, -1, -1) if not counts.get(bucket)]
+            records_this_cycle = sum(count for bucket, count in counts.items() if bucket >= 23)
+
+            if rows:
+                latest_ts = max(row['latest_timestamp'] for row in rows)
+                previous_ts = rows[0]['previous_timestamp']
             else:
-                query = f"""
-                    SELECT {config.time_column} as timestamp_ms
+                # Nothing in the window (stale stream): take the two most recent records directly
+                cur.execute(f"""
+                    SELECT {time_expr} as timestamp_ms
                     FROM {config.table_name}
                     ORDER BY {config.time_column} DESC
                     LIMIT 2
-                """
+                """)
+                latest = [row['timestamp_ms'] for row in cur.fetchall()]
+                latest_ts, previous_ts = (latest + [None, None])[:2]
 
-            cur.execute(query)
-            rows = cur.fetchall()
-
-            if len(rows) >= 2:
-                # Calculate time difference between consecutive records
-                latest_ts = rows[0]['timestamp_ms']
-                previous_ts = rows[1]['timestamp_ms']
+            cycle_duration_minutes = None
+            if latest_ts and previous_ts:
+                # Time difference between the two most recent records
+                duration_minutes = float(latest_ts - previous_ts) / (1000 * 60)
+                cycle_duration_minutes = max(0.1, min(duration_minutes, 60.0))  # Clamp between 0.1 and 60 minutes
 
-                if latest_ts and previous_ts:
-                    duration_minutes = (latest_ts - previous_ts) / (1000 * 60)
-                    return max(0.1, min(duration_minutes, 60.0))  # Clamp between 0.1 and 60 minutes
-
-            return None
+            return gaps, records_this_cycle, cycle_duration_minutes
         except Exception as e:
-            self.logger.warning(f"Error calculating cycle duration for {config.table_name}: {e}")
-            return None
+            self.logger.warning(f"Error analyzing recent activity for {config.table_name}: {e}")
+            return [], 0, None
+
+    def _analyze_series_lags(
+        self, cur, config: FreshnessConfig, now: datetime
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Minutes since the latest record of every series, most lagging first, and the stale ones.
+
+        Reads the per-series max_time from cg_ingestion_stats when it tracks the
+        table; otherwise one GROUP BY over the series columns, which the unique
+        key (series columns + time) covers. A series with an interval column is
+        stale once it is SERIES_STALE_INTERVALS candles behind (plus the
+        VERY_FRESH grace); others once they pass the stream's FRESH threshold.
+        """
+        if not config.series_columns:
+            return {}, []
 
-    def _analyze_data_continuity(self, cur, config: FreshnessConfig, now: datetime) -> List[int]:
-        """Analyze data continuity by checking for hourly gaps in last 24 hours."""
         try:
-            gaps = []
-            cutoff_timestamp = int((now - timedelta(hours=24)).timestamp() * 1000)
-
-            for hours_ago in range(24):
-                hour_start = int((now - timedelta(hours=hours_ago+1)).timestamp() * 1000)
-                hour_end = int((now - timedelta(hours=hours_ago)).timestamp() * 1000)
+            latest_by_series: Dict[str, Any] = {}
+            # Ledger keys join the series columns in INGESTION_LEDGER order; interval_pos below relies on it
+            if self._ledger_tracks(config) and tuple(INGESTION_LEDGER[config.table_name][1]) == tuple(
+                config.series_columns
+            ):
+                cur.execute(
+                    "SELECT series_key, max_time FROM cg_ingestion_stats WHERE table_name = %s",
+                    (config.table_name,),
+                )
+                latest_by_series = {row['series_key']: row['max_time'] for row in cur.fetchall()}
 
+            if not latest_by_series:
+                cols_sql = ", ".join(f"`{col}`" for col in config.series_columns)
                 if config.time_format == "datetime":
-                    query = f"""
-                        SELECT COUNT(*) as count
-                        FROM {config.table_name}
-                        WHERE UNIX_TIMESTAMP({config.time_column}) * 1000 >= {hour_start}
-                        AND UNIX_TIMESTAMP({config.time_column}) * 1000 < {hour_end}
-                    """
+                    latest_sql = f"UNIX_TIMESTAMP(MAX({config.time_column})) * 1000"
                 else:
-                    query = f"""
-                        SELECT COUNT(*) as count
-                        FROM {config.table_name}
-                        WHERE {config.time_column} >= {hour_start} AND {config.time_column} < {hour_end}
+                    latest_sql = f"MAX({config.time_column})"
+                cur.execute(
+                    f"""
+                    SELECT {cols_sql}, {latest_sql} as latest_timestamp
+                    FROM {config.table_name}
+                    GROUP BY {cols_sql}
                     """
+                )
+                latest_by_series = {
+                    ":".join(CoinglassRepository.series_key(*(row[col] for col in config.series_columns))):
+                        row['latest_timestamp']
+                    for row in cur.fetchall()
+                }
+
+            now_ms = int(now.timestamp() * 1000)
+            grace_ms = config.expected_max_age_hours[FreshnessStatus.VERY_FRESH] * 3600 * 1000
+            default_max_lag_ms = config.expected_max_age_hours[FreshnessStatus.FRESH] * 3600 * 1000
+            interval_pos = (
+                config.series_columns.index("interval") if "interval" in config.series_columns else None
+            )
 
-                cur.execute(query)
-                row = cur.fetchone()
-                count = row['count'] if row else 0
-
-                if count == 0:
-                    gaps.append(hours_ago)
-
-            return gaps
+            lags: Dict[str, int] = {}
+            stale: List[str] = []
+            for key, latest in latest_by_series.items():
+                latest_ms, _ = self._parse_timestamps(latest, None, config)
+                if latest_ms is None:
+                    continue
+                lag_ms = now_ms - int(latest_ms)
+                lags[key] = max(0, int(lag_ms / 60000))
+
+                interval_ms = None
+                if interval_pos is not None:
+                    parts = key.split(":")
+                    if len(parts) == len(config.series_columns):
+                        interval_ms = interval_to_ms(parts[interval_pos])
+                max_lag_ms = SERIES_STALE_INTERVALS * interval_ms + grace_ms if interval_ms else default_max_lag_ms
+                if lag_ms > max_lag_ms:
+                    stale.append(key)
+
+            lags = dict(sorted(lags.items(), key=lambda item: item[1], reverse=True))
+            stale.sort(key=lambda key: lags[key], reverse=True)
+            return lags, stale
         except Exception as e:
-            self.logger.warning(f"Error analyzing continuity for {config.table_name}: {e}")
-            return []
+            self.logger.warning(f"Error analyzing series lags for {config.table_name}: {e}")
+            return {}, []
 
     def _generate_recommendations(self, status: FreshnessStatus, hours_since_latest: Optional[float],
                                  data_gaps_hours: List[int], records_last_24h: int) -> List[str]:
@@ -541,6 +783,12 @@ class DataFreshnessMonitor:
                 record_info += ")"
 
             self.logger.info(f"   • {stream_name:<30} {time_info:<30} | {record_info}")
+            if result.stale_series:
+                stalled = ", ".join(
+                    f"{key} ({result.series_lag_minutes.get(key, 0) / 60:.1f}h)" for key in result.stale_series[:5]
+                )
+                more = f" +{len(result.stale_series) - 5} more" if len(result.stale_series) > 5 else ""
+                self.logger.info(f"     ↳ stalled series: {stalled}{more}")
 
         self.logger.info("")
 
@@ -0,0 +1,192 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from app.core.config import Settings
+from app.core.http import PoolStats
+from app.core.logging import setup_logger
+from app.providers.coinglass.client import CoinglassClient
+
+
+class _ReplayClient(CoinglassClient):
+    """
+    Stand-in for CoinglassClient used to run its get_* methods without I/O.
+
+    _make_request hands back the responses it was given, in order. Once those
+    run out it records the request as pending and returns None, so the caller
+    knows which requests still have to go over the wire.
+    """
+
+    def __init__(self, base: CoinglassClient, responses: List[Any]):
+        self.logger = base.logger
+        self.api_key = base.api_key
+        self.rate_limiter = None
+        self.headers = base.headers
+        self._responses = list(responses)
+        self.pending: List[Tuple[str, Optional[Dict]]] = []
+
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        if self._responses:
+            return self._responses.pop(0)
+        self.pending.append((endpoint, params))
+        return None
+
+
+class AsyncCoinglassClient:
+    """
+    Coinglass API v4 Client (asyncio/aiohttp)
+
+    Exposes the same get_* methods as CoinglassClient, as awaitables:
+
+        async with AsyncCoinglassClient() as client:
+            rows = await asyncio.gather(
+                client.get_fr_history(exchange="Binance", symbol="BTCUSDT", interval="1h"),
+                client.get_fr_history(exchange="Bybit", symbol="BTCUSDT", interval="1h"),
+            )
+
+    Endpoints, params and response post-processing stay defined once, in
+    CoinglassClient: each call replays the sync method to collect its requests,
+    sends them through aiohttp, then replays it again with the responses.
+    At most `max_concurrency` requests are in flight at any time.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        cfg = Settings()
+        self._sync = CoinglassClient()
+        self.logger = setup_logger(__name__)
+        self.max_concurrency = max_concurrency or cfg.COINGLASS_MAX_CONCURRENCY
+        self.pool_size = cfg.HTTP_POOL_SIZE
+        self.keepalive = cfg.HTTP_KEEPALIVE
+        self.keepalive_timeout = cfg.HTTP_KEEPALIVE_TIMEOUT
+        self.headers = dict(self._sync.headers)
+        if cfg.HTTP_COMPRESSION:
+            self.headers["Accept-Encoding"] = "gzip, deflate"
+        self.stats = PoolStats()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncCoinglassClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._session is None or self._session.closed:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            if self.keepalive:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_size, keepalive_timeout=self.keepalive_timeout
+                )
+            else:
+                connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=True)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=CoinglassClient.TIMEOUT_SECONDS),
+                trace_configs=[self._trace_config()],
+            )
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_create(session, ctx, params):
+            self.stats.miss()
+
+        async def on_reuse(session, ctx, params):
+            self.stats.hit()
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Connection pool hit/miss counters (hits = requests that reused a connection)."""
+        return self.stats.as_dict()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        await self.open()
+        url = self._sync._build_url(endpoint, params)
+
+        async with self._semaphore:
+            if self._sync.rate_limiter:
+                await self._sync.rate_limiter.acquire_async(endpoint)
+            try:
+                self.logger.debug(f"[Coinglass] GET {url}")
+                async with self._session.get(url) as resp:
+                    resp.raise_for_status()
+                    payload = await resp.json(content_type=None)
+                return self._sync._parse_payload(endpoint, payload)
+            except asyncio.TimeoutError:
+                self.logger.warning(
+                    f"Request timeout ({CoinglassClient.TIMEOUT_SECONDS}s) {endpoint} - Skipping..."
+                )
+                return None
+            except aiohttp.ClientError as e:
+                self.logger.warning(f"Request failed {endpoint}: {e} - Skipping...")
+                return None
+            except Exception as e:
+                self.logger.warning(f"Unexpected error {endpoint}: {e} - Skipping...")
+                return None
+
+    async def _call(self, name: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        method = getattr(CoinglassClient, name)
+        responses: List[Any] = []
+        while True:
+            replay = _ReplayClient(self._sync, responses)
+            result = method(replay, *args, **kwargs)
+            if not replay.pending:
+                return result
+            responses.extend(
+                await asyncio.gather(*(self._make_request(e, p) for e, p in replay.pending))
+            )
+
+    def __getattr__(self, name: str):
+        if name.startswith("get_") and callable(getattr(CoinglassClient, name, None)):
+            async def call(*args, **kwargs):
+                return await self._call(name, args, kwargs)
+
+            call.__name__ = name
+            return call
+        raise AttributeError(f"{type(self).__name__!s} has no attribute {name!r}")
+
+    async def gather(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Run many get_* calls concurrently.
+
+        Args:
+            calls: (method_name, kwargs) pairs, e.g. ("get_fr_history", {"exchange": "Binance", ...})
+
+        Returns:
+            Results in the same order as `calls`. A call that raised yields None.
+        """
+        results = await asyncio.gather(
+            *(getattr(self, name)(**kwargs) for name, kwargs in calls),
+            return_exceptions=True,
+        )
+        out = []
+        for (name, _), result in zip(calls, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Unexpected error {name}: {result} - Skipping...")
+                result = None
+            out.append(result)
+        return out
+
+
+def fetch_concurrently(
+    calls: Sequence[Tuple[str, Dict[str, Any]]], max_concurrency: Optional[int] = None
+) -> List[Any]:
+    """Blocking helper for sync pipelines: run `calls` through AsyncCoinglassClient.gather."""
+
+    async def _run():
+        async with AsyncCoinglassClient(max_concurrency=max_concurrency) as client:
+            return await client.gather(calls)
+
+    return asyncio.run(_run())
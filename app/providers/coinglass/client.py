@@ -3,12 +3,15 @@ from typing import Dict, Any, List, Optional
 from urllib.parse import urlencode
 from app.core.logging import setup_logger
 from app.core.config import Settings
+from app.core.http import get_session
+from app.core.rate_limiter import get_coinglass_limiter
 
 
 class CoinglassClient:
     """Coinglass API v4 Client"""
 
     BASE_URL = "https://open-api-v4.coinglass.com/api"
+    TIMEOUT_SECONDS = 10
 
     def __init__(self):
         self.logger = setup_logger(__name__)
@@ -17,29 +20,41 @@ class CoinglassClient:
         if not self.api_key:
             raise ValueError("COINGLASS_API_KEY is required")
         self.headers = {"accept": "application/json", "CG-API-KEY": self.api_key}
+        # Keep-alive pool shared by every CoinglassClient in the process
+        self.session = get_session("coinglass")
+        # Token bucket shared with every other pipeline process
+        self.rate_limiter = get_coinglass_limiter()
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+    def _build_url(self, endpoint: str, params: Optional[Dict] = None) -> str:
         url = f"{self.BASE_URL}/{endpoint}"
         if params:
             params = {k: v for k, v in params.items() if v is not None and v != ""}
             if params:
                 url = f"{url}?{urlencode(params)}"
+        return url
+
+    def _parse_payload(self, endpoint: str, payload: Dict) -> Any:
+        if payload.get("code") == "0":
+            return payload.get("data", None)
+        # API error (400, dll) - log warning dan return None untuk skip
+        self.logger.warning(
+            f"API error {endpoint}: code={payload.get('code')} msg={payload.get('msg')} - Skipping..."
+        )
+        return None
+
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+        url = self._build_url(endpoint, params)
+        if self.rate_limiter:
+            self.rate_limiter.acquire(endpoint)
 
         try:
             self.logger.debug(f"[Coinglass] GET {url}")
             # Timeout 10 detik untuk avoid stuck
-            resp = requests.get(url, headers=self.headers, timeout=10)
+            resp = self.session.get(url, headers=self.headers, timeout=self.TIMEOUT_SECONDS)
             resp.raise_for_status()
-            payload = resp.json()
-            if payload.get("code") == "0":
-                return payload.get("data", None)
-            # API error (400, dll) - log warning dan return None untuk skip
-            self.logger.warning(
-                f"API error {endpoint}: code={payload.get('code')} msg={payload.get('msg')} - Skipping..."
-            )
-            return None
+            return self._parse_payload(endpoint, resp.json())
         except requests.exceptions.Timeout:
-            self.logger.warning(f"Request timeout (10s) {endpoint} - Skipping...")
+            self.logger.warning(f"Request timeout ({self.TIMEOUT_SECONDS}s) {endpoint} - Skipping...")
             return None
         except requests.exceptions.RequestException as e:
             self.logger.warning(f"Request failed {endpoint}: {e} - Skipping...")
@@ -48,6 +63,10 @@ class CoinglassClient:
             self.logger.warning(f"Unexpected error {endpoint}: {e} - Skipping...")
             return None
 
+    def pool_stats(self) -> Dict[str, int]:
+        """Connection pool hit/miss counters (hits = requests that reused a connection)."""
+        return self.session.stats()
+
     # ---------- Trading Markets ----------
     # DISABLED - Not documented
     # def get_supported_coins(self) -> List[str]:
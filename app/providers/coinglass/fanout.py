@@ -0,0 +1,233 @@
+# app/providers/coinglass/fanout.py
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def param_grid(**axes: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Expand pipeline loops into one task per combination, in loop order.
+
+        param_grid(exchange=["Binance", "Bybit"], interval=["1h", "4h"])
+        -> [{"exchange": "Binance", "interval": "1h"}, {"exchange": "Binance", "interval": "4h"}, ...]
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[n] for n in names))]
+
+
+class WriteStage:
+    """
+    Bounded queue between producers (API fetchers) and the thread that writes to the DB.
+
+    Producers put() fetched batches and block while the queue is full, so a
+    slow database throttles the API side instead of buffering without limit.
+    The owner drains it with process() on the thread that owns the DB
+    connection; each call hands `consume` every item already waiting, up to
+    `max_batch`, so results that piled up during one write go out together
+    in the next.
+
+    stats() reports queue depth, items and flushes through the stage, how
+    long items waited in the queue, time spent in `consume` and time
+    producers were blocked by back-pressure.
+    """
+
+    def __init__(
+        self,
+        consume: Callable[[List[T]], None],
+        maxsize: Optional[int] = None,
+        max_batch: Optional[int] = None,
+        on_error: Optional[Callable[[List[T], Exception], None]] = None,
+        name: str = "write",
+    ):
+        self.consume = consume
+        self.maxsize = max(1, maxsize or settings.PIPELINE_STAGE_QUEUE_SIZE)
+        self.max_batch = max(1, max_batch or settings.PIPELINE_STAGE_MAX_BATCH)
+        self.on_error = on_error
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.maxsize)
+        self._lock = threading.Lock()
+        self._stats = {
+            "produced": 0,
+            "consumed": 0,
+            "flushes": 0,
+            "errors": 0,
+            "peak_depth": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "write_seconds": 0.0,
+            "blocked_seconds": 0.0,
+        }
+
+    def put(self, item: T) -> None:
+        """Queue one item, blocking while the queue is full."""
+        started = time.time()
+        self._queue.put((time.time(), item))
+        blocked = time.time() - started
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats["produced"] += 1
+            self._stats["blocked_seconds"] += blocked
+            self._stats["peak_depth"] = max(self._stats["peak_depth"], depth)
+
+    def process(self, timeout: Optional[float] = None) -> int:
+        """
+        Consume waiting items on the calling thread in one `consume` call.
+
+        Blocks up to `timeout` for the first item, then takes whatever else is
+        already queued (at most max_batch in all). Returns the number of items
+        consumed, 0 on timeout.
+        """
+        try:
+            entries = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return 0
+        while len(entries) < self.max_batch:
+            try:
+                entries.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        now = time.time()
+        waits = [now - enqueued for enqueued, _ in entries]
+        items = [item for _, item in entries]
+        failed = False
+        try:
+            self.consume(items)
+        except Exception as e:
+            failed = True
+            if self.on_error:
+                self.on_error(items, e)
+            else:
+                logger.warning(f"⚠️ {self.name}: write of {len(items)} items failed: {e}")
+
+        with self._lock:
+            self._stats["consumed"] += len(items)
+            self._stats["flushes"] += 1
+            self._stats["errors"] += int(failed)
+            self._stats["wait_seconds"] += sum(waits)
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], *waits)
+            self._stats["write_seconds"] += time.time() - now
+        return len(items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        consumed = stats["consumed"] or 1
+        flushes = stats["flushes"] or 1
+        return {
+            "depth": self._queue.qsize(),
+            "maxsize": self.maxsize,
+            "peak_depth": stats["peak_depth"],
+            "produced": stats["produced"],
+            "consumed": stats["consumed"],
+            "flushes": stats["flushes"],
+            "errors": stats["errors"],
+            "avg_wait_ms": round(stats["wait_seconds"] / consumed * 1000, 1),
+            "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 1),
+            "avg_write_ms": round(stats["write_seconds"] / flushes * 1000, 1),
+            "blocked_seconds": round(stats["blocked_seconds"], 2),
+        }
+
+    def log_stats(self) -> None:
+        s = self.stats()
+        logger.info(
+            f"📊 {self.name}: {s['consumed']} batches in {s['flushes']} writes, "
+            f"queue peak {s['peak_depth']}/{s['maxsize']}, wait avg {s['avg_wait_ms']}ms max {s['max_wait_ms']}ms, "
+            f"write avg {s['avg_write_ms']}ms, fetchers blocked {s['blocked_seconds']}s"
+        )
+
+
+def fan_out(
+    tasks: Sequence[T],
+    fetch: Callable[[T], Any],
+    build: Callable[[T, Any], Any],
+    record: Callable[[T, Any, Optional[Dict[str, int]]], None],
+    flush: Callable[[List[Any]], List[Dict[str, int]]],
+    on_error: Optional[Callable[[T, Exception], None]] = None,
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Fetch every task concurrently and write the results in coalesced batches.
+
+    `fetch` and `build` run on a thread pool: fetch does the API I/O (the
+    Coinglass client, its pooled session and the rate limiter are
+    thread-safe) and build turns the response into a RowBatch, or None when
+    there is nothing to write, without touching the database. Built
+    batches pass through a WriteStage drained by the calling thread, which
+    owns the DB connection: every batch waiting at that point goes to one
+    `flush` call (repo.write_batches, one bulk upsert per table and a single
+    commit), then `record(task, rows, result)` runs per task with that
+    batch's result (None if build returned None). record and on_error
+    always run on the calling thread, so summary counters need no locking.
+    Fetches keep running during each flush, and once
+    PIPELINE_STAGE_QUEUE_SIZE results are waiting the fetchers stall until
+    the writer catches up.
+
+    A task whose fetch, build or record raises is passed to `on_error` (or
+    logged) and the rest carry on.
+    """
+    workers = max_workers or settings.PIPELINE_FANOUT_WORKERS
+
+    def _fail(task: T, e: Exception) -> None:
+        if on_error:
+            on_error(task, e)
+        else:
+            logger.warning(f"⚠️ {task}: Exception: {e} (skipped)")
+
+    def _write(results: List[tuple]) -> None:
+        built = []
+        for task, rows, batch, error in results:
+            if error is not None:
+                _fail(task, error)
+            else:
+                built.append((task, rows, batch))
+
+        batches = [batch for _, _, batch in built if batch is not None]
+        try:
+            saved = iter(flush(batches) if batches else [])
+        except Exception as e:
+            for task, _, _ in built:
+                _fail(task, e)
+            return
+
+        for task, rows, batch in built:
+            try:
+                record(task, rows, next(saved) if batch is not None else None)
+            except Exception as e:
+                _fail(task, e)
+
+    def _fetch(task: T) -> tuple:
+        try:
+            rows = fetch(task)
+            return task, rows, build(task, rows), None
+        except Exception as e:
+            return task, None, None, e
+
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            _write([_fetch(task)])
+        return
+
+    stage = WriteStage(_write, name=getattr(record, "__module__", "fan_out").rsplit(".", 1)[-1])
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(tasks)), thread_name_prefix="fetch") as executor:
+        futures = [executor.submit(lambda task=task: stage.put(_fetch(task))) for task in tasks]
+        written = 0
+        while written < len(tasks):
+            processed = stage.process(timeout=1)
+            written += processed
+            # Guard against a producer that died without queueing its result
+            if not processed and stage.stats()["depth"] == 0 and all(f.done() for f in futures):
+                break
+
+    stage.log_stats()
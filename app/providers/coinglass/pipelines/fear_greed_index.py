@@ -12,7 +12,7 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     Fetches historical fear and greed index data.
 
     Data Structure:
-    - Main table: cg_fear_greed_index (one record per fetch)
+    - Main table: cg_fear_greed_index (latest snapshot, refreshed only when its content_hash changes)
     - Child table: cg_fear_greed_index_data_list (multiple index values linked to parent)
     """
     repo = CoinglassRepository(conn, logger)
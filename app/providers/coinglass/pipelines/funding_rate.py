@@ -1,7 +1,10 @@
 # app/providers/coinglass/pipelines/funding_rate.py
 import logging
 from typing import Any, Dict, List
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -27,53 +30,78 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # 1) Funding Rate OHLC History
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            pair = f"{symbol}USDT"
-            for interval in TIMEFRAMES:
-                try:
-                    # Pass time parameters if available
-                    time_params = {}
-                    if "start_time" in params:
-                        time_params["start_time"] = params["start_time"]
-                    if "end_time" in params:
-                        time_params["end_time"] = params["end_time"]
-
-                    rows = client.get_fr_history(
-                        exchange=exchange, symbol=pair, interval=interval, **time_params
-                    )
-                    if rows:
-                        saved = repo.upsert_fr_history(
-                            exchange=exchange, pair=pair, interval=interval, rows=rows
-                        )
-                        logger.info(
-                            f"✅ fr_history[{exchange}:{pair}:{interval}]: "
-                            f"received={len(rows)}, saved={saved}"
-                        )
-                        # Handle both old integer format and new dict format for backward compatibility
-                        if isinstance(saved, dict):
-                            summary["fr_history"] += saved.get("fr_history", 0)
-                            # Add duplicate and filtered info to summary if available
-                            if saved.get("fr_history_duplicates", 0) > 0:
-                                summary["fr_history_duplicates"] = summary.get("fr_history_duplicates", 0) + saved.get("fr_history_duplicates", 0)
-                            if saved.get("fr_history_filtered", 0) > 0:
-                                summary["fr_history_filtered"] = summary.get("fr_history_filtered", 0) + saved.get("fr_history_filtered", 0)
-                        else:
-                            summary["fr_history"] += saved
-                    else:
-                        logger.info(
-                            f"⚠️ fr_history[{exchange}:{pair}:{interval}]: No data (skipped)"
-                        )
-                    summary["fr_history_fetches"] += 1
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️ fr_history[{exchange}:{pair}:{interval}]: Exception: {e} (skipped)"
-                    )
-                    summary["fr_history_fetches"] += 1
-                    continue
-
-    # 2) Exchange List (Current funding rates)
-    for symbol in SYMBOLS:
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_funding_rate_history",
+            ["exchange", "pair", "interval"],
+            filters={"exchange": EXCHANGES, "pair": [f"{symbol}USDT" for symbol in SYMBOLS]},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, interval=TIMEFRAMES)
+
+    def fetch(task):
+        pair, interval = f"{task['symbol']}USDT", task["interval"]
+        series_params = time_params or watermark_time_params(
+            watermarks.get(repo.series_key(task["exchange"], pair, interval)), interval, OVERLAP_BARS
+        )
+        return client.get_fr_history(
+            exchange=task["exchange"], symbol=pair, interval=interval, **series_params
+        )
+
+    def build(task, rows):
+        exchange, pair, interval = task["exchange"], f"{task['symbol']}USDT", task["interval"]
+        if not rows:
+            return None
+        return repo.build_fr_history(
+            exchange=exchange, pair=pair, interval=interval, rows=rows
+        )
+
+    def record(task, rows, saved):
+        exchange, pair, interval = task["exchange"], f"{task['symbol']}USDT", task["interval"]
+        if rows:
+            logger.info(
+                f"✅ fr_history[{exchange}:{pair}:{interval}]: "
+                f"received={len(rows)}, saved={saved}"
+            )
+            # Handle both old integer format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["fr_history"] += saved.get("fr_history", 0)
+                # Add duplicate and filtered info to summary if available
+                if saved.get("fr_history_duplicates", 0) > 0:
+                    summary["fr_history_duplicates"] = summary.get("fr_history_duplicates", 0) + saved.get("fr_history_duplicates", 0)
+                if saved.get("fr_history_filtered", 0) > 0:
+                    summary["fr_history_filtered"] = summary.get("fr_history_filtered", 0) + saved.get("fr_history_filtered", 0)
+            else:
+                summary["fr_history"] += saved
+        else:
+            logger.info(
+                f"⚠️ fr_history[{exchange}:{pair}:{interval}]: No data (skipped)"
+            )
+        summary["fr_history_fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ fr_history[{task['exchange']}:{task['symbol']}USDT:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["fr_history_fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
+
+    # 2) Exchange List (Current funding rates; backfills pass snapshots=False)
+    for symbol in (SYMBOLS if params.get("snapshots", True) else []):
         try:
             data = client.get_fr_exchange_list(symbol=symbol)
             if data and isinstance(data, list) and len(data) > 0:
@@ -1,7 +1,10 @@
 # app/providers/coinglass/pipelines/futures_basis.py
 import logging
 from typing import Any, Dict, List
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -29,49 +32,76 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # Futures Basis History
-    for exchange in EXCHANGES:
-        for pair in PAIRS:
-            for interval in TIMEFRAMES:
-                try:
-                    # Pass time parameters if available
-                    time_params = {}
-                    if "start_time" in params:
-                        time_params["start_time"] = params["start_time"]
-                    if "end_time" in params:
-                        time_params["end_time"] = params["end_time"]
-
-                    if time_params:
-                        logger.info(f"Using time parameters: {time_params}")
-
-                    rows = client.get_futures_basis_history(
-                        exchange=exchange, symbol=pair, interval=interval, **time_params
-                    )
-                    if rows:
-                        saved = repo.upsert_futures_basis_history(
-                            exchange=exchange, pair=pair, interval=interval, rows=rows
-                        )
-                        logger.info(
-                            f"✅ futures_basis[{exchange}:{pair}:{interval}]: "
-                            f"received={len(rows)}, saved={saved.get('futures_basis', 0)}, duplicates={saved.get('futures_basis_duplicates', 0)}"
-                        )
-                        # Handle both old int format and new dict format for backward compatibility
-                        if isinstance(saved, dict):
-                            summary["futures_basis"] += saved.get("futures_basis", 0)
-                            if saved.get("futures_basis_duplicates", 0) > 0:
-                                summary["futures_basis_duplicates"] = summary.get("futures_basis_duplicates", 0) + saved.get("futures_basis_duplicates", 0)
-                        else:
-                            summary["futures_basis"] += saved
-                    else:
-                        logger.info(
-                            f"⚠️ futures_basis[{exchange}:{pair}:{interval}]: No data (skipped)"
-                        )
-                    summary["futures_basis_fetches"] += 1
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️ futures_basis[{exchange}:{pair}:{interval}]: Exception: {e} (skipped)"
-                    )
-                    summary["futures_basis_fetches"] += 1
-                    continue
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    if time_params:
+        logger.info(f"Using time parameters: {time_params}")
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_futures_basis_history",
+            ["exchange", "pair", "interval"],
+            filters={"exchange": EXCHANGES, "pair": PAIRS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
+    tasks = param_grid(exchange=EXCHANGES, pair=PAIRS, interval=TIMEFRAMES)
+
+    def fetch(task):
+        series_params = time_params or watermark_time_params(
+            watermarks.get(repo.series_key(task["exchange"], task["pair"], task["interval"])),
+            task["interval"],
+            OVERLAP_BARS,
+        )
+        return client.get_futures_basis_history(
+            exchange=task["exchange"], symbol=task["pair"], interval=task["interval"], **series_params
+        )
+
+    def build(task, rows):
+        exchange, pair, interval = task["exchange"], task["pair"], task["interval"]
+        if not rows:
+            return None
+        return repo.build_futures_basis_history(
+            exchange=exchange, pair=pair, interval=interval, rows=rows
+        )
+
+    def record(task, rows, saved):
+        exchange, pair, interval = task["exchange"], task["pair"], task["interval"]
+        if rows:
+            logger.info(
+                f"✅ futures_basis[{exchange}:{pair}:{interval}]: "
+                f"received={len(rows)}, saved={saved.get('futures_basis', 0)}, duplicates={saved.get('futures_basis_duplicates', 0)}"
+            )
+            # Handle both old int format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["futures_basis"] += saved.get("futures_basis", 0)
+                if saved.get("futures_basis_duplicates", 0) > 0:
+                    summary["futures_basis_duplicates"] = summary.get("futures_basis_duplicates", 0) + saved.get("futures_basis_duplicates", 0)
+            else:
+                summary["futures_basis"] += saved
+        else:
+            logger.info(
+                f"⚠️ futures_basis[{exchange}:{pair}:{interval}]: No data (skipped)"
+            )
+        summary["futures_basis_fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ futures_basis[{task['exchange']}:{task['pair']}:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["futures_basis_fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(
         f"📦 Futures Basis summary -> total_saved={summary['futures_basis']}, duplicates={summary['futures_basis_duplicates']} | "
@@ -3,8 +3,10 @@
 import logging
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import Settings
+from app.core.intervals import incremental_start_time
 
 logger = logging.getLogger(__name__)
 settings = Settings()
@@ -33,6 +35,19 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     if not start_time:
         start_time = int((datetime.now() - timedelta(hours=HOURS_BACK)).timestamp() * 1000)
 
+    # Resume each series from its last stored time unless an explicit start_time was given
+    INCREMENTAL = params.get("incremental", True) and not params.get("start_time")
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_futures_footprint_history",
+            ["exchange", "symbol", "interval"],
+            filters={"exchange": EXCHANGES, "symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     end_time = params.get("end_time", int(datetime.now().timestamp() * 1000))
 
     summary = {
@@ -44,48 +59,58 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Starting Futures Volume Footprint History pipeline for exchanges: {EXCHANGES}")
 
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            for interval in INTERVALS:
-                try:
-                    logger.info(f"Fetching footprint history for {exchange} {symbol} {interval}")
-
-                    data = client.get_futures_footprint_history(
-                        exchange=exchange,
-                        symbol=symbol,
-                        interval=interval,
-                        start_time=start_time,
-                        end_time=end_time,
-                        limit=LIMIT
-                    )
-
-                    if data:
-                        # Process and insert data with duplicate checking
-                        saved = repo.insert_futures_footprint_history(exchange, symbol, interval, data)
-                        logger.info(
-                            f"✅ futures_footprint_history[{exchange}:{symbol}:{interval}]: "
-                            f"received={len(data)}, saved={saved.get('futures_footprint_history', 0)}, duplicates={saved.get('futures_footprint_history_duplicates', 0)}"
-                        )
-                        # Handle both old int format and new dict format for backward compatibility
-                        if isinstance(saved, dict):
-                            summary["futures_footprint_history"] += saved.get("futures_footprint_history", 0)
-                            if saved.get("futures_footprint_history_duplicates", 0) > 0:
-                                summary["futures_footprint_history_duplicates"] = summary.get("futures_footprint_history_duplicates", 0) + saved.get("futures_footprint_history_duplicates", 0)
-                        else:
-                            summary["futures_footprint_history"] += saved
-                    else:
-                        logger.info(
-                            f"⚠️ futures_footprint_history[{exchange}:{symbol}:{interval}]: No data (skipped)"
-                        )
-
-                    summary["fetches"] += 1
-
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️ futures_footprint_history[{exchange}:{symbol}:{interval}]: Exception: {e} (skipped)"
-                    )
-                    summary["errors"] += 1
-                    continue
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, interval=INTERVALS)
+
+    def fetch(task):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        series_start = incremental_start_time(
+            watermarks.get(repo.series_key(exchange, symbol, interval)), interval, start_time, OVERLAP_BARS
+        )
+        logger.info(f"Fetching footprint history for {exchange} {symbol} {interval}")
+
+        return client.get_futures_footprint_history(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            start_time=series_start,
+            end_time=end_time,
+            limit=LIMIT
+        )
+
+    def build(task, data):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if not data:
+            return None
+        return repo.build_futures_footprint_history(exchange, symbol, interval, data)
+
+    def record(task, data, saved):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if data:
+            logger.info(
+                f"✅ futures_footprint_history[{exchange}:{symbol}:{interval}]: "
+                f"received={len(data)}, saved={saved.get('futures_footprint_history', 0)}, duplicates={saved.get('futures_footprint_history_duplicates', 0)}"
+            )
+            # Handle both old int format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["futures_footprint_history"] += saved.get("futures_footprint_history", 0)
+                if saved.get("futures_footprint_history_duplicates", 0) > 0:
+                    summary["futures_footprint_history_duplicates"] = summary.get("futures_footprint_history_duplicates", 0) + saved.get("futures_footprint_history_duplicates", 0)
+            else:
+                summary["futures_footprint_history"] += saved
+        else:
+            logger.info(
+                f"⚠️ futures_footprint_history[{exchange}:{symbol}:{interval}]: No data (skipped)"
+            )
+
+        summary["fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ futures_footprint_history[{task['exchange']}:{task['symbol']}:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["errors"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(
         f"📦 Futures Volume Footprint History pipeline completed. Total records saved: {summary['futures_footprint_history']}, duplicates={summary['futures_footprint_history_duplicates']} | "
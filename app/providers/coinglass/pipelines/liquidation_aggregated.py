@@ -1,7 +1,10 @@
 # app/providers/coinglass/pipelines/liquidation_aggregated.py
 import logging
 from typing import Any, Dict, List
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -34,46 +37,72 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # Liquidation Aggregated History
-    for symbol in SYMBOLS:
-        for interval in TIMEFRAMES:
-            try:
-                # Pass time parameters if available
-                time_params = {}
-                if "start_time" in params:
-                    time_params["start_time"] = params["start_time"]
-                if "end_time" in params:
-                    time_params["end_time"] = params["end_time"]
-
-                if time_params:
-                    logger.info(f"Using time parameters: {time_params}")
-
-                rows = client.get_liquidation_aggregated_history(
-                    exchange_list=EXCHANGE_LIST, symbol=symbol, interval=interval, **time_params
-                )
-                if rows:
-                    result = repo.upsert_liquidation_aggregated_history(
-                        symbol=symbol, interval=interval, rows=rows
-                    )
-                    saved = result.get("liquidation_aggregated", 0)
-                    duplicates = result.get("liquidation_aggregated_duplicates", 0)
-
-                    logger.info(
-                        f"✅ liquidation_aggregated[{symbol}:{interval}]: "
-                        f"received={len(rows)}, saved={saved}, duplicates={duplicates}"
-                    )
-                    summary["liquidation_aggregated"] += saved
-                    summary["liquidation_aggregated_duplicates"] += duplicates
-                else:
-                    logger.info(
-                        f"⚠️ liquidation_aggregated[{symbol}:{interval}]: No data (skipped)"
-                    )
-                summary["liquidation_aggregated_fetches"] += 1
-            except Exception as e:
-                logger.warning(
-                    f"⚠️ liquidation_aggregated[{symbol}:{interval}]: Exception: {e} (skipped)"
-                )
-                summary["liquidation_aggregated_fetches"] += 1
-                continue
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    if time_params:
+        logger.info(f"Using time parameters: {time_params}")
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_liquidation_aggregated_history",
+            ["symbol", "interval"],
+            filters={"symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
+    tasks = param_grid(symbol=SYMBOLS, interval=TIMEFRAMES)
+
+    def fetch(task):
+        series_params = time_params or watermark_time_params(
+            watermarks.get(repo.series_key(task["symbol"], task["interval"])), task["interval"], OVERLAP_BARS
+        )
+        return client.get_liquidation_aggregated_history(
+            exchange_list=EXCHANGE_LIST, symbol=task["symbol"], interval=task["interval"], **series_params
+        )
+
+    def build(task, rows):
+        symbol, interval = task["symbol"], task["interval"]
+        if not rows:
+            return None
+        return repo.build_liquidation_aggregated_history(
+            symbol=symbol, interval=interval, rows=rows
+        )
+
+    def record(task, rows, result):
+        symbol, interval = task["symbol"], task["interval"]
+        if rows:
+            saved = result.get("liquidation_aggregated", 0)
+            duplicates = result.get("liquidation_aggregated_duplicates", 0)
+
+            logger.info(
+                f"✅ liquidation_aggregated[{symbol}:{interval}]: "
+                f"received={len(rows)}, saved={saved}, duplicates={duplicates}"
+            )
+            summary["liquidation_aggregated"] += saved
+            summary["liquidation_aggregated_duplicates"] += duplicates
+        else:
+            logger.info(
+                f"⚠️ liquidation_aggregated[{symbol}:{interval}]: No data (skipped)"
+            )
+        summary["liquidation_aggregated_fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ liquidation_aggregated[{task['symbol']}:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["liquidation_aggregated_fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(
         f"📦 Liquidation Aggregated summary -> total_saved={summary['liquidation_aggregated']} | "
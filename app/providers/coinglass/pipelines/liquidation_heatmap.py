@@ -1,11 +1,25 @@
 # app/providers/coinglass/pipelines/liquidation_heatmap.py
 import logging
-import time
 from typing import Any, Dict
+from app.providers.coinglass.async_client import fetch_concurrently
 from app.repositories.coinglass_repository import CoinglassRepository
 
 logger = logging.getLogger(__name__)
 
+# Minimum minutes between refreshes of one (symbol, range) heatmap.
+# Long ranges barely move between cycles; short ranges refresh every run.
+# params["refresh_minutes"] overrides individual ranges.
+DEFAULT_REFRESH_MINUTES = {
+    "12h": 0,
+    "24h": 0,
+    "3d": 0,
+    "7d": 0,
+    "30d": 60,
+    "90d": 240,
+    "180d": 720,
+    "1y": 1440,
+}
+
 
 def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -15,65 +29,80 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     Collects liquidation heatmap data for coins.
     Note: Only available on Professional and Enterprise plans.
-    Note: Includes 20-second delay between API calls to respect rate limits.
+    Note: Requests go out concurrently through the shared rate limiter;
+    each range is only refetched once its refresh_minutes cadence has passed.
     """
     repo = CoinglassRepository(conn, logger)
 
     # Liquidation heatmap specific ranges
     RANGES = params.get("ranges", ["12h", "24h", "3d", "7d", "30d", "90d", "180d", "1y"])
     SYMBOLS = params.get("symbols", ["BTC", "ETH", "SOL", "XRP", "HYPE", "BNB", "DOGE"])
+    REFRESH_MINUTES = {**DEFAULT_REFRESH_MINUTES, **params.get("refresh_minutes", {})}
 
     summary = {
         "liquidation_heatmap": 0,
         "liquidation_heatmap_duplicates": 0,
-        "liquidation_heatmap_fetches": 0
+        "liquidation_heatmap_fetches": 0,
+        "liquidation_heatmap_skipped": 0,
     }
 
-    # Liquidation Aggregated Heatmap
+    # Only fetch heatmaps whose refresh cadence has elapsed
+    ages = repo.get_liquidation_heatmap_ages(SYMBOLS)
+    tasks = []
     for symbol in SYMBOLS:
         for range_param in RANGES:
-            try:
-                # Add 20-second delay between API calls with countdown
-                delay_seconds = 20
-                logger.info(f"⏳ Waiting {delay_seconds} seconds before next request...")
-                for remaining in range(delay_seconds, 0, -1):
-                    if remaining % 5 == 0 or remaining <= 3:
-                        logger.info(f"⏱️  {remaining} seconds remaining...")
-                    time.sleep(1)
-                logger.info("✓ Delay complete, proceeding with request")
+            age = ages.get((symbol, range_param))
+            if age is not None and age < REFRESH_MINUTES.get(range_param, 0) * 60:
+                summary["liquidation_heatmap_skipped"] += 1
+                continue
+            tasks.append((symbol, range_param))
 
-                data = client.get_liquidation_aggregated_heatmap(
-                    symbol=symbol, range_param=range_param
+    if not tasks:
+        logger.info("⏭️ liquidation_heatmap: all ranges fresh (skipped)")
+        return summary
+
+    # Liquidation Aggregated Heatmap
+    responses = fetch_concurrently(
+        [
+            ("get_liquidation_aggregated_heatmap", {"symbol": symbol, "range_param": range_param})
+            for symbol, range_param in tasks
+        ]
+    )
+
+    for (symbol, range_param), data in zip(tasks, responses):
+        try:
+            if data:
+                result = repo.upsert_liquidation_heatmap(
+                    symbol=symbol, range_param=range_param, data=data
                 )
-                if data:
-                    result = repo.upsert_liquidation_heatmap(
-                        symbol=symbol, range_param=range_param, data=data
-                    )
-                    saved = result.get("liquidation_heatmap", 0)
-                    duplicates = result.get("liquidation_heatmap_duplicates", 0)
+                saved = result.get("liquidation_heatmap", 0)
+                duplicates = result.get("liquidation_heatmap_duplicates", 0)
+                rows_written = result.get("liquidation_heatmap_rows_written", 0)
+                snapshots = result.get("liquidation_heatmap_snapshots", 0)
 
-                    logger.info(
-                        f"✅ liquidation_heatmap[{symbol}:{range_param}]: "
-                        f"saved={saved}, duplicates={duplicates}"
-                    )
-                    summary["liquidation_heatmap"] += saved
-                    summary["liquidation_heatmap_duplicates"] += duplicates
-                else:
-                    logger.info(
-                        f"⚠️ liquidation_heatmap[{symbol}:{range_param}]: No data (skipped)"
-                    )
-                summary["liquidation_heatmap_fetches"] += 1
-            except Exception as e:
-                logger.warning(
-                    f"⚠️ liquidation_heatmap[{symbol}:{range_param}]: Exception: {e} (skipped)"
+                logger.info(
+                    f"✅ liquidation_heatmap[{symbol}:{range_param}]: "
+                    f"saved={saved}, duplicates={duplicates}, child rows written={rows_written}, "
+                    f"snapshots={snapshots}"
                 )
-                summary["liquidation_heatmap_fetches"] += 1
-                continue
+                summary["liquidation_heatmap"] += saved
+                summary["liquidation_heatmap_duplicates"] += duplicates
+            else:
+                logger.info(
+                    f"⚠️ liquidation_heatmap[{symbol}:{range_param}]: No data (skipped)"
+                )
+            summary["liquidation_heatmap_fetches"] += 1
+        except Exception as e:
+            logger.warning(
+                f"⚠️ liquidation_heatmap[{symbol}:{range_param}]: Exception: {e} (skipped)"
+            )
+            summary["liquidation_heatmap_fetches"] += 1
+            continue
 
     logger.info(
         f"📦 Liquidation Heatmap summary -> total_saved={summary['liquidation_heatmap']} | "
         f"liquidation_heatmap:{summary['liquidation_heatmap']} (duplicates:{summary['liquidation_heatmap_duplicates']}) "
-        f"(fetches:{summary['liquidation_heatmap_fetches']})"
+        f"(fetches:{summary['liquidation_heatmap_fetches']}, not due:{summary['liquidation_heatmap_skipped']})"
     )
 
-    return summary
\ No newline at end of file
+    return summary
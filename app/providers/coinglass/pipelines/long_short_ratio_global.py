@@ -1,7 +1,10 @@
 # app/providers/coinglass/pipelines/long_short_ratio_global.py
 import logging
 from typing import Any, Dict, List
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -28,51 +31,76 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # Global Account Ratio
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            pair = f"{symbol}USDT"
-            for interval in TIMEFRAMES:
-                try:
-                    # Pass time parameters if available
-                    time_params = {}
-                    if "start_time" in params:
-                        time_params["start_time"] = params["start_time"]
-                    if "end_time" in params:
-                        time_params["end_time"] = params["end_time"]
-
-                    if time_params:
-                        logger.info(f"Using time parameters: {time_params}")
-
-                    rows = client.get_lsr_global_account_ratio_history(
-                        exchange=exchange, symbol=pair, interval=interval, **time_params
-                    )
-                    if rows:
-                        saved = repo.upsert_lsr_global_account_ratio(
-                            exchange=exchange, pair=pair, interval=interval, rows=rows
-                        )
-                        logger.info(
-                            f"✅ lsr_global_account[{exchange}:{pair}:{interval}]: "
-                            f"received={len(rows)}, saved={saved.get('lsr_global_account_ratio', 0)}, duplicates={saved.get('lsr_global_account_ratio_duplicates', 0)}"
-                        )
-                        # Handle both old integer format and new dict format for backward compatibility
-                        if isinstance(saved, dict):
-                            summary["lsr_global_account_ratio"] += saved.get("lsr_global_account_ratio", 0)
-                            # Add duplicate info to summary if available
-                            if saved.get("lsr_global_account_ratio_duplicates", 0) > 0:
-                                summary["lsr_global_account_ratio_duplicates"] = summary.get("lsr_global_account_ratio_duplicates", 0) + saved.get("lsr_global_account_ratio_duplicates", 0)
-                        else:
-                            summary["lsr_global_account_ratio"] += saved
-                    else:
-                        logger.info(
-                            f"⚠️ lsr_global_account[{exchange}:{pair}:{interval}]: No data (skipped)"
-                        )
-                    summary["lsr_global_account_fetches"] += 1
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️ lsr_global_account[{exchange}:{pair}:{interval}]: Exception: {e} (skipped)"
-                    )
-                    summary["lsr_global_account_fetches"] += 1
-                    continue
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    if time_params:
+        logger.info(f"Using time parameters: {time_params}")
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_long_short_global_account_ratio_history",
+            ["exchange", "pair", "interval"],
+            filters={"exchange": EXCHANGES, "pair": [f"{symbol}USDT" for symbol in SYMBOLS]},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, interval=TIMEFRAMES)
+
+    def fetch(task):
+        pair, interval = f"{task['symbol']}USDT", task["interval"]
+        series_params = time_params or watermark_time_params(
+            watermarks.get(repo.series_key(task["exchange"], pair, interval)), interval, OVERLAP_BARS
+        )
+        return client.get_lsr_global_account_ratio_history(
+            exchange=task["exchange"], symbol=pair, interval=interval, **series_params
+        )
+
+    def build(task, rows):
+        exchange, pair, interval = task["exchange"], f"{task['symbol']}USDT", task["interval"]
+        if not rows:
+            return None
+        return repo.build_lsr_global_account_ratio(
+            exchange=exchange, pair=pair, interval=interval, rows=rows
+        )
+
+    def record(task, rows, saved):
+        exchange, pair, interval = task["exchange"], f"{task['symbol']}USDT", task["interval"]
+        if rows:
+            logger.info(
+                f"✅ lsr_global_account[{exchange}:{pair}:{interval}]: "
+                f"received={len(rows)}, saved={saved.get('lsr_global_account_ratio', 0)}, duplicates={saved.get('lsr_global_account_ratio_duplicates', 0)}"
+            )
+            # Handle both old integer format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["lsr_global_account_ratio"] += saved.get("lsr_global_account_ratio", 0)
+                # Add duplicate info to summary if available
+                if saved.get("lsr_global_account_ratio_duplicates", 0) > 0:
+                    summary["lsr_global_account_ratio_duplicates"] = summary.get("lsr_global_account_ratio_duplicates", 0) + saved.get("lsr_global_account_ratio_duplicates", 0)
+            else:
+                summary["lsr_global_account_ratio"] += saved
+        else:
+            logger.info(
+                f"⚠️ lsr_global_account[{exchange}:{pair}:{interval}]: No data (skipped)"
+            )
+        summary["lsr_global_account_fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ lsr_global_account[{task['exchange']}:{task['symbol']}USDT:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["lsr_global_account_fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     if summary.get("lsr_global_account_ratio_duplicates", 0) > 0:
         logger.info(
@@ -1,7 +1,10 @@
 # app/providers/coinglass/pipelines/oi_aggregated_history.py
 import logging
 from typing import Any, Dict, List
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -28,40 +31,73 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # OI Aggregated History (OHLC aggregated data across exchanges)
-    for symbol in SYMBOLS:
-        for interval in TIMEFRAMES:
-            try:
-                rows = client.get_oi_aggregated_history(
-                    symbol=symbol, interval=interval,
-                    unit=UNIT
-                )
-                if rows:
-                    saved = repo.upsert_oi_aggregated_history(
-                        symbol=symbol, interval=interval,
-                        rows=rows, unit=UNIT
-                    )
-                    logger.info(
-                        f"✅ oi_aggregated_history[{symbol}:{interval}]: "
-                        f"received={len(rows)}, saved={saved.get('oi_aggregated_history', 0)}, duplicates={saved.get('oi_aggregated_history_duplicates', 0)}"
-                    )
-                    # Handle both old int format and new dict format for backward compatibility
-                    if isinstance(saved, dict):
-                        summary["oi_aggregated_history"] += saved.get("oi_aggregated_history", 0)
-                        if saved.get("oi_aggregated_history_duplicates", 0) > 0:
-                            summary["oi_aggregated_history_duplicates"] = summary.get("oi_aggregated_history_duplicates", 0) + saved.get("oi_aggregated_history_duplicates", 0)
-                    else:
-                        summary["oi_aggregated_history"] += saved
-                else:
-                    logger.info(
-                        f"⚠️ oi_aggregated_history[{symbol}:{interval}]: No data (skipped)"
-                    )
-                summary["oi_aggregated_fetches"] += 1
-            except Exception as e:
-                logger.warning(
-                    f"⚠️ oi_aggregated_history[{symbol}:{interval}]: Exception: {e} (skipped)"
-                )
-                summary["oi_aggregated_fetches"] += 1
-                continue
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_open_interest_aggregated_history",
+            ["symbol", "interval"],
+            filters={"symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
+    tasks = param_grid(symbol=SYMBOLS, interval=TIMEFRAMES)
+
+    def fetch(task):
+        series_params = time_params or watermark_time_params(
+            watermarks.get(repo.series_key(task["symbol"], task["interval"])), task["interval"], OVERLAP_BARS
+        )
+        return client.get_oi_aggregated_history(
+            symbol=task["symbol"], interval=task["interval"],
+            unit=UNIT, **series_params
+        )
+
+    def build(task, rows):
+        symbol, interval = task["symbol"], task["interval"]
+        if not rows:
+            return None
+        return repo.build_oi_aggregated_history(
+            symbol=symbol, interval=interval,
+            rows=rows, unit=UNIT
+        )
+
+    def record(task, rows, saved):
+        symbol, interval = task["symbol"], task["interval"]
+        if rows:
+            logger.info(
+                f"✅ oi_aggregated_history[{symbol}:{interval}]: "
+                f"received={len(rows)}, saved={saved.get('oi_aggregated_history', 0)}, duplicates={saved.get('oi_aggregated_history_duplicates', 0)}"
+            )
+            # Handle both old int format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["oi_aggregated_history"] += saved.get("oi_aggregated_history", 0)
+                if saved.get("oi_aggregated_history_duplicates", 0) > 0:
+                    summary["oi_aggregated_history_duplicates"] = summary.get("oi_aggregated_history_duplicates", 0) + saved.get("oi_aggregated_history_duplicates", 0)
+            else:
+                summary["oi_aggregated_history"] += saved
+        else:
+            logger.info(
+                f"⚠️ oi_aggregated_history[{symbol}:{interval}]: No data (skipped)"
+            )
+        summary["oi_aggregated_fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ oi_aggregated_history[{task['symbol']}:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["oi_aggregated_fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(
         f"📦 OI Aggregated History summary -> total_saved={summary['oi_aggregated_history']}, duplicates={summary['oi_aggregated_history_duplicates']} | "
@@ -2,6 +2,8 @@
 import logging
 from typing import Any, Dict, List
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -62,22 +64,38 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     
     # 2) OI Aggregated History (OHLC aggregated data across exchanges)
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    if time_params:
+        logger.info(f"Using time parameters: {time_params}")
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_open_interest_aggregated_history",
+            ["symbol", "interval"],
+            filters={"symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     for symbol in SYMBOLS:
         for interval in TIMEFRAMES:
             try:
-                # Pass time parameters if available
-                time_params = {}
-                if "start_time" in params:
-                    time_params["start_time"] = params["start_time"]
-                if "end_time" in params:
-                    time_params["end_time"] = params["end_time"]
-
-                if time_params:
-                    logger.info(f"Using time parameters: {time_params}")
-
+                series_params = time_params or watermark_time_params(
+                    watermarks.get(repo.series_key(symbol, interval)), interval, OVERLAP_BARS
+                )
                 rows = client.get_oi_aggregated_history(
                     symbol=symbol, interval=interval,
-                    unit=UNIT, **time_params
+                    unit=UNIT, **series_params
                 )
                 if rows:
                     saved = repo.upsert_oi_aggregated_history(
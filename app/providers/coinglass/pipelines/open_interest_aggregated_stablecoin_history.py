@@ -3,8 +3,10 @@
 import logging
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import Settings
+from app.core.intervals import incremental_start_time
 
 logger = logging.getLogger(__name__)
 settings = Settings()
@@ -32,6 +34,19 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     if not start_time:
         start_time = int((datetime.now() - timedelta(hours=HOURS_BACK)).timestamp() * 1000)
 
+    # Resume each series from its last stored time unless an explicit start_time was given
+    INCREMENTAL = params.get("incremental", True) and not params.get("start_time")
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_open_interest_aggregated_stablecoin_history",
+            ["exchange_list", "symbol", "interval"],
+            filters={"exchange_list": EXCHANGES, "symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     summary = {
         "open_interest_aggregated_stablecoin_history": 0,
         "open_interest_aggregated_stablecoin_history_duplicates": 0,
@@ -40,42 +55,53 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Starting Open Interest Aggregated Stablecoin History pipeline for exchanges: {EXCHANGES}")
 
-    for symbol in SYMBOLS:
-        for interval in INTERVALS:
-            for exchange in EXCHANGES:
-                try:
-                    logger.info(f"Fetching aggregated stablecoin OI OHLC for {exchange} {symbol} {interval}")
-                    rows = client.get_open_interest_aggregated_stablecoin_history(
-                        exchange_list=exchange,
-                        symbol=symbol,
-                        interval=interval,
-                        start_time=start_time
-                    )
-
-                    if rows:
-                        saved = repo.upsert_open_interest_aggregated_stablecoin_history(
-                            exchange, symbol, interval, rows
-                        )
-                        logger.info(
-                            f"✅ open_interest_aggregated_stablecoin_history[{exchange}:{symbol}:{interval}]: "
-                            f"received={len(rows)}, saved={saved.get('open_interest_aggregated_stablecoin_history', 0)}, duplicates={saved.get('open_interest_aggregated_stablecoin_history_duplicates', 0)}"
-                        )
-                        # Handle both old int format and new dict format for backward compatibility
-                        if isinstance(saved, dict):
-                            summary["open_interest_aggregated_stablecoin_history"] += saved.get("open_interest_aggregated_stablecoin_history", 0)
-                            if saved.get("open_interest_aggregated_stablecoin_history_duplicates", 0) > 0:
-                                summary["open_interest_aggregated_stablecoin_history_duplicates"] = summary.get("open_interest_aggregated_stablecoin_history_duplicates", 0) + saved.get("open_interest_aggregated_stablecoin_history_duplicates", 0)
-                        else:
-                            summary["open_interest_aggregated_stablecoin_history"] += saved
-                    else:
-                        logger.warning(f"No data returned for aggregated stablecoin OI: {exchange} {symbol} {interval}")
-
-                    summary["fetches"] += 1
-
-                except Exception as e:
-                    logger.warning(f"Error fetching aggregated stablecoin OI for {exchange} {symbol}: {e}")
-                    summary["fetches"] += 1
-                    continue
+    tasks = param_grid(symbol=SYMBOLS, interval=INTERVALS, exchange=EXCHANGES)
+
+    def fetch(task):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        series_start = incremental_start_time(
+            watermarks.get(repo.series_key(exchange, symbol, interval)), interval, start_time, OVERLAP_BARS
+        )
+        logger.info(f"Fetching aggregated stablecoin OI OHLC for {exchange} {symbol} {interval}")
+        return client.get_open_interest_aggregated_stablecoin_history(
+            exchange_list=exchange,
+            symbol=symbol,
+            interval=interval,
+            start_time=series_start
+        )
+
+    def build(task, rows):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if not rows:
+            return None
+        return repo.build_open_interest_aggregated_stablecoin_history(
+            exchange, symbol, interval, rows
+        )
+
+    def record(task, rows, saved):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if rows:
+            logger.info(
+                f"✅ open_interest_aggregated_stablecoin_history[{exchange}:{symbol}:{interval}]: "
+                f"received={len(rows)}, saved={saved.get('open_interest_aggregated_stablecoin_history', 0)}, duplicates={saved.get('open_interest_aggregated_stablecoin_history_duplicates', 0)}"
+            )
+            # Handle both old int format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["open_interest_aggregated_stablecoin_history"] += saved.get("open_interest_aggregated_stablecoin_history", 0)
+                if saved.get("open_interest_aggregated_stablecoin_history_duplicates", 0) > 0:
+                    summary["open_interest_aggregated_stablecoin_history_duplicates"] = summary.get("open_interest_aggregated_stablecoin_history_duplicates", 0) + saved.get("open_interest_aggregated_stablecoin_history_duplicates", 0)
+            else:
+                summary["open_interest_aggregated_stablecoin_history"] += saved
+        else:
+            logger.warning(f"No data returned for aggregated stablecoin OI: {exchange} {symbol} {interval}")
+
+        summary["fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(f"Error fetching aggregated stablecoin OI for {task['exchange']} {task['symbol']}: {e}")
+        summary["fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(f"📦 Open Interest Aggregated Stablecoin History pipeline completed. Total records saved: {summary['open_interest_aggregated_stablecoin_history']}, duplicates={summary['open_interest_aggregated_stablecoin_history_duplicates']} ✅")
     return summary
\ No newline at end of file
@@ -3,8 +3,10 @@
 import logging
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import Settings
+from app.core.intervals import incremental_start_time
 
 logger = logging.getLogger(__name__)
 settings = Settings()
@@ -34,6 +36,19 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     if not start_time:
         start_time = int((datetime.now() - timedelta(hours=HOURS_BACK)).timestamp() * 1000)
 
+    # Resume each series from its last stored time unless an explicit start_time was given
+    INCREMENTAL = params.get("incremental", True) and not params.get("start_time")
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_spot_aggregated_taker_volume_history",
+            ["exchange_name", "symbol", "interval"],
+            filters={"exchange_name": EXCHANGES, "symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     end_time = params.get("end_time", int(datetime.now().timestamp() * 1000))
 
     summary = {
@@ -45,44 +60,54 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Starting Spot Aggregated Taker Volume History pipeline for exchanges: {EXCHANGES}")
 
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            for interval in INTERVALS:
-                try:
-                    logger.info(f"Fetching aggregated taker volume history for {exchange} {symbol} {interval}")
-
-                    data = client.get_spot_aggregated_taker_volume_history(
-                        exchange_list=exchange,  # Use single exchange name
-                        symbol=symbol,
-                        interval=interval,
-                        start_time=start_time,
-                        end_time=end_time,
-                        limit=LIMIT,
-                        unit=UNIT
-                    )
-
-                    if data:
-                        # Process and insert data with duplicate checking
-                        result = repo.insert_spot_aggregated_taker_volume_history(exchange, symbol, interval, UNIT, data)
-                        logger.info(
-                            f"✅ spot_aggregated_taker_volume_history[{exchange}:{symbol}:{interval}]: "
-                            f"received={len(data)}, saved={result['saved']}, duplicates={result['duplicates']}"
-                        )
-                        summary["aggregated_taker_volume_history"] += result['saved']
-                        summary["aggregated_taker_volume_history_duplicates"] += result['duplicates']
-                    else:
-                        logger.info(
-                            f"⚠️ spot_aggregated_taker_volume_history[{exchange}:{symbol}:{interval}]: No data (skipped)"
-                        )
-
-                    summary["fetches"] += 1
-
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️ spot_aggregated_taker_volume_history[{exchange}:{symbol}:{interval}]: Exception: {e} (skipped)"
-                    )
-                    summary["errors"] += 1
-                    continue
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, interval=INTERVALS)
+
+    def fetch(task):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        series_start = incremental_start_time(
+            watermarks.get(repo.series_key(exchange, symbol, interval)), interval, start_time, OVERLAP_BARS
+        )
+        logger.info(f"Fetching aggregated taker volume history for {exchange} {symbol} {interval}")
+
+        return client.get_spot_aggregated_taker_volume_history(
+            exchange_list=exchange,  # Use single exchange name
+            symbol=symbol,
+            interval=interval,
+            start_time=series_start,
+            end_time=end_time,
+            limit=LIMIT,
+            unit=UNIT
+        )
+
+    def build(task, data):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if not data:
+            return None
+        return repo.build_spot_aggregated_taker_volume_history(exchange, symbol, interval, UNIT, data)
+
+    def record(task, data, result):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if data:
+            logger.info(
+                f"✅ spot_aggregated_taker_volume_history[{exchange}:{symbol}:{interval}]: "
+                f"received={len(data)}, saved={result['saved']}, duplicates={result['duplicates']}"
+            )
+            summary["aggregated_taker_volume_history"] += result['saved']
+            summary["aggregated_taker_volume_history_duplicates"] += result['duplicates']
+        else:
+            logger.info(
+                f"⚠️ spot_aggregated_taker_volume_history[{exchange}:{symbol}:{interval}]: No data (skipped)"
+            )
+
+        summary["fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ spot_aggregated_taker_volume_history[{task['exchange']}:{task['symbol']}:{task['interval']}]: Exception: {e} (skipped)"
+        )
+        summary["errors"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(f"Spot Aggregated Taker Volume History pipeline completed: {summary}")
     return summary
\ No newline at end of file
@@ -3,8 +3,10 @@
 import logging
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import Settings
+from app.core.intervals import incremental_start_time
 
 logger = logging.getLogger(__name__)
 settings = Settings()
@@ -34,6 +36,19 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     if not start_time:
         start_time = int((datetime.now() - timedelta(days=DAYS_BACK)).timestamp() * 1000)
 
+    # Resume each series from its last stored time unless an explicit start_time was given
+    INCREMENTAL = params.get("incremental", True) and not params.get("start_time")
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_spot_ask_bids_history",
+            ["exchange_name", "symbol", "interval", "range_percent"],
+            filters={"exchange_name": EXCHANGES, "symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     summary = {
         "ask_bids_history": 0,
         "ask_bids_history_duplicates": 0,
@@ -43,59 +58,68 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Starting Spot Ask Bids History pipeline for exchanges: {EXCHANGES}")
 
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            for interval in INTERVALS:
-                for range_percent in RANGES:
-                    try:
-                        logger.info(f"Fetching ask bids history for {exchange} {symbol} {interval} range={range_percent}")
-
-                        data = client.get_spot_ask_bids_history(
-                            exchange=exchange,
-                            symbol=symbol,
-                            interval=interval,
-                            start_time=start_time,
-                            end_time=end_time,
-                            range_percent=range_percent
-                        )
-
-                        if data:
-                            # Process and insert data with duplicate checking
-                            result = repo.upsert_spot_ask_bids_history_batch(
-                                exchange, symbol, interval, range_percent, data
-                            )
-                            received_count = len(data)
-                            saved_count = result['spot_ask_bids_history']
-                            duplicates_count = result['spot_ask_bids_history_duplicates']
-
-                            # Only log if there's activity
-                            if received_count > 0:
-                                logger.info(
-                                    f"✅ ask_bids_history[{exchange}:{symbol}:{interval}:range={range_percent}]: "
-                                    f"received={received_count}, saved={saved_count}, duplicates={duplicates_count}"
-                                )
-
-                                # Log detailed breakdown if there are many duplicates
-                                if duplicates_count > 100:
-                                    logger.info(
-                                        f"📊 High duplicate rate: {duplicates_count}/{received_count} ({duplicates_count/received_count*100:.1f}%) "
-                                        f"- This is normal if multiple records have the same timestamp"
-                                    )
-                            summary["ask_bids_history"] += result['spot_ask_bids_history']
-                            summary["ask_bids_history_duplicates"] += result['spot_ask_bids_history_duplicates']
-                        else:
-                            logger.info(
-                                f"⚠️ ask_bids_history[{exchange}:{symbol}:{interval}:range={range_percent}]: No data (skipped)"
-                            )
-
-                        summary["fetches"] += 1
-
-                    except Exception as e:
-                        logger.warning(
-                            f"⚠️ ask_bids_history[{exchange}:{symbol}:{interval}:range={range_percent}]: Exception: {e} (skipped)"
-                        )
-                        summary["errors"] += 1
-                        continue
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, interval=INTERVALS, range_percent=RANGES)
+
+    def fetch(task):
+        exchange, symbol, interval, range_percent = task["exchange"], task["symbol"], task["interval"], task["range_percent"]
+        series_start = incremental_start_time(
+            watermarks.get(repo.series_key(exchange, symbol, interval, range_percent)), interval, start_time, OVERLAP_BARS
+        )
+        logger.info(f"Fetching ask bids history for {exchange} {symbol} {interval} range={range_percent}")
+
+        return client.get_spot_ask_bids_history(
+            exchange=exchange,
+            symbol=symbol,
+            interval=interval,
+            start_time=series_start,
+            end_time=end_time,
+            range_percent=range_percent
+        )
+
+    def build(task, data):
+        exchange, symbol, interval, range_percent = task["exchange"], task["symbol"], task["interval"], task["range_percent"]
+        if not data:
+            return None
+        return repo.build_spot_ask_bids_history(
+            exchange, symbol, interval, range_percent, data
+        )
+
+    def record(task, data, result):
+        exchange, symbol, interval, range_percent = task["exchange"], task["symbol"], task["interval"], task["range_percent"]
+        if data:
+            received_count = len(data)
+            saved_count = result['spot_ask_bids_history']
+            duplicates_count = result['spot_ask_bids_history_duplicates']
+
+            # Only log if there's activity
+            if received_count > 0:
+                logger.info(
+                    f"✅ ask_bids_history[{exchange}:{symbol}:{interval}:range={range_percent}]: "
+                    f"received={received_count}, saved={saved_count}, duplicates={duplicates_count}"
+                )
+
+                # Log detailed breakdown if there are many duplicates
+                if duplicates_count > 100:
+                    logger.info(
+                        f"📊 High duplicate rate: {duplicates_count}/{received_count} ({duplicates_count/received_count*100:.1f}%) "
+                        f"- This is normal if multiple records have the same timestamp"
+                    )
+            summary["ask_bids_history"] += result['spot_ask_bids_history']
+            summary["ask_bids_history_duplicates"] += result['spot_ask_bids_history_duplicates']
+        else:
+            logger.info(
+                f"⚠️ ask_bids_history[{exchange}:{symbol}:{interval}:range={range_percent}]: No data (skipped)"
+            )
+
+        summary["fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ ask_bids_history[{task['exchange']}:{task['symbol']}:{task['interval']}:range={task['range_percent']}]: Exception: {e} (skipped)"
+        )
+        summary["errors"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(f"Spot Ask Bids History pipeline completed: {summary}")
     return summary
\ No newline at end of file
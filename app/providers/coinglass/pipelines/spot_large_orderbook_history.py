@@ -3,8 +3,10 @@
 import logging
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import Settings
+from app.core.intervals import incremental_start_time
 
 logger = logging.getLogger(__name__)
 settings = Settings()
@@ -34,6 +36,21 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     if not start_time:
         start_time = int((datetime.now() - timedelta(hours=HOURS_BACK)).timestamp() * 1000)
 
+    # Resume each series from its last stored time unless an explicit start_time was given
+    INCREMENTAL = params.get("incremental", True) and not params.get("start_time")
+    # Orders have no candle size: re-request the last OVERLAP_MINUTES behind the newest stored order
+    OVERLAP_MINUTES = params.get("overlap_minutes", 60)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_spot_large_orderbook_history",
+            ["exchange_name", "symbol", "order_state"],
+            filters={"exchange_name": EXCHANGES, "symbol": SYMBOLS},
+            time_column="start_time",
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     end_time = params.get("end_time", int(datetime.now().timestamp() * 1000))
 
     summary = {
@@ -45,42 +62,53 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Starting Spot Large Orderbook History pipeline for exchanges: {EXCHANGES}")
 
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            for state in ORDER_STATES:
-                try:
-                    logger.info(f"Fetching large orderbook history for {exchange} {symbol} state={state}")
-
-                    data = client.get_spot_large_orderbook_history(
-                        exchange=exchange,
-                        symbol=symbol,
-                        start_time=start_time,
-                        end_time=end_time,
-                        state=state
-                    )
-
-                    if data:
-                        # Process and insert data with duplicate checking
-                        result = repo.insert_spot_large_orderbook_history(exchange, symbol, state, data)
-                        logger.info(
-                            f"✅ spot_large_orderbook_history[{exchange}:{symbol}:state={state}]: "
-                            f"received={len(data)}, saved={result['saved']}, duplicates={result['duplicates']}"
-                        )
-                        summary["large_orderbook_history"] += result['saved']
-                        summary["large_orderbook_history_duplicates"] += result['duplicates']
-                    else:
-                        logger.info(
-                            f"⚠️ spot_large_orderbook_history[{exchange}:{symbol}:state={state}]: No data (skipped)"
-                        )
-
-                    summary["fetches"] += 1
-
-                except Exception as e:
-                    logger.warning(
-                        f"⚠️ spot_large_orderbook_history[{exchange}:{symbol}:state={state}]: Exception: {e} (skipped)"
-                    )
-                    summary["errors"] += 1
-                    continue
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, state=ORDER_STATES)
+
+    def fetch(task):
+        exchange, symbol, state = task["exchange"], task["symbol"], task["state"]
+        series_start = incremental_start_time(
+            watermarks.get(repo.series_key(exchange, symbol, state)), None, start_time,
+            overlap_ms=OVERLAP_MINUTES * 60 * 1000,
+        )
+        logger.info(f"Fetching large orderbook history for {exchange} {symbol} state={state}")
+
+        return client.get_spot_large_orderbook_history(
+            exchange=exchange,
+            symbol=symbol,
+            start_time=series_start,
+            end_time=end_time,
+            state=state
+        )
+
+    def build(task, data):
+        exchange, symbol, state = task["exchange"], task["symbol"], task["state"]
+        if not data:
+            return None
+        return repo.build_spot_large_orderbook_history(exchange, symbol, state, data)
+
+    def record(task, data, result):
+        exchange, symbol, state = task["exchange"], task["symbol"], task["state"]
+        if data:
+            logger.info(
+                f"✅ spot_large_orderbook_history[{exchange}:{symbol}:state={state}]: "
+                f"received={len(data)}, saved={result['saved']}, duplicates={result['duplicates']}"
+            )
+            summary["large_orderbook_history"] += result['saved']
+            summary["large_orderbook_history_duplicates"] += result['duplicates']
+        else:
+            logger.info(
+                f"⚠️ spot_large_orderbook_history[{exchange}:{symbol}:state={state}]: No data (skipped)"
+            )
+
+        summary["fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(
+            f"⚠️ spot_large_orderbook_history[{task['exchange']}:{task['symbol']}:state={task['state']}]: Exception: {e} (skipped)"
+        )
+        summary["errors"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(f"Spot Large Orderbook History pipeline completed: {summary}")
     return summary
\ No newline at end of file
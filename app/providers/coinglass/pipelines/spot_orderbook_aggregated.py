@@ -5,6 +5,7 @@ from typing import Any, Dict, List
 from datetime import datetime, timedelta
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import Settings
+from app.core.intervals import incremental_start_time
 
 logger = logging.getLogger(__name__)
 settings = Settings()
@@ -33,6 +34,19 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
     if not start_time:
         start_time = int((datetime.now() - timedelta(hours=HOURS_BACK)).timestamp() * 1000)
 
+    # Resume each series from its last stored time unless an explicit start_time was given
+    INCREMENTAL = params.get("incremental", True) and not params.get("start_time")
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_spot_orderbook_aggregated",
+            ["exchange_name", "symbol", "interval", "range_percent"],
+            filters={"exchange_name": EXCHANGES, "symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
     summary = {
         "spot_orderbook_aggregated": 0,
         "spot_orderbook_aggregated_duplicates": 0,
@@ -46,13 +60,16 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
             for interval in INTERVALS:
                 for range_percent in RANGES:
                     try:
+                        series_start = incremental_start_time(
+                            watermarks.get(repo.series_key(exchange, symbol, interval, range_percent)), interval, start_time, OVERLAP_BARS
+                        )
                         logger.info(f"Fetching aggregated spot orderbook for {exchange} {symbol} {interval} range={range_percent}")
                         rows = client.get_spot_orderbook_aggregated(
                             exchange_list=exchange,  # Use single exchange name
                             symbol=symbol,
                             interval=interval,
                             range_percent=range_percent,
-                            start_time=start_time
+                            start_time=series_start
                         )
 
                         if rows:
@@ -1,7 +1,10 @@
 import logging
 from typing import Any, Dict, List
 from datetime import datetime, timedelta
+from app.providers.coinglass.fanout import fan_out, param_grid
 from app.repositories.coinglass_repository import CoinglassRepository
+from app.core.config import settings
+from app.core.intervals import watermark_time_params
 
 logger = logging.getLogger(__name__)
 
@@ -31,53 +34,77 @@ def run(conn, client, params: Dict[str, Any]) -> Dict[str, Any]:
 
     logger.info(f"Starting Spot Price History pipeline for symbols: {SYMBOLS}")
 
-    for exchange in EXCHANGES:
-        for symbol in SYMBOLS:
-            for interval in INTERVALS:
-                try:
-                    logger.info(f"Fetching spot price history for {exchange} {symbol} {interval}")
-
-                    # Pass time parameters if available
-                    time_params = {}
-                    if "start_time" in params:
-                        time_params["start_time"] = params["start_time"]
-                    if "end_time" in params:
-                        time_params["end_time"] = params["end_time"]
-
-                    if time_params:
-                        logger.info(f"Using time parameters: {time_params}")
-
-                    rows = client.get_spot_price_history(
-                        exchange=exchange,
-                        symbol=symbol,
-                        interval=interval,
-                        **time_params
-                    )
-
-                    if rows:
-                        saved = repo.upsert_spot_price_history(
-                            exchange, symbol, interval, rows
-                        )
-                        logger.info(
-                            f"✅ spot_price_history[{exchange}:{symbol}:{interval}]: "
-                            f"received={len(rows)}, saved={saved.get('spot_price_history', 0)}, duplicates={saved.get('spot_price_history_duplicates', 0)}"
-                        )
-                        # Handle both old int format and new dict format for backward compatibility
-                        if isinstance(saved, dict):
-                            summary["spot_price_history"] += saved.get("spot_price_history", 0)
-                            if saved.get("spot_price_history_duplicates", 0) > 0:
-                                summary["spot_price_history_duplicates"] = summary.get("spot_price_history_duplicates", 0) + saved.get("spot_price_history_duplicates", 0)
-                        else:
-                            summary["spot_price_history"] += saved
-                    else:
-                        logger.warning(f"No data returned for spot price history: {exchange} {symbol} {interval}")
-
-                    summary["fetches"] += 1
-
-                except Exception as e:
-                    logger.warning(f"Error fetching spot price history for {exchange} {symbol}: {e}")
-                    summary["fetches"] += 1
-                    continue
+    # Pass time parameters if available
+    time_params = {}
+    if "start_time" in params:
+        time_params["start_time"] = params["start_time"]
+    if "end_time" in params:
+        time_params["end_time"] = params["end_time"]
+
+    if time_params:
+        logger.info(f"Using time parameters: {time_params}")
+
+    # Resume each series from its last stored time unless an explicit window was given
+    INCREMENTAL = params.get("incremental", True) and not time_params
+    OVERLAP_BARS = params.get("overlap_bars", settings.WATERMARK_OVERLAP_BARS)
+    watermarks = (
+        repo.get_time_watermarks(
+            "cg_spot_price_history",
+            ["exchange", "symbol", "interval"],
+            filters={"exchange": EXCHANGES, "symbol": SYMBOLS},
+        )
+        if INCREMENTAL
+        else {}
+    )
+
+    tasks = param_grid(exchange=EXCHANGES, symbol=SYMBOLS, interval=INTERVALS)
+
+    def fetch(task):
+        logger.info(f"Fetching spot price history for {task['exchange']} {task['symbol']} {task['interval']}")
+        series_params = time_params or watermark_time_params(
+            watermarks.get(repo.series_key(task["exchange"], task["symbol"], task["interval"])),
+            task["interval"],
+            OVERLAP_BARS,
+        )
+        return client.get_spot_price_history(
+            exchange=task["exchange"],
+            symbol=task["symbol"],
+            interval=task["interval"],
+            **series_params
+        )
+
+    def build(task, rows):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if not rows:
+            return None
+        return repo.build_spot_price_history(
+            exchange, symbol, interval, rows
+        )
+
+    def record(task, rows, saved):
+        exchange, symbol, interval = task["exchange"], task["symbol"], task["interval"]
+        if rows:
+            logger.info(
+                f"✅ spot_price_history[{exchange}:{symbol}:{interval}]: "
+                f"received={len(rows)}, saved={saved.get('spot_price_history', 0)}, duplicates={saved.get('spot_price_history_duplicates', 0)}"
+            )
+            # Handle both old int format and new dict format for backward compatibility
+            if isinstance(saved, dict):
+                summary["spot_price_history"] += saved.get("spot_price_history", 0)
+                if saved.get("spot_price_history_duplicates", 0) > 0:
+                    summary["spot_price_history_duplicates"] = summary.get("spot_price_history_duplicates", 0) + saved.get("spot_price_history_duplicates", 0)
+            else:
+                summary["spot_price_history"] += saved
+        else:
+            logger.warning(f"No data returned for spot price history: {exchange} {symbol} {interval}")
+
+        summary["fetches"] += 1
+
+    def on_error(task, e):
+        logger.warning(f"Error fetching spot price history for {task['exchange']} {task['symbol']}: {e}")
+        summary["fetches"] += 1
+
+    fan_out(tasks, fetch, build, record, repo.write_batches, on_error)
 
     logger.info(f"📦 Spot Price History pipeline completed. Total records saved: {summary['spot_price_history']}, duplicates={summary['spot_price_history_duplicates']} ✅")
     return summary
\ No newline at end of file
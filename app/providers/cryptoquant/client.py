@@ -4,6 +4,7 @@ from urllib.parse import urlencode
 from datetime import datetime, timedelta
 from app.core.logging import setup_logger
 from app.core.config import Settings
+from app.core.http import get_session
 
 
 class CryptoQuantClient:
@@ -18,6 +19,12 @@ class CryptoQuantClient:
         if not self.api_key:
             raise ValueError("CRYPTOQUANT_API_KEY is required")
         self.headers = {"accept": "application/json", "Authorization": f"Bearer {self.api_key}"}
+        # Keep-alive pool shared by every CryptoQuantClient in the process
+        self.session = get_session("cryptoquant")
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Connection pool hit/miss counters (hits = requests that reused a connection)."""
+        return self.session.stats()
 
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Any:
         url = f"{self.BASE_URL}/{endpoint}"
@@ -36,7 +43,7 @@ class CryptoQuantClient:
                     timeout = 15 + (attempt * 5)
                     self.logger.debug(f"[CryptoQuant] Attempt {attempt + 1}/3 with timeout {timeout}s")
 
-                    resp = requests.get(
+                    resp = self.session.get(
                         url,
                         headers=self.headers,
                         timeout=timeout,
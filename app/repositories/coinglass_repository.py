@@ -1,68 +1,124 @@
 # app/repositories/coinglass_repository.py
+import hashlib
 import logging
 import pymysql
-from typing import Any, Dict, List, Optional
-from app.models.coinglass import COINGLASS_TABLES
+from collections import Counter
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.core.heatmap_codec import HeatmapMatrix, decode_heatmap, encode_heatmap
+from app.core.snapshot_delta import apply_delta, decode_payload, diff_snapshot, encode_payload, snapshot_hash
+from app.models.coinglass import COINGLASS_TABLES, INGESTION_LEDGER
 import time
 
 logger = logging.getLogger(__name__)
 
+# MySQL errors after which the server has already rolled back the whole transaction:
+# deadlock, server gone away, lost connection
+TRANSACTION_ABORTED_ERRORS = (1213, 2006, 2013)
+
+
+def upsert_counts(result_key: str) -> Callable[[int, int, int], Dict[str, int]]:
+    """RowBatch tally for the usual result shape: inserted rows, and updated or repeated rows as duplicates."""
+    return lambda inserted, updated, batch_duplicates: {
+        result_key: inserted,
+        f"{result_key}_duplicates": updated + batch_duplicates,
+    }
+
+
+@dataclass
+class RowBatch:
+    """
+    One series' rows, built from an API response without touching the database.
+
+    CoinglassRepository.write_batches() writes batches; `tally(inserted,
+    updated, batch_duplicates)` turns the batch's share of that write into
+    the caller's result dict, followed by `result` (counters the builder
+    already knows, e.g. filtered rows). `label` names the series in logs.
+    """
+
+    table: str
+    columns: List[str]
+    rows: List[Sequence[Any]]
+    key_columns: Optional[List[str]]
+    update_columns: List[str]
+    tally: Callable[[int, int, int], Dict[str, int]]
+    label: str
+    result: Optional[Dict[str, int]] = None
+
+    def counts(self, inserted: int = 0, updated: int = 0, batch_duplicates: int = 0) -> Dict[str, int]:
+        return {**self.tally(inserted, updated, batch_duplicates), **(self.result or {})}
+
 
 class CoinglassRepository:
     def __init__(self, conn, logger_=None):
         self.conn = conn
         self.logger = logger_ or logger
 
+    @staticmethod
+    def _normalize_key_value(value: Any) -> str:
+        """Render a key value the same way whether it came from Python or MySQL."""
+        if isinstance(value, bool):
+            return str(int(value))
+        if isinstance(value, (int, float, Decimal)):
+            normalized = Decimal(str(value)).normalize()
+            # normalize() turns 100 into 1E+2; print integers plainly
+            return format(normalized, "f")
+        return str(value)
+
+    @classmethod
+    def _collation_key(cls, values: Sequence[Any]) -> Tuple[str, ...]:
+        """
+        Key as the unique index compares it: normalized, and case-folded like
+        the tables' case-insensitive utf8mb4 collation, so "binance" and
+        "Binance" are the same row.
+        """
+        return tuple(cls._normalize_key_value(v).lower() for v in values)
+
+    def _existing_keys(
+        self, cur, table_name: str, key_columns: List[str], keys: List[Sequence[Any]], chunk_size: Optional[int] = None
+    ) -> set:
+        """
+        Return the _collation_key() tuples from `keys` that already exist in `table_name`.
+
+        Uses a row-constructor `(a, b, ...) IN ((...), (...))` predicate, which
+        MySQL resolves as range lookups on the unique index, in bounded chunks.
+        It matches under the column collation, so returned keys are case-folded
+        the same way before callers compare them.
+        """
+        existing = set()
+        if not keys:
+            return existing
+
+        column_sql = ", ".join(f"`{col}`" for col in key_columns)
+        tuple_sql = "(" + ", ".join(["%s"] * len(key_columns)) + ")"
+        chunk_size = chunk_size or settings.DB_BULK_CHUNK_SIZE
+
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            sql = (
+                f"SELECT {column_sql} FROM {table_name} "
+                f"WHERE ({column_sql}) IN ({', '.join([tuple_sql] * len(chunk))})"
+            )
+            cur.execute(sql, [value for key in chunk for value in key])
+            for row in cur.fetchall():
+                existing.add(self._collation_key([row[col] for col in key_columns]))
+
+        return existing
+
     def check_existing_records(self, table_name: str, unique_keys: List[Dict]) -> Dict[str, bool]:
         """Check which records already exist in the database."""
         if not unique_keys:
             return {}
 
-        existing_records = set()
-
-        # Build WHERE clause for checking existing records
-        placeholders = []
-        values = []
-
         # Get column names from the first key dict
-        first_key = unique_keys[0]
-        columns = list(first_key.keys())
-
-        for key_dict in unique_keys:
-            # Create a composite key for each unique combination
-            key_parts = []
-            key_values = []
-            for column, value in key_dict.items():
-                # Properly quote column names that might be reserved words
-                quoted_column = f"`{column}`" if column in ['time', 'interval'] else column
-                key_parts.append(f"{quoted_column} = %s")
-                key_values.append(value)
-
-            placeholders.append(f"({' AND '.join(key_parts)})")
-            values.extend(key_values)
-
-        # Get table name and primary key columns
-        where_clause = " OR ".join(placeholders)
-
-        # Build CONCAT_WS with properly quoted column names
-        quoted_columns = []
-        for col in columns:
-            quoted_col = f"`{col}`" if col in ['time', 'interval'] else col
-            quoted_columns.append(quoted_col)
-
-        # Query to check existing records
-        sql = f"""
-        SELECT CONCAT_WS('|', {', '.join(quoted_columns)}) as record_key
-        FROM {table_name}
-        WHERE {where_clause}
-        """
+        columns = list(unique_keys[0].keys())
+        keys = [tuple(key_dict[col] for col in columns) for key_dict in unique_keys]
 
         try:
             with self.conn.cursor() as cur:
-                cur.execute(sql, values)
-                results = cur.fetchall()
-                existing_records = {row[0] for row in results}
-
+                existing_records = self._existing_keys(cur, table_name, columns, keys)
         except Exception as e:
             self.logger.error(f"Error checking existing records in {table_name}: {e}")
             # Assume all records are new if check fails
@@ -70,9 +126,9 @@ class CoinglassRepository:
 
         # Return dict indicating which records exist
         result = {}
-        for key_dict in unique_keys:
+        for key_dict, key in zip(unique_keys, keys):
             record_key = '|'.join(str(v) for v in key_dict.values())
-            result[record_key] = record_key in existing_records
+            result[record_key] = self._collation_key(key) in existing_records
 
         return result
 
@@ -86,6 +142,583 @@ class CoinglassRepository:
 
         return duplicate_count
 
+    def _bulk_upsert(
+        self,
+        cur,
+        table: str,
+        columns: List[str],
+        rows: List[Sequence[Any]],
+        key_columns: Optional[List[str]] = None,
+        update_columns: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
+        inserted_keys: Optional[set] = None,
+    ) -> Tuple[int, int, int]:
+        """
+        Write rows with multi-row INSERT ... ON DUPLICATE KEY UPDATE statements.
+
+        Rows go out `chunk_size` at a time (DB_BULK_CHUNK_SIZE by default), so a
+        1000-row response costs one or two round trips instead of 1000. Rows that
+        repeat a key_columns value already seen in the batch are collapsed (the
+        last one wins, like sequential upserts) and reported as batch duplicates;
+        keys are compared case-insensitively, like the unique index does.
+        With key_columns, each chunk is probed first (_existing_keys) and rows
+        whose key is already stored count as updates. The probe stays because
+        the ledger needs per-row inserted flags, and affected rows stop adding
+        up once a row is rewritten within the same second (it counts 0, not 2).
+        Without key_columns, inserts vs updates come from the affected-rows
+        total: MySQL counts 1 per inserted row and 2 per updated row, and every
+        update touches updated_at.
+        Without update_columns a plain INSERT is sent. Tables listed in
+        INGESTION_LEDGER also get their cg_ingestion_stats rows updated in the
+        same transaction. With key_columns, the _collation_key() of every
+        inserted row is added to `inserted_keys` when one is passed. The
+        caller commits.
+
+        Returns:
+            (inserted, updated, batch_duplicates)
+        """
+        if not rows:
+            return 0, 0, 0
+
+        batch_duplicates = 0
+        if key_columns:
+            key_idx = [columns.index(col) for col in key_columns]
+            unique_rows: Dict[tuple, Sequence[Any]] = {}
+            for row in rows:
+                unique_rows[self._collation_key([row[i] for i in key_idx])] = row
+            batch_duplicates = len(rows) - len(unique_rows)
+            rows = list(unique_rows.values())
+
+        column_sql = ", ".join(f"`{col}`" for col in columns)
+        row_sql = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        update_sql = ""
+        if update_columns:
+            update_sql = " ON DUPLICATE KEY UPDATE " + ", ".join(
+                [f"`{col}`=VALUES(`{col}`)" for col in update_columns] + ["updated_at=CURRENT_TIMESTAMP"]
+            )
+
+        chunk_size = chunk_size or settings.DB_BULK_CHUNK_SIZE
+        inserted = 0
+        updated = 0
+        ledger: Dict[str, List[Any]] = {}
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            sql = f"INSERT INTO {table} ({column_sql}) VALUES {', '.join([row_sql] * len(chunk))}{update_sql}"
+            if key_columns:
+                chunk_keys = [tuple(row[i] for i in key_idx) for row in chunk]
+                existing = self._existing_keys(cur, table, key_columns, chunk_keys, chunk_size)
+                is_new = [self._collation_key(key) not in existing for key in chunk_keys]
+                cur.execute(sql, [value for row in chunk for value in row])
+                if inserted_keys is not None:
+                    inserted_keys.update(
+                        self._collation_key(key) for key, new in zip(chunk_keys, is_new) if new
+                    )
+                chunk_inserted = sum(is_new)
+            else:
+                affected = cur.execute(sql, [value for row in chunk for value in row])
+                # affected = inserted + 2 * updated
+                chunk_inserted = max(0, min(len(chunk), 2 * len(chunk) - affected)) if update_columns else affected
+                is_new = None
+            inserted += chunk_inserted
+            updated += len(chunk) - chunk_inserted
+            if table in INGESTION_LEDGER:
+                self._tally_ingestion(ledger, table, columns, chunk, is_new, chunk_inserted)
+
+        if ledger:
+            self._write_ingestion_stats(cur, table, ledger)
+
+        return inserted, updated, batch_duplicates
+
+    def write_batches(self, batches: List[RowBatch]) -> List[Dict[str, int]]:
+        """
+        Write RowBatches in one transaction and return each batch's result, in order.
+
+        Batches with the same table and column layout are coalesced into one
+        _bulk_upsert, so N series of a pipeline cost one probe/insert per
+        chunk and a single commit instead of N of each. Batches without
+        key_columns are written on their own (their counts come from affected
+        rows) but share the commit. If the combined write fails it is rolled
+        back and every batch is retried alone, so one bad series does not
+        cost the others their rows.
+        """
+        pending = [(idx, batch) for idx, batch in enumerate(batches) if batch.rows]
+        counts: Dict[int, Tuple[int, int, int]] = {}
+        if pending:
+            try:
+                with self.conn.cursor() as cur:
+                    for group in self._group_batches(pending):
+                        counts.update(self._write_batch_group(cur, group))
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                if len(pending) > 1:
+                    self.logger.warning(
+                        f"⚠️ Combined write of {len(pending)} batches failed, writing them one by one: {e}"
+                    )
+                    return [self.write_batches([batch])[0] for batch in batches]
+                self._log_batch_error(pending[0][1], e)
+                counts = {}
+        return [batch.counts(*counts.get(idx, (0, 0, 0))) for idx, batch in enumerate(batches)]
+
+    @staticmethod
+    def _group_batches(pending: List[Tuple[int, RowBatch]]) -> List[List[Tuple[int, RowBatch]]]:
+        groups: Dict[Any, List[Tuple[int, RowBatch]]] = {}
+        for idx, batch in pending:
+            if batch.key_columns:
+                key = (batch.table, tuple(batch.columns), tuple(batch.key_columns), tuple(batch.update_columns))
+            else:
+                key = idx
+            groups.setdefault(key, []).append((idx, batch))
+        return list(groups.values())
+
+    def _write_batch_group(self, cur, group: List[Tuple[int, RowBatch]]) -> Dict[int, Tuple[int, int, int]]:
+        """Upsert one group of same-layout batches; returns (inserted, updated, batch_duplicates) per batch."""
+        first = group[0][1]
+        if len(group) == 1:
+            return {group[0][0]: self._bulk_upsert(
+                cur, first.table, first.columns, first.rows, first.key_columns, first.update_columns
+            )}
+
+        # A key repeated across batches is written once, last batch wins (as in _bulk_upsert)
+        key_idx = [first.columns.index(col) for col in first.key_columns]
+        owner = {}
+        for idx, batch in group:
+            for row in batch.rows:
+                owner[self._collation_key([row[i] for i in key_idx])] = idx
+
+        inserted_keys: set = set()
+        self._bulk_upsert(
+            cur, first.table, first.columns, [row for _, batch in group for row in batch.rows],
+            first.key_columns, first.update_columns, inserted_keys=inserted_keys,
+        )
+        owned = Counter(owner.values())
+        inserted = Counter(owner[key] for key in inserted_keys)
+        return {
+            idx: (inserted[idx], owned[idx] - inserted[idx], len(batch.rows) - owned[idx])
+            for idx, batch in group
+        }
+
+    def _log_batch_error(self, batch: RowBatch, e: Exception) -> None:
+        if isinstance(e, pymysql.Error):
+            error_code = e.args[0] if e.args else 'unknown'
+            error_msg = e.args[1] if len(e.args) > 1 else str(e)
+            self.logger.error(
+                f"Database error upserting {batch.label} - "
+                f"Error code: {error_code}, Message: {error_msg}"
+            )
+        else:
+            self.logger.error(
+                f"Unexpected error upserting {batch.label} - "
+                f"Type: {type(e).__name__}, Message: {str(e)}"
+            )
+
+    def _upsert_parent(self, cur, table: str, values: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Insert a parent row, or touch the one with the same unique key, and return (id, inserted).
+
+        ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id) makes cursor.lastrowid
+        carry the existing row's id on updates too, so no SELECT is needed
+        to find it (one is only issued if the server reports no id).
+        """
+        columns = list(values)
+        column_sql = ", ".join(f"`{col}`" for col in columns)
+        affected = cur.execute(
+            f"INSERT INTO {table} ({column_sql}) VALUES ({', '.join(['%s'] * len(columns))}) "
+            f"ON DUPLICATE KEY UPDATE id=LAST_INSERT_ID(id), updated_at=CURRENT_TIMESTAMP",
+            list(values.values()),
+        )
+        parent_id = cur.lastrowid
+        if not parent_id:
+            cur.execute(
+                f"SELECT id FROM {table} WHERE {' AND '.join(f'`{col}`=%s' for col in columns)}",
+                list(values.values()),
+            )
+            parent_id = cur.fetchone()["id"]
+        return parent_id, affected == 1
+
+    def _bulk_replace_children(
+        self,
+        cur,
+        parent_id: int,
+        children: Sequence[Tuple[str, str, List[str], List[Sequence[Any]]]],
+        replace: bool = True,
+    ) -> int:
+        """
+        Replace a parent's child rows, one (table, parent_column, columns, rows) entry per child table.
+
+        Existing rows are deleted first unless `replace` is False (a parent
+        that was just inserted has none), then `rows` go out as chunked
+        multi-row INSERTs with `parent_id` prepended. The caller commits.
+        Returns the number of child rows inserted.
+        """
+        inserted = 0
+        for table, parent_column, columns, rows in children:
+            if replace:
+                cur.execute(f"DELETE FROM {table} WHERE `{parent_column}`=%s", (parent_id,))
+            written, _, _ = self._bulk_upsert(
+                cur, table, [parent_column, *columns], [(parent_id, *row) for row in rows]
+            )
+            inserted += written
+        return inserted
+
+    # ===== INGESTION STATS LEDGER =====
+    # Tables whose ledger rows are known to cover their history (seeded), per process
+    _ledger_seeded: set = set()
+    _ledger_disabled = False
+
+    def _tally_ingestion(
+        self,
+        ledger: Dict[str, List[Any]],
+        table: str,
+        columns: List[str],
+        chunk: List[Sequence[Any]],
+        is_new: Optional[List[bool]],
+        chunk_inserted: int,
+    ) -> None:
+        """
+        Accumulate [new rows, min time, max time] per series for one written chunk.
+
+        `is_new` flags rows that were inserted; without it only the chunk total
+        is known and it is attributed to the chunk's series in row order
+        (repository methods write one series per call, so this is exact there).
+        """
+        time_column, series_columns = INGESTION_LEDGER[table]
+        series_idx = [columns.index(col) for col in series_columns]
+        time_idx = columns.index(time_column) if time_column in columns else None
+        write_time = int(time.time() * 1000)
+        remaining = chunk_inserted
+
+        for pos, row in enumerate(chunk):
+            key = ":".join(self.series_key(*(row[i] for i in series_idx)))
+            entry = ledger.setdefault(key, [0, None, None])
+            if is_new is not None:
+                entry[0] += int(is_new[pos])
+            elif remaining > 0:
+                entry[0] += 1
+                remaining -= 1
+
+            if time_column is None:
+                row_time = write_time
+            elif time_idx is not None and row[time_idx] is not None:
+                row_time = int(row[time_idx])
+            else:
+                continue
+            entry[1] = row_time if entry[1] is None else min(entry[1], row_time)
+            entry[2] = row_time if entry[2] is None else max(entry[2], row_time)
+
+    def _write_ingestion_stats(self, cur, table: str, ledger: Dict[str, List[Any]]) -> None:
+        """
+        Fold a batch's per-series tallies into cg_ingestion_stats (same transaction as the batch).
+
+        Only tables seeded by migrate_tables.py / rebuild_ingestion_stats()
+        are tallied; until then readers find no ledger rows and scan the
+        table. The write runs under a savepoint, so a failed ledger update is
+        rolled back on its own and never fails the batch. Errors that already
+        aborted the whole transaction (deadlocks, lost connections) re-raise
+        so the caller rolls back instead of committing a batch that is gone.
+        """
+        cls = CoinglassRepository
+        if cls._ledger_disabled:
+            return
+
+        cur.execute("SAVEPOINT ingestion_stats")
+        try:
+            if table not in cls._ledger_seeded:
+                cur.execute("SELECT 1 FROM cg_ingestion_stats WHERE table_name = %s LIMIT 1", (table,))
+                if not cur.fetchone():
+                    return
+                cls._ledger_seeded.add(table)
+
+            values = []
+            for key, (new_rows, min_time, max_time) in ledger.items():
+                values.extend([table, key, new_rows, min_time, max_time])
+            cur.execute(
+                f"""
+                INSERT INTO cg_ingestion_stats (table_name, series_key, row_count, min_time, max_time, last_write_at)
+                VALUES {', '.join(['(%s, %s, %s, %s, %s, NOW(3))'] * len(ledger))}
+                ON DUPLICATE KEY UPDATE
+                    row_count = row_count + VALUES(row_count),
+                    min_time = IF(min_time IS NULL OR VALUES(min_time) < min_time, VALUES(min_time), min_time),
+                    max_time = IF(max_time IS NULL OR VALUES(max_time) > max_time, VALUES(max_time), max_time),
+                    last_write_at = VALUES(last_write_at)
+                """,
+                values,
+            )
+        except Exception as e:
+            if isinstance(e, pymysql.Error) and e.args and e.args[0] in TRANSACTION_ABORTED_ERRORS:
+                raise
+            try:
+                cur.execute("ROLLBACK TO SAVEPOINT ingestion_stats")
+            except pymysql.Error:
+                # The savepoint went with the transaction
+                raise e
+            if isinstance(e, pymysql.err.ProgrammingError):
+                # Table missing (run --setup); stop trying for this process
+                cls._ledger_disabled = True
+                self.logger.warning(f"Ingestion stats ledger disabled: {e}")
+            else:
+                self.logger.warning(f"Could not update ingestion stats for {table}: {e}")
+
+    def _seed_ingestion_stats(self, cur, table: str) -> None:
+        """
+        Rebuild a table's ledger rows from a grouped scan of the table.
+
+        Only run from migrate_tables.py / rebuild_ingestion_stats(), never on
+        the ingestion path. Rows are upserted, so two concurrent seeds of the
+        same table converge instead of failing on the primary key. An empty
+        table gets a zero-row marker so pipelines start tallying it.
+        """
+        time_column, series_columns = INGESTION_LEDGER[table]
+        if time_column is None:
+            min_sql = "UNIX_TIMESTAMP(MIN(updated_at)) * 1000"
+            max_sql = "UNIX_TIMESTAMP(MAX(updated_at)) * 1000"
+        else:
+            min_sql = f"MIN(`{time_column}`)"
+            max_sql = f"MAX(`{time_column}`)"
+        cols_sql = ", ".join(f"`{c}`" for c in series_columns)
+        select_cols = f"{cols_sql}, " if series_columns else ""
+        group_sql = f"GROUP BY {cols_sql}" if series_columns else ""
+
+        cur.execute(
+            f"""
+            SELECT {select_cols}COUNT(*) AS row_count, {min_sql} AS min_time, {max_sql} AS max_time
+            FROM {table}
+            {group_sql}
+            """
+        )
+        rows = cur.fetchall()
+        cur.execute("DELETE FROM cg_ingestion_stats WHERE table_name = %s", (table,))
+        values = []
+        for row in rows:
+            if not row["row_count"]:
+                continue
+            key = ":".join(self.series_key(*(row[c] for c in series_columns)))
+            values.extend([
+                table, key, row["row_count"],
+                int(row["min_time"]) if row["min_time"] is not None else None,
+                int(row["max_time"]) if row["max_time"] is not None else None,
+            ])
+        series = len(values) // 5
+        if not values:
+            values = [table, "", 0, None, None]
+        cur.execute(
+            f"""
+            INSERT INTO cg_ingestion_stats (table_name, series_key, row_count, min_time, max_time, last_write_at)
+            VALUES {', '.join(['(%s, %s, %s, %s, %s, NOW(3))'] * (len(values) // 5))}
+            ON DUPLICATE KEY UPDATE
+                row_count = VALUES(row_count),
+                min_time = VALUES(min_time),
+                max_time = VALUES(max_time),
+                last_write_at = VALUES(last_write_at)
+            """,
+            values,
+        )
+        self.logger.info(f"📒 Ingestion stats seeded for {table}: {series} series")
+
+    def rebuild_ingestion_stats(self, tables: Optional[List[str]] = None) -> Dict[str, int]:
+        """Recount ledger rows for `tables` (all INGESTION_LEDGER tables by default); returns series per table."""
+        result = {}
+        for table in tables or list(INGESTION_LEDGER):
+            try:
+                with self.conn.cursor() as cur:
+                    self._seed_ingestion_stats(cur, table)
+                    cur.execute(
+                        "SELECT COALESCE(SUM(row_count > 0), 0) AS series FROM cg_ingestion_stats WHERE table_name = %s",
+                        (table,),
+                    )
+                    result[table] = int(cur.fetchone()["series"])
+                self.conn.commit()
+                CoinglassRepository._ledger_seeded.add(table)
+            except Exception as e:
+                self.conn.rollback()
+                self.logger.warning(f"Could not rebuild ingestion stats for {table}: {e}")
+        return result
+
+    def get_ingestion_stats(self, tables: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Ledger totals per table: row_count, min_time, max_time, series and last_write_at (ms).
+
+        Tables without ledger rows are absent, so callers can fall back to scanning them.
+        """
+        where_sql = ""
+        args: Tuple[Any, ...] = ()
+        if tables:
+            where_sql = f"WHERE table_name IN ({', '.join(['%s'] * len(tables))})"
+            args = tuple(tables)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT table_name, SUM(row_count) AS row_count, MIN(min_time) AS min_time,
+                           MAX(max_time) AS max_time, SUM(row_count > 0) AS series,
+                           UNIX_TIMESTAMP(MAX(last_write_at)) * 1000 AS last_write_at
+                    FROM cg_ingestion_stats
+                    {where_sql}
+                    GROUP BY table_name
+                    """,
+                    args,
+                )
+                return {
+                    row["table_name"]: {
+                        "row_count": int(row["row_count"] or 0),
+                        "min_time": int(row["min_time"]) if row["min_time"] is not None else None,
+                        "max_time": int(row["max_time"]) if row["max_time"] is not None else None,
+                        "series": int(row["series"] or 0),
+                        "last_write_at": int(row["last_write_at"]) if row["last_write_at"] is not None else None,
+                    }
+                    for row in cur.fetchall()
+                }
+        except Exception as e:
+            self.logger.warning(f"Could not read ingestion stats: {e}")
+            return {}
+
+    # ===== SNAPSHOT HISTORY =====
+    _snapshot_disabled = False
+
+    def _load_snapshot(
+        self, cur, dataset: str, series_key: str, at: Optional[int] = None
+    ) -> Optional[Tuple[int, str, int, Dict[str, List[Any]]]]:
+        """
+        Rebuild the version in force at `at` (ms; default: latest) from its keyframe and deltas.
+
+        Reads the nearest keyframe at or before `at` plus the deltas after
+        it, at most SNAPSHOT_KEYFRAME_INTERVAL rows, through the
+        (dataset, series_key, version_time) key.
+        """
+        at_sql = "AND version_time <= %s" if at is not None else ""
+        args = [dataset, series_key] + ([at] if at is not None else [])
+        cur.execute(
+            f"""
+            SELECT version_time FROM cg_snapshot_history
+            WHERE dataset=%s AND series_key=%s AND is_keyframe=1 {at_sql}
+            ORDER BY version_time DESC LIMIT 1
+            """,
+            args,
+        )
+        keyframe = cur.fetchone()
+        if not keyframe:
+            return None
+
+        cur.execute(
+            f"""
+            SELECT version_time, is_keyframe, chain_position, content_hash, payload
+            FROM cg_snapshot_history
+            WHERE dataset=%s AND series_key=%s AND version_time >= %s {at_sql}
+            ORDER BY version_time
+            """,
+            [dataset, series_key, keyframe["version_time"]] + ([at] if at is not None else []),
+        )
+        state: Dict[str, List[Any]] = {}
+        row = None
+        for row in cur.fetchall():
+            payload = decode_payload(row["payload"])
+            state = payload if row["is_keyframe"] else apply_delta(state, payload)
+        return int(row["version_time"]), row["content_hash"], int(row["chain_position"]), state
+
+    def _record_snapshot(self, cur, dataset: str, series_key: str, sets: Dict[str, List[Any]]) -> int:
+        """
+        Append a version of `sets` to cg_snapshot_history unless it matches the latest one.
+
+        A version is stored as a delta against the previous one, or as a
+        keyframe (the full snapshot) every SNAPSHOT_KEYFRAME_INTERVAL versions
+        and whenever the delta would not be smaller. Runs in the caller's
+        transaction under a savepoint, like _write_ingestion_stats(): a failed
+        version write is rolled back on its own, while errors that aborted
+        the whole transaction re-raise. The previous version is rebuilt from
+        the table only when the content changed. Returns 1 if a version was
+        written.
+        """
+        cls = CoinglassRepository
+        if cls._snapshot_disabled or not settings.SNAPSHOT_HISTORY_ENABLED:
+            return 0
+
+        cur.execute("SAVEPOINT snapshot_history")
+        try:
+            content_hash = snapshot_hash(sets)
+            cur.execute(
+                """
+                SELECT version_time, content_hash FROM cg_snapshot_history
+                WHERE dataset=%s AND series_key=%s
+                ORDER BY version_time DESC LIMIT 1
+                """,
+                (dataset, series_key),
+            )
+            latest = cur.fetchone()
+            if latest and latest["content_hash"] == content_hash:
+                return 0
+
+            previous = self._load_snapshot(cur, dataset, series_key) if latest else None
+
+            payload = encode_payload(sets)
+            is_keyframe, chain_position = 1, 0
+            if previous and previous[2] + 1 < settings.SNAPSHOT_KEYFRAME_INTERVAL:
+                delta = encode_payload(diff_snapshot(previous[3], sets))
+                if len(delta) < len(payload):
+                    payload, is_keyframe, chain_position = delta, 0, previous[2] + 1
+
+            version_time = int(time.time() * 1000)
+            if previous:
+                version_time = max(version_time, previous[0] + 1)
+            cur.execute(
+                """
+                INSERT INTO cg_snapshot_history
+                (dataset, series_key, version_time, is_keyframe, chain_position, content_hash, payload)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                (dataset, series_key, version_time, is_keyframe, chain_position, content_hash, payload),
+            )
+            return 1
+        except Exception as e:
+            if isinstance(e, pymysql.Error) and e.args and e.args[0] in TRANSACTION_ABORTED_ERRORS:
+                raise
+            try:
+                cur.execute("ROLLBACK TO SAVEPOINT snapshot_history")
+            except pymysql.Error:
+                # The savepoint went with the transaction
+                raise e
+            if isinstance(e, pymysql.err.ProgrammingError):
+                # Table missing (run --setup); stop trying for this process
+                cls._snapshot_disabled = True
+                self.logger.warning(f"Snapshot history disabled: {e}")
+            else:
+                self.logger.warning(f"Could not record {dataset} snapshot for {series_key}: {e}")
+        return 0
+
+    def get_snapshot(
+        self, dataset: str, series_key: str, at: Optional[int] = None
+    ) -> Optional[Tuple[int, Dict[str, List[Any]]]]:
+        """(version_time, sets) of the version in force at `at` (ms; default: latest), or None."""
+        try:
+            with self.conn.cursor() as cur:
+                loaded = self._load_snapshot(cur, dataset, series_key, at)
+        except Exception as e:
+            self.logger.warning(f"Could not read {dataset} snapshot for {series_key}: {e}")
+            return None
+        return (loaded[0], loaded[3]) if loaded else None
+
+    def list_snapshot_versions(
+        self, dataset: str, series_key: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> List[int]:
+        """version_time of every stored version of a series, oldest first, optionally within [start, end]."""
+        conditions = ["dataset=%s", "series_key=%s"]
+        args: List[Any] = [dataset, series_key]
+        if start is not None:
+            conditions.append("version_time >= %s")
+            args.append(start)
+        if end is not None:
+            conditions.append("version_time <= %s")
+            args.append(end)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT version_time FROM cg_snapshot_history WHERE {' AND '.join(conditions)} ORDER BY version_time",
+                    args,
+                )
+                return [int(row["version_time"]) for row in cur.fetchall()]
+        except Exception as e:
+            self.logger.warning(f"Could not list {dataset} snapshots for {series_key}: {e}")
+            return []
+
     def ensure_schema(self):
         """Create all tables."""
         try:
@@ -99,21 +732,22 @@ class CoinglassRepository:
             self.logger.error(f"Failed to ensure schema: {e}")
             raise
 
+        # Seed the ledger for tables it doesn't track yet (empty on a fresh database)
+        tracked = self.get_ingestion_stats(list(INGESTION_LEDGER))
+        unseeded = [table for table in INGESTION_LEDGER if table not in tracked]
+        if unseeded:
+            self.rebuild_ingestion_stats(unseeded)
+
     # ===== FUNDING RATE =====
     def upsert_fr_history(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """Upsert funding rate history with duplicate detection."""
-        result = {
-            "fr_history": 0,
-            "fr_history_duplicates": 0,
-            "fr_history_filtered": 0
-        }
-
-        if not rows:
-            return result
+        return self.write_batches([self.build_fr_history(exchange, pair, interval, rows)])[0]
 
+    def build_fr_history(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> RowBatch:
+        """Funding rate history rows for write_batches(), without all-zero OHLC rows."""
         # Filter out rows where open, high, low, and close are 0 or 0.00000000
         filtered_rows = []
-        for row in rows:
+        for row in rows or []:
             open_val = float(row.get("open", 0))
             high_val = float(row.get("high", 0))
             low_val = float(row.get("low", 0))
@@ -127,107 +761,62 @@ class CoinglassRepository:
             filtered_rows.append(row)
 
         # Log filtered rows
-        filtered_count = len(rows) - len(filtered_rows)
-        result["fr_history_filtered"] = filtered_count
+        filtered_count = len(rows or []) - len(filtered_rows)
         if filtered_count > 0:
             self.logger.info(f"Filtered out {filtered_count} rows with zero values from {len(rows)} total rows for {exchange}:{pair}:{interval}")
-
-        if not filtered_rows:
-            self.logger.info(f"No valid rows after filtering for {exchange}:{pair}:{interval}")
-            return result
-
-        # Perform the upsert and use ROW_COUNT() to detect inserts vs updates
-        total_inserted = 0
-        total_updated = 0
-
-        sql = """
-        INSERT INTO cg_funding_rate_history (exchange, pair, `interval`, time, open, high, low, close)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open=VALUES(open), high=VALUES(high), low=VALUES(low), close=VALUES(close),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in filtered_rows:
-                    cur.execute(sql, (
-                        exchange, pair, interval, row.get("time"),
-                        row.get("open"), row.get("high"),
-                        row.get("low"), row.get("close")
-                    ))
-
-                    # Get affected rows count (1 = insert, 2 = update)
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
-
-            self.conn.commit()
-
-            # Set the results
-            result["fr_history"] = total_inserted  # Fresh records (inserted)
-            result["fr_history_duplicates"] = total_updated  # Duplicate records (updated)
-
-            if total_updated > 0:
-                self.logger.info(f"Inserted {total_inserted} fresh records, updated {total_updated} existing records for {exchange}:{pair}:{interval}")
-
-            return result
-
-        except pymysql.Error as e:
-            self.conn.rollback()
-            error_code = e.args[0] if e.args else 'unknown'
-            error_msg = e.args[1] if len(e.args) > 1 else str(e)
-            self.logger.error(
-                f"Database error upserting fr_history for {exchange}:{pair}:{interval} - "
-                f"Error code: {error_code}, Message: {error_msg}"
-            )
-            return {"fr_history": 0, "fr_history_duplicates": 0, "fr_history_filtered": filtered_count}
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(
-                f"Unexpected error upserting fr_history for {exchange}:{pair}:{interval} - "
-                f"Type: {type(e).__name__}, Message: {str(e)}"
+            if not filtered_rows:
+                self.logger.info(f"No valid rows after filtering for {exchange}:{pair}:{interval}")
+
+        columns = ["exchange", "pair", "interval", "time", "open", "high", "low", "close"]
+        values = [
+            (
+                exchange, pair, interval, row.get("time"),
+                row.get("open"), row.get("high"),
+                row.get("low"), row.get("close")
             )
-            return {"fr_history": 0, "fr_history_duplicates": 0, "fr_history_filtered": filtered_count}
+            for row in filtered_rows
+        ]
+        return RowBatch(
+            "cg_funding_rate_history", columns, values,
+            key_columns=["exchange", "pair", "interval", "time"],
+            update_columns=["open", "high", "low", "close"],
+            tally=upsert_counts("fr_history"),
+            label=f"fr_history for {exchange}:{pair}:{interval}",
+            result={"fr_history_filtered": filtered_count},
+        )
 
     def upsert_fr_exchange_list(self, symbol: str, data: Dict) -> int:
         """Upsert funding rate exchange list."""
-        saved = 0
-        sql = """
-        INSERT INTO cg_funding_rate_exchange_list
-            (symbol, exchange, margin_type, funding_rate, funding_rate_interval, next_funding_time)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            funding_rate=VALUES(funding_rate),
-            funding_rate_interval=VALUES(funding_rate_interval),
-            next_funding_time=VALUES(next_funding_time),
-            updated_at=CURRENT_TIMESTAMP
-        """
+        columns = [
+            "symbol", "exchange", "margin_type",
+            "funding_rate", "funding_rate_interval", "next_funding_time"
+        ]
+        values = []
+        # Process stablecoin margin
+        for item in data.get("stablecoin_margin_list", []):
+            values.append((
+                symbol, item.get("exchange"), "stablecoin",
+                item.get("funding_rate"), item.get("funding_rate_interval"),
+                item.get("next_funding_time")
+            ))
+        # Process token margin
+        for item in data.get("token_margin_list", []):
+            values.append((
+                symbol, item.get("exchange"), "coin",
+                item.get("funding_rate"), item.get("funding_rate_interval"),
+                item.get("next_funding_time")
+            ))
 
         try:
             with self.conn.cursor() as cur:
-                # Process stablecoin margin
-                for item in data.get("stablecoin_margin_list", []):
-                    cur.execute(sql, (
-                        symbol, item.get("exchange"), "stablecoin",
-                        item.get("funding_rate"), item.get("funding_rate_interval"),
-                        item.get("next_funding_time")
-                    ))
-                    saved += 1
-
-                # Process token margin
-                for item in data.get("token_margin_list", []):
-                    cur.execute(sql, (
-                        symbol, item.get("exchange"), "coin",
-                        item.get("funding_rate"), item.get("funding_rate_interval"),
-                        item.get("next_funding_time")
-                    ))
-                    saved += 1
+                self._bulk_upsert(
+                    cur, "cg_funding_rate_exchange_list", columns, values,
+                    key_columns=["symbol", "exchange", "margin_type"],
+                    update_columns=["funding_rate", "funding_rate_interval", "next_funding_time"],
+                )
 
             self.conn.commit()
-            return saved
+            return len(values)
         except pymysql.Error as e:
             self.conn.rollback()
             error_code = e.args[0] if e.args else 'unknown'
@@ -247,56 +836,26 @@ class CoinglassRepository:
 
     def upsert_oi_aggregated_history(self, symbol: str, interval: str, rows: List[Dict], unit: str = "usd") -> Dict[str, int]:
         """Upsert open interest aggregated history."""
-        result = {
-            "oi_aggregated_history": 0,
-            "oi_aggregated_history_duplicates": 0
-        }
-
-        if not rows:
-            return result
-
-        sql = """
-        INSERT INTO cg_open_interest_aggregated_history (symbol, `interval`, time, open, high, low, close, unit)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open=VALUES(open), high=VALUES(high), low=VALUES(low), close=VALUES(close),
-            unit=VALUES(unit), updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                total_processed = len(rows)
-                for row in rows:
-                    cur.execute(sql, (
-                        symbol, interval, row.get("time"),
-                        row.get("open"), row.get("high"),
-                        row.get("low"), row.get("close"), unit
-                    ))
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["oi_aggregated_history"] += 1
-                    else:
-                        result["oi_aggregated_history_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except pymysql.Error as e:
-            self.conn.rollback()
-            error_code = e.args[0] if e.args else 'unknown'
-            error_msg = e.args[1] if len(e.args) > 1 else str(e)
-            self.logger.error(
-                f"Database error upserting oi_aggregated_history for {symbol}:{interval} - "
-                f"Error code: {error_code}, Message: {error_msg}"
-            )
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(
-                f"Unexpected error upserting oi_aggregated_history for {symbol}:{interval} - "
-                f"Type: {type(e).__name__}, Message: {str(e)}"
+        return self.write_batches([self.build_oi_aggregated_history(symbol, interval, rows, unit)])[0]
+
+    def build_oi_aggregated_history(self, symbol: str, interval: str, rows: List[Dict], unit: str = "usd") -> RowBatch:
+        """Open interest aggregated history rows for write_batches()."""
+        columns = ["symbol", "interval", "time", "open", "high", "low", "close", "unit"]
+        values = [
+            (
+                symbol, interval, row.get("time"),
+                row.get("open"), row.get("high"),
+                row.get("low"), row.get("close"), unit
             )
-            return result
+            for row in rows or []
+        ]
+        return RowBatch(
+            "cg_open_interest_aggregated_history", columns, values,
+            key_columns=["symbol", "interval", "time"],
+            update_columns=["open", "high", "low", "close", "unit"],
+            tally=upsert_counts("oi_aggregated_history"),
+            label=f"oi_aggregated_history for {symbol}:{interval}",
+        )
 
     # ===== DISABLED METHODS (Commented Out) =====
 
@@ -546,46 +1105,30 @@ class CoinglassRepository:
     # ===== LONG/SHORT RATIO =====
     def upsert_lsr_global_account_ratio(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """Upsert global long/short account ratio."""
-        result = {
-            "lsr_global_account_ratio": 0,
-            "lsr_global_account_ratio_duplicates": 0
-        }
+        return self.write_batches([self.build_lsr_global_account_ratio(exchange, pair, interval, rows)])[0]
 
-        if not rows:
-            return result
-
-        sql = """
-        INSERT INTO cg_long_short_global_account_ratio_history (
-            exchange, pair, `interval`, time, global_account_long_percent,
-            global_account_short_percent, global_account_long_short_ratio
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            global_account_long_percent=VALUES(global_account_long_percent),
-            global_account_short_percent=VALUES(global_account_short_percent),
-            global_account_long_short_ratio=VALUES(global_account_long_short_ratio),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange, pair, interval, row.get("time"),
-                        row.get("global_account_long_percent"),
-                        row.get("global_account_short_percent"),
-                        row.get("global_account_long_short_ratio")
-                    ))
-                    # Get affected rows count (1 = insert, 2 = update)
-                    if cur.rowcount == 1:
-                        result["lsr_global_account_ratio"] += 1
-                    elif cur.rowcount == 2:
-                        result["lsr_global_account_ratio_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error upserting lsr_global_account_ratio: {e}")
-            return result
+    def build_lsr_global_account_ratio(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> RowBatch:
+        """Global long/short account ratio rows for write_batches()."""
+        columns = [
+            "exchange", "pair", "interval", "time", "global_account_long_percent",
+            "global_account_short_percent", "global_account_long_short_ratio"
+        ]
+        values = [
+            (
+                exchange, pair, interval, row.get("time"),
+                row.get("global_account_long_percent"),
+                row.get("global_account_short_percent"),
+                row.get("global_account_long_short_ratio")
+            )
+            for row in rows or []
+        ]
+        return RowBatch(
+            "cg_long_short_global_account_ratio_history", columns, values,
+            key_columns=["exchange", "pair", "interval", "time"],
+            update_columns=columns[4:],
+            tally=upsert_counts("lsr_global_account_ratio"),
+            label=f"lsr_global_account_ratio [{exchange}:{pair}:{interval}]",
+        )
 
     def upsert_lsr_top_account_ratio(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """
@@ -594,256 +1137,429 @@ class CoinglassRepository:
         Endpoint: /api/futures/top-long-short-account-ratio/history
         Table: cg_long_short_top_account_ratio_history
         """
-        result = {
-            "lsr_top_account_ratio": 0,
-            "lsr_top_account_ratio_duplicates": 0
-        }
-
-        if not rows:
-            return result
-
-        sql = """
-        INSERT INTO cg_long_short_top_account_ratio_history (
-            exchange, pair, `interval`, time, top_account_long_percent,
-            top_account_short_percent, top_account_long_short_ratio
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            top_account_long_percent=VALUES(top_account_long_percent),
-            top_account_short_percent=VALUES(top_account_short_percent),
-            top_account_long_short_ratio=VALUES(top_account_long_short_ratio),
-            updated_at=CURRENT_TIMESTAMP
-        """
+        return self.write_batches([self.build_lsr_top_account_ratio(exchange, pair, interval, rows)])[0]
 
-        try:
-            with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange, pair, interval, row.get("time"),
-                        row.get("top_account_long_percent"),
-                        row.get("top_account_short_percent"),
-                        row.get("top_account_long_short_ratio")
-                    ))
-                    # Get affected rows count (1 = insert, 2 = update)
-                    if cur.rowcount == 1:
-                        result["lsr_top_account_ratio"] += 1
-                    elif cur.rowcount == 2:
-                        result["lsr_top_account_ratio_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except pymysql.Error as e:
-            self.conn.rollback()
-            error_code = e.args[0] if e.args else 'unknown'
-            error_msg = e.args[1] if len(e.args) > 1 else str(e)
-            self.logger.error(
-                f"Database error upserting lsr_top_account_ratio [{exchange}:{pair}:{interval}] - "
-                f"Error code: {error_code}, Message: {error_msg}"
-            )
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(
-                f"Unexpected error upserting lsr_top_account_ratio [{exchange}:{pair}:{interval}] - "
-                f"Type: {type(e).__name__}, Message: {str(e)}"
+    def build_lsr_top_account_ratio(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> RowBatch:
+        """Top account long/short ratio rows for write_batches()."""
+        columns = [
+            "exchange", "pair", "interval", "time", "top_account_long_percent",
+            "top_account_short_percent", "top_account_long_short_ratio"
+        ]
+        values = [
+            (
+                exchange, pair, interval, row.get("time"),
+                row.get("top_account_long_percent"),
+                row.get("top_account_short_percent"),
+                row.get("top_account_long_short_ratio")
             )
-            return result
+            for row in rows or []
+        ]
+        return RowBatch(
+            "cg_long_short_top_account_ratio_history", columns, values,
+            key_columns=["exchange", "pair", "interval", "time"],
+            update_columns=columns[4:],
+            tally=upsert_counts("lsr_top_account_ratio"),
+            label=f"lsr_top_account_ratio [{exchange}:{pair}:{interval}]",
+        )
 
     # ===== LIQUIDATION =====
     def upsert_liquidation_aggregated_history(self, symbol: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """Upsert liquidation aggregated history with duplicate detection."""
-        result = {
-            "liquidation_aggregated": 0,
-            "liquidation_aggregated_duplicates": 0
-        }
+        return self.write_batches([self.build_liquidation_aggregated_history(symbol, interval, rows)])[0]
 
-        if not rows:
-            return result
+    def build_liquidation_aggregated_history(self, symbol: str, interval: str, rows: List[Dict]) -> RowBatch:
+        """Liquidation aggregated history rows for write_batches(), without all-zero rows."""
+        columns = [
+            "symbol", "interval", "time",
+            "aggregated_long_liquidation_usd", "aggregated_short_liquidation_usd"
+        ]
+        values = []
+        skipped_count = 0
+        for row in rows or []:
+            # Get liquidation values
+            long_liq = row.get("aggregated_long_liquidation_usd")
+            short_liq = row.get("aggregated_short_liquidation_usd")
+
+            # Skip if both values are None or 0
+            if (long_liq is None or long_liq == 0) and (short_liq is None or short_liq == 0):
+                skipped_count += 1
+                continue
 
-        sql = """
-        INSERT INTO cg_liquidation_aggregated_history (
-            symbol, `interval`, time, aggregated_long_liquidation_usd, aggregated_short_liquidation_usd
-        ) VALUES (%s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            aggregated_long_liquidation_usd=VALUES(aggregated_long_liquidation_usd),
-            aggregated_short_liquidation_usd=VALUES(aggregated_short_liquidation_usd),
-            updated_at=CURRENT_TIMESTAMP
-        """
+            values.append((symbol, interval, row.get("time"), long_liq, short_liq))
 
-        total_inserted = 0
-        total_updated = 0
-        skipped_count = 0
+        if skipped_count > 0:
+            self.logger.info(
+                f"Liquidation Aggregated [{symbol}:{interval}]: skipped {skipped_count} zero-value records"
+            )
+        return RowBatch(
+            "cg_liquidation_aggregated_history", columns, values,
+            key_columns=["symbol", "interval", "time"],
+            update_columns=columns[3:],
+            tally=upsert_counts("liquidation_aggregated"),
+            label=f"liquidation_aggregated_history for {symbol}:{interval}",
+        )
+
+    def get_liquidation_heatmap_ages(self, symbols: List[str]) -> Dict[Tuple[str, str], int]:
+        """Seconds since each stored (symbol, range) heatmap was last refreshed."""
+        if not symbols:
+            return {}
 
+        placeholders = ", ".join(["%s"] * len(symbols))
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    # Get liquidation values
-                    long_liq = row.get("aggregated_long_liquidation_usd")
-                    short_liq = row.get("aggregated_short_liquidation_usd")
+                cur.execute(
+                    f"""
+                    SELECT symbol, `range`, TIMESTAMPDIFF(SECOND, updated_at, NOW()) AS age_seconds
+                    FROM cg_liquidation_heatmap
+                    WHERE symbol IN ({placeholders})
+                    """,
+                    tuple(symbols),
+                )
+                return {(row["symbol"], row["range"]): int(row["age_seconds"]) for row in cur.fetchall()}
+        except Exception as e:
+            self.logger.warning(f"Could not read heatmap refresh times: {e}")
+            return {}
 
-                    # Skip if both values are None or 0
-                    if (long_liq is None or long_liq == 0) and (short_liq is None or short_liq == 0):
-                        skipped_count += 1
-                        continue
+    def get_time_watermarks(
+        self,
+        table_name: str,
+        series_columns: List[str],
+        filters: Optional[Dict[str, Sequence[Any]]] = None,
+        time_column: str = "time",
+    ) -> Dict[Tuple[str, ...], int]:
+        """
+        Last persisted `time_column` per series, e.g. per (exchange, symbol, interval).
 
-                    cur.execute(sql, (
-                        symbol, interval, row.get("time"),
-                        long_liq,
-                        short_liq
-                    ))
+        Keys are tuples of normalized strings in `series_columns` order; use
+        series_key() to build lookups. Series with no rows are absent.
+        """
+        conditions = []
+        args: List[Any] = []
+        for column, values in (filters or {}).items():
+            values = list(values)
+            if not values:
+                return {}
+            conditions.append(f"`{column}` IN ({', '.join(['%s'] * len(values))})")
+            args.extend(values)
+
+        cols_sql = ", ".join(f"`{c}`" for c in series_columns)
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT {cols_sql}, MAX(`{time_column}`) AS watermark
+                    FROM {table_name}
+                    {where_sql}
+                    GROUP BY {cols_sql}
+                    """,
+                    tuple(args),
+                )
+                return {
+                    self.series_key(*(row[c] for c in series_columns)): int(row["watermark"])
+                    for row in cur.fetchall()
+                    if row["watermark"] is not None
+                }
+        except Exception as e:
+            self.logger.warning(f"Could not read watermarks from {table_name}: {e}")
+            return {}
 
-                    # Get affected rows count (1 = insert, 2 = update)
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
+    @classmethod
+    def series_key(cls, *values: Any) -> Tuple[str, ...]:
+        """Lookup key for get_time_watermarks() results."""
+        return tuple(cls._normalize_key_value(v) for v in values)
+
+    # Child sets of cg_liquidation_heatmap: response key -> (table, value columns, fingerprint column)
+    HEATMAP_CHILD_SETS = {
+        "y_axis": ("cg_liquidation_heatmap_y_axis", ["price_level"], "y_axis_hash"),
+        "liquidation_leverage_data": (
+            "cg_liquidation_heatmap_leverage_data",
+            ["x_position", "y_position", "liquidation_amount"],
+            "leverage_data_hash",
+        ),
+        "price_candlesticks": (
+            "cg_liquidation_heatmap_price_candlesticks",
+            ["timestamp", "open_price", "high_price", "low_price", "close_price", "volume"],
+            "price_candlesticks_hash",
+        ),
+    }
+    # Whether the fingerprint columns and (heatmap, sequence_order) keys exist, per process
+    _heatmap_diff_ready: Optional[bool] = None
+
+    @staticmethod
+    def _heatmap_value(value: Any) -> Any:
+        """Render a heatmap value the same way whether it came from the API or a DECIMAL(.., 8) column."""
+        if value is None or isinstance(value, int):
+            return value
+        return round(float(value), 8)
+
+    @classmethod
+    def _heatmap_child_rows(cls, data: Dict) -> Dict[str, List[Tuple]]:
+        """Parse a heatmap response into (sequence_order, *values) rows per child set."""
+        rows: Dict[str, List[Tuple]] = {key: [] for key in cls.HEATMAP_CHILD_SETS}
+
+        for idx, price_level in enumerate(data.get("y_axis") or []):
+            rows["y_axis"].append((idx, cls._heatmap_value(float(price_level))))
+
+        for idx, item in enumerate(data.get("liquidation_leverage_data") or []):
+            if isinstance(item, (list, tuple)) and len(item) >= 3:
+                rows["liquidation_leverage_data"].append((
+                    idx,
+                    int(item[0]) if item[0] is not None else None,
+                    int(item[1]) if item[1] is not None else None,
+                    cls._heatmap_value(item[2]),
+                ))
+
+        # price_candlesticks format: [timestamp, open, high, low, close, volume]
+        for idx, item in enumerate(data.get("price_candlesticks") or []):
+            if isinstance(item, (list, tuple)) and len(item) >= 6:
+                rows["price_candlesticks"].append((
+                    idx,
+                    int(item[0]) if item[0] is not None else None,
+                    *(cls._heatmap_value(v) for v in item[1:6]),
+                ))
+
+        return rows
+
+    @staticmethod
+    def _fingerprint(rows: List[Tuple]) -> str:
+        return hashlib.sha1(repr(rows).encode()).hexdigest()
+
+    def _heatmap_diff_supported(self, cur) -> bool:
+        """Check once per process that migrate_tables.py added the diff columns and keys."""
+        if CoinglassRepository._heatmap_diff_ready is None:
+            cur.execute("SHOW COLUMNS FROM cg_liquidation_heatmap LIKE 'price_candlesticks_hash'")
+            ready = cur.fetchone() is not None
+            for table, _, _ in self.HEATMAP_CHILD_SETS.values():
+                cur.execute(f"SHOW INDEX FROM {table} WHERE Key_name = 'uk_heatmap_sequence'")
+                ready = ready and bool(cur.fetchall())
+            if not ready:
+                self.logger.warning(
+                    "⚠️ Heatmap diff refresh unavailable until `python migrate_tables.py` runs; "
+                    "rewriting heatmap children in full"
+                )
+            CoinglassRepository._heatmap_diff_ready = ready
+        return CoinglassRepository._heatmap_diff_ready
 
-            self.conn.commit()
+    def _sync_heatmap_children(self, cur, table: str, columns: List[str], heatmap_id: int, rows: List[Tuple]) -> int:
+        """
+        Bring one child set in line with `rows`, writing only what differs.
 
-            # Set the results
-            result["liquidation_aggregated"] = total_inserted  # Fresh records (inserted)
-            result["liquidation_aggregated_duplicates"] = total_updated  # Duplicate records (updated)
+        Stored rows are read back by sequence_order; new or changed rows are
+        upserted on (liquidation_heatmap_id, sequence_order) in chunks and
+        rows past the new set are deleted. Returns rows written plus deleted.
+        """
+        column_sql = ", ".join(f"`{col}`" for col in columns)
+        cur.execute(
+            f"SELECT sequence_order, {column_sql} FROM {table} WHERE liquidation_heatmap_id=%s",
+            (heatmap_id,),
+        )
+        stored = {
+            row["sequence_order"]: tuple(self._heatmap_value(row[col]) for col in columns)
+            for row in cur.fetchall()
+        }
 
-            if total_updated > 0 or skipped_count > 0:
-                self.logger.info(
-                    f"Liquidation Aggregated [{symbol}:{interval}]: "
-                    f"Inserted {total_inserted} fresh records, "
-                    f"updated {total_updated} existing records, "
-                    f"skipped {skipped_count} zero-value records"
-                )
+        changed = [row for row in rows if stored.get(row[0]) != tuple(row[1:])]
+        stale = sorted(set(stored) - {row[0] for row in rows})
+
+        chunk_size = settings.DB_BULK_CHUNK_SIZE
+        row_sql = "(" + ", ".join(["%s"] * (len(columns) + 2)) + ")"
+        update_sql = ", ".join(f"`{col}`=VALUES(`{col}`)" for col in columns)
+        for start in range(0, len(changed), chunk_size):
+            chunk = changed[start:start + chunk_size]
+            cur.execute(
+                f"INSERT INTO {table} (liquidation_heatmap_id, sequence_order, {column_sql}) "
+                f"VALUES {', '.join([row_sql] * len(chunk))} ON DUPLICATE KEY UPDATE {update_sql}",
+                [value for row in chunk for value in (heatmap_id, *row)],
+            )
+        for start in range(0, len(stale), chunk_size):
+            chunk = stale[start:start + chunk_size]
+            cur.execute(
+                f"DELETE FROM {table} WHERE liquidation_heatmap_id=%s "
+                f"AND sequence_order IN ({', '.join(['%s'] * len(chunk))})",
+                [heatmap_id, *chunk],
+            )
+        return len(changed) + len(stale)
 
-            return result
+    def _replace_heatmap_children(self, cur, table: str, columns: List[str], heatmap_id: int, rows: List[Tuple]) -> int:
+        """Delete a child set and insert it again in full (HEATMAP_DIFF_REFRESH=false or unmigrated schema)."""
+        return self._bulk_replace_children(
+            cur, heatmap_id, [(table, "liquidation_heatmap_id", ["sequence_order", *columns], rows)]
+        )
 
-        except pymysql.Error as e:
-            self.conn.rollback()
-            error_code = e.args[0] if e.args else 'unknown'
-            error_msg = e.args[1] if len(e.args) > 1 else str(e)
-            self.logger.error(
-                f"Database error upserting liquidation_aggregated_history for {symbol}:{interval} - "
-                f"Error code: {error_code}, Message: {error_msg}"
-            )
-            return {"liquidation_aggregated": 0, "liquidation_aggregated_duplicates": 0}
+    def _write_heatmap_matrix(
+        self, cur, symbol: str, range_param: str, child_rows: Dict[str, List[Tuple]], fingerprints: Dict[str, str]
+    ) -> int:
+        """Store the heatmap as one blob snapshot unless the latest snapshot holds the same content."""
+        content_hash = self._fingerprint([fingerprints[key] for key in self.HEATMAP_CHILD_SETS])
+        cur.execute(
+            """
+            SELECT content_hash FROM cg_liquidation_heatmap_matrix
+            WHERE symbol=%s AND `range`=%s
+            ORDER BY fetch_time DESC LIMIT 1
+            """,
+            (symbol, range_param),
+        )
+        latest = cur.fetchone()
+        if latest and latest["content_hash"] == content_hash:
+            return 0
+
+        counts, blobs = encode_heatmap(child_rows)
+        cur.execute(
+            """
+            INSERT INTO cg_liquidation_heatmap_matrix
+            (symbol, `range`, fetch_time, content_hash, y_count, cell_count, candle_count,
+             y_axis_blob, leverage_blob, candles_blob)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (symbol, range_param, int(time.time() * 1000), content_hash, *counts, *blobs),
+        )
+        return 1
+
+    def get_liquidation_heatmap_matrix(
+        self, symbol: str, range_param: str, at: Optional[int] = None
+    ) -> Optional[HeatmapMatrix]:
+        """
+        Latest blob snapshot of a (symbol, range) heatmap, or the one in force at `at` (ms).
+
+        Columns come back as typed memoryviews over the decompressed buffers
+        (see app.core.heatmap_codec); None if no snapshot was stored.
+        """
+        where_at = "AND fetch_time <= %s" if at is not None else ""
+        args = (symbol, range_param, at) if at is not None else (symbol, range_param)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT fetch_time, y_count, cell_count, candle_count, y_axis_blob, leverage_blob, candles_blob
+                    FROM cg_liquidation_heatmap_matrix
+                    WHERE symbol=%s AND `range`=%s {where_at}
+                    ORDER BY fetch_time DESC LIMIT 1
+                    """,
+                    args,
+                )
+                row = cur.fetchone()
         except Exception as e:
-            self.conn.rollback()
-            self.logger.error(
-                f"Unexpected error upserting liquidation_aggregated_history for {symbol}:{interval} - "
-                f"Type: {type(e).__name__}, Message: {str(e)}"
-            )
-            return {"liquidation_aggregated": 0, "liquidation_aggregated_duplicates": 0}
+            self.logger.warning(f"Could not read heatmap matrix for {symbol}:{range_param}: {e}")
+            return None
+        if not row:
+            return None
+        return decode_heatmap(
+            symbol,
+            range_param,
+            int(row["fetch_time"]),
+            (row["y_count"], row["cell_count"], row["candle_count"]),
+            (row["y_axis_blob"], row["leverage_blob"], row["candles_blob"]),
+        )
+
+    def get_liquidation_heatmap_at(self, symbol: str, range_param: str, at: Optional[int] = None) -> Optional[Dict]:
+        """
+        The (symbol, range) heatmap as it was at `at` (ms; default: latest), from the version history.
+
+        Returned in the API response shape plus its version_time; None if no
+        version was recorded by then.
+        """
+        snapshot = self.get_snapshot("liquidation_heatmap", ":".join(self.series_key(symbol, range_param)), at)
+        if not snapshot:
+            return None
+        version_time, sets = snapshot
+        return {
+            "version_time": version_time,
+            "y_axis": [row[0] for row in sets.get("y_axis", [])],
+            "liquidation_leverage_data": sets.get("liquidation_leverage_data", []),
+            "price_candlesticks": sets.get("price_candlesticks", []),
+        }
 
     def upsert_liquidation_heatmap(self, symbol: str, range_param: str, data: Dict) -> Dict[str, int]:
-        """Upsert liquidation heatmap data with relational structure."""
+        """
+        Upsert liquidation heatmap data with relational structure.
+
+        HEATMAP_STORAGE_MODE picks where the matrix goes: child rows ("rows"),
+        compressed column blobs in cg_liquidation_heatmap_matrix ("blob"), or
+        both. Each child set (y axis, leverage cells, candlesticks) is
+        fingerprinted on the parent row. With HEATMAP_DIFF_REFRESH, an
+        unchanged set is not touched at all and a changed one only gets its
+        differing rows written; otherwise every set is deleted and reinserted.
+        A blob snapshot is only added when the content differs from the
+        latest one. The parent's updated_at is refreshed either way, so
+        refresh cadence and freshness still see the fetch.
+        """
         result = {
             "liquidation_heatmap": 0,
-            "liquidation_heatmap_duplicates": 0
+            "liquidation_heatmap_duplicates": 0,
+            "liquidation_heatmap_rows_written": 0,
+            "liquidation_heatmap_snapshots": 0,
+            "liquidation_heatmap_versions": 0,
         }
+        mode = settings.HEATMAP_STORAGE_MODE if settings.HEATMAP_STORAGE_MODE in ("rows", "blob", "both") else "rows"
 
         if not data:
             return result
 
         try:
-            with self.conn.cursor() as cur:
-                # Step 1: Insert or update main record
-                main_sql = """
-                INSERT INTO cg_liquidation_heatmap (symbol, `range`)
-                VALUES (%s, %s)
-                ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                """
-                cur.execute(main_sql, (symbol, range_param))
+            child_rows = self._heatmap_child_rows(data)
+            fingerprints = {key: self._fingerprint(rows) for key, rows in child_rows.items()}
 
-                # Get affected rows count (1 = insert, 2 = update)
-                affected_rows = cur.rowcount
-                is_update = (affected_rows == 2)
+            with self.conn.cursor() as cur:
+                diff_ready = self._heatmap_diff_supported(cur)
 
-                if affected_rows == 1:
+                # Step 1: Insert or update main record
+                liquidation_heatmap_id, inserted = self._upsert_parent(
+                    cur, "cg_liquidation_heatmap", {"symbol": symbol, "range": range_param}
+                )
+                if inserted:
                     result["liquidation_heatmap"] = 1
-                elif affected_rows == 2:
+                else:
                     result["liquidation_heatmap_duplicates"] = 1
 
-                # Step 2: Get the liquidation_heatmap_id
-                cur.execute(
-                    "SELECT id FROM cg_liquidation_heatmap WHERE symbol=%s AND `range`=%s",
-                    (symbol, range_param)
-                )
-                row = cur.fetchone()
-                liquidation_heatmap_id = row['id']
-
-                # Step 3: Delete existing child records (for updates)
-                if is_update:
-                    cur.execute(
-                        "DELETE FROM cg_liquidation_heatmap_y_axis WHERE liquidation_heatmap_id=%s",
-                        (liquidation_heatmap_id,)
+                # Step 2: Get the stored fingerprints
+                row = {}
+                if diff_ready and not inserted:
+                    hash_sql = ", ".join(spec[2] for spec in self.HEATMAP_CHILD_SETS.values())
+                    cur.execute(f"SELECT {hash_sql} FROM cg_liquidation_heatmap WHERE id=%s", (liquidation_heatmap_id,))
+                    row = cur.fetchone() or {}
+
+                # Step 3: Refresh the child sets whose fingerprint moved
+                diff = diff_ready and settings.HEATMAP_DIFF_REFRESH
+                changed = {}
+                for key, (table, columns, hash_column) in self.HEATMAP_CHILD_SETS.items():
+                    if mode == "blob":
+                        break
+                    if diff and row.get(hash_column) == fingerprints[key]:
+                        continue
+                    write = self._sync_heatmap_children if diff else self._replace_heatmap_children
+                    result["liquidation_heatmap_rows_written"] += write(
+                        cur, table, columns, liquidation_heatmap_id, child_rows[key]
                     )
+                    changed[hash_column] = fingerprints[key]
+
+                if diff_ready and changed:
                     cur.execute(
-                        "DELETE FROM cg_liquidation_heatmap_leverage_data WHERE liquidation_heatmap_id=%s",
-                        (liquidation_heatmap_id,),
+                        f"UPDATE cg_liquidation_heatmap SET {', '.join(f'{col}=%s' for col in changed)} WHERE id=%s",
+                        (*changed.values(), liquidation_heatmap_id),
                     )
-                    cur.execute(
-                        "DELETE FROM cg_liquidation_heatmap_price_candlesticks WHERE liquidation_heatmap_id=%s",
-                        (liquidation_heatmap_id,)
+
+                # Step 4: Compressed matrix snapshot
+                if mode in ("blob", "both"):
+                    result["liquidation_heatmap_snapshots"] = self._write_heatmap_matrix(
+                        cur, symbol, range_param, child_rows, fingerprints
                     )
 
-                # Step 4: Insert y_axis data
-                y_axis_data = data.get("y_axis", [])
-                if y_axis_data:
-                    y_axis_sql = """
-                    INSERT INTO cg_liquidation_heatmap_y_axis
-                    (liquidation_heatmap_id, price_level, sequence_order)
-                    VALUES (%s, %s, %s)
-                    """
-                    y_axis_values = [
-                        (liquidation_heatmap_id, float(price_level), idx)
-                        for idx, price_level in enumerate(y_axis_data)
-                    ]
-                    cur.executemany(y_axis_sql, y_axis_values)
-
-                # Step 5: Insert liquidation_leverage_data
-                liquidation_leverage_data = data.get("liquidation_leverage_data", [])
-                if liquidation_leverage_data:
-                    lev_sql = """
-                    INSERT INTO cg_liquidation_heatmap_leverage_data
-                    (liquidation_heatmap_id, sequence_order, x_position, y_position, liquidation_amount)
-                    VALUES (%s, %s, %s, %s, %s)
-                    """
-                    lev_values = []
-                    for idx, item in enumerate(liquidation_leverage_data):
-                        if isinstance(item, (list, tuple)) and len(item) >= 3:
-                            lev_values.append((
-                                liquidation_heatmap_id, idx,
-                                int(item[0]) if item[0] is not None else None,
-                                int(item[1]) if item[1] is not None else None,
-                                float(item[2]) if item[2] is not None else None
-                            ))
-                    if lev_values:
-                        cur.executemany(lev_sql, lev_values)
-
-                # Step 6: Insert price_candlesticks data (OHLCV format)
-                price_candlesticks = data.get("price_candlesticks", [])
-                if price_candlesticks:
-                    candle_sql = """
-                    INSERT INTO cg_liquidation_heatmap_price_candlesticks
-                    (liquidation_heatmap_id, sequence_order, timestamp, open_price, high_price, low_price, close_price, volume)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """
-                    candle_values = []
-                    for idx, item in enumerate(price_candlesticks):
-                        # price_candlesticks format: [timestamp, open, high, low, close, volume]
-                        if isinstance(item, (list, tuple)) and len(item) >= 6:
-                            candle_values.append((
-                                liquidation_heatmap_id, idx,
-                                int(item[0]) if item[0] is not None else None,  # timestamp
-                                float(item[1]) if item[1] is not None else None,  # open
-                                float(item[2]) if item[2] is not None else None,  # high
-                                float(item[3]) if item[3] is not None else None,  # low
-                                float(item[4]) if item[4] is not None else None,  # close
-                                float(item[5]) if item[5] is not None else None   # volume
-                            ))
-                    if candle_values:
-                        cur.executemany(candle_sql, candle_values)
+                # Step 5: Version history (delta against the previous version)
+                result["liquidation_heatmap_versions"] = self._record_snapshot(
+                    cur,
+                    "liquidation_heatmap",
+                    ":".join(self.series_key(symbol, range_param)),
+                    {key: [list(row[1:]) for row in rows] for key, rows in child_rows.items()},
+                )
 
             self.conn.commit()
 
             if result["liquidation_heatmap_duplicates"] > 0:
-                self.logger.info(f"Updated existing heatmap record for {symbol}:{range_param}")
+                self.logger.info(
+                    f"Updated existing heatmap record for {symbol}:{range_param} "
+                    f"({len(changed)}/{len(self.HEATMAP_CHILD_SETS)} child sets changed)"
+                )
 
             return result
 
@@ -867,49 +1583,31 @@ class CoinglassRepository:
     # ===== FUTURES BASIS =====
     def upsert_futures_basis_history(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """Upsert futures basis history."""
-        result = {
-            "futures_basis": 0,
-            "futures_basis_duplicates": 0
-        }
+        return self.write_batches([self.build_futures_basis_history(exchange, pair, interval, rows)])[0]
 
-        if not rows:
-            return result
-
-        sql = """
-        INSERT INTO cg_futures_basis_history (
-            exchange, pair, `interval`, time, open_basis, close_basis, open_change, close_change
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open_basis=VALUES(open_basis),
-            close_basis=VALUES(close_basis),
-            open_change=VALUES(open_change),
-            close_change=VALUES(close_change),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange, pair, interval, row.get("time"),
-                        row.get("open_basis"),
-                        row.get("close_basis"),
-                        row.get("open_change"),
-                        row.get("close_change")
-                    ))
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["futures_basis"] += 1
-                    else:
-                        result["futures_basis_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error upserting futures_basis_history: {e}")
-            return result
+    def build_futures_basis_history(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> RowBatch:
+        """Futures basis history rows for write_batches()."""
+        columns = [
+            "exchange", "pair", "interval", "time",
+            "open_basis", "close_basis", "open_change", "close_change"
+        ]
+        values = [
+            (
+                exchange, pair, interval, row.get("time"),
+                row.get("open_basis"),
+                row.get("close_basis"),
+                row.get("open_change"),
+                row.get("close_change")
+            )
+            for row in rows or []
+        ]
+        return RowBatch(
+            "cg_futures_basis_history", columns, values,
+            key_columns=["exchange", "pair", "interval", "time"],
+            update_columns=columns[4:],
+            tally=upsert_counts("futures_basis"),
+            label=f"futures_basis_history for {exchange}:{pair}:{interval}",
+        )
 
     # def upsert_lsr_position_ratio(self, exchange: str, pair: str, interval: str, rows: List[Dict]) -> int:
     #     """Upsert long/short position ratio."""
@@ -1292,43 +1990,6 @@ class CoinglassRepository:
     #         self.logger.error(f"Error upserting spot_pairs_markets: {e}")
     #         return 0
 
-    def upsert_spot_price_history(self, exchange: str, symbol: str, interval: str, rows: List[Dict]) -> int:
-        """Upsert spot price history data."""
-        if not rows:
-            return 0
-
-        sql = """
-        INSERT INTO cg_spot_price_history (
-            exchange, symbol, `interval`, time, open, high, low, close, volume_usd
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open=VALUES(open),
-            high=VALUES(high),
-            low=VALUES(low),
-            close=VALUES(close),
-            volume_usd=VALUES(volume_usd),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange, symbol, interval,
-                        row.get("time"),
-                        row.get("open"),
-                        row.get("high"),
-                        row.get("low"),
-                        row.get("close"),
-                        row.get("volume_usd")
-                    ))
-            self.conn.commit()
-            return len(rows)
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error upserting spot_price_history: {e}")
-            return 0
-
     # ===== BITCOIN ETF =====
     def upsert_bitcoin_etf_list(self, rows: List[Dict]) -> Dict[str, int]:
         """Upsert Bitcoin ETF list data with duplicate detection."""
@@ -1386,65 +2047,51 @@ class CoinglassRepository:
             "btc_change_7d", "update_date", "update_timestamp"
         ]
 
-        placeholders = ", ".join(["%s"] * len(columns))
-        update_clauses = ", ".join([f"{col}=VALUES({col})" for col in columns])
-
-        sql = f"""
-        INSERT INTO cg_bitcoin_etf_list ({', '.join(columns)})
-        VALUES ({placeholders})
-        ON DUPLICATE KEY UPDATE
-            {update_clauses},
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        total_inserted = 0
-        total_updated = 0
+        values = []
+        for row in filtered_rows:
+            # Extract nested asset_details and map to correct field names
+            asset_details = row.get("asset_details", {})
+            values.append((
+                row.get("ticker"),
+                row.get("fund_name"),
+                row.get("region"),
+                row.get("market_status"),
+                row.get("primary_exchange"),
+                row.get("cik_code"),
+                row.get("fund_type"),
+                row.get("market_cap_usd"),
+                row.get("list_date"),
+                row.get("shares_outstanding"),
+                row.get("aum_usd"),
+                row.get("management_fee_percent"),
+                row.get("last_trade_time"),
+                row.get("last_quote_time"),
+                row.get("volume_quantity"),
+                row.get("volume_usd"),
+                # These fields are at the top level, not in asset_details
+                row.get("price_usd"),  # price_usd is the current price
+                row.get("price_change_usd"),
+                row.get("price_change_percent"),
+                # Map asset_details fields to our schema
+                asset_details.get("holding_quantity"),  # btc_holding
+                asset_details.get("net_asset_value_usd"),
+                asset_details.get("premium_discount_percent"),
+                asset_details.get("change_percent_24h"),  # btc_change_percent_24h
+                asset_details.get("change_quantity_24h"),  # btc_change_24h
+                asset_details.get("change_percent_7d"),   # btc_change_percent_7d
+                asset_details.get("change_quantity_7d"),   # btc_change_7d
+                asset_details.get("update_date"),
+                row.get("update_timestamp")
+            ))
 
         try:
             with self.conn.cursor() as cur:
-                for row in filtered_rows:
-                    # Extract nested asset_details and map to correct field names
-                    asset_details = row.get("asset_details", {})
-                    values = [
-                        row.get("ticker"),
-                        row.get("fund_name"),
-                        row.get("region"),
-                        row.get("market_status"),
-                        row.get("primary_exchange"),
-                        row.get("cik_code"),
-                        row.get("fund_type"),
-                        row.get("market_cap_usd"),
-                        row.get("list_date"),
-                        row.get("shares_outstanding"),
-                        row.get("aum_usd"),
-                        row.get("management_fee_percent"),
-                        row.get("last_trade_time"),
-                        row.get("last_quote_time"),
-                        row.get("volume_quantity"),
-                        row.get("volume_usd"),
-                        # These fields are at the top level, not in asset_details
-                        row.get("price_usd"),  # price_usd is the current price
-                        row.get("price_change_usd"),
-                        row.get("price_change_percent"),
-                        # Map asset_details fields to our schema
-                        asset_details.get("holding_quantity"),  # btc_holding
-                        asset_details.get("net_asset_value_usd"),
-                        asset_details.get("premium_discount_percent"),
-                        asset_details.get("change_percent_24h"),  # btc_change_percent_24h
-                        asset_details.get("change_quantity_24h"),  # btc_change_24h
-                        asset_details.get("change_percent_7d"),   # btc_change_percent_7d
-                        asset_details.get("change_quantity_7d"),   # btc_change_7d
-                        asset_details.get("update_date"),
-                        row.get("update_timestamp")
-                    ]
-                    cur.execute(sql, values)
-
-                    # Get affected rows count (1 = insert, 2 = update)
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
+                total_inserted, total_updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_bitcoin_etf_list", columns, values,
+                    key_columns=["ticker"],
+                    update_columns=columns,
+                )
+                total_updated += batch_duplicates
 
             self.conn.commit()
 
@@ -1484,18 +2131,8 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_bitcoin_etf_premium_discount_history (
-            timestamp, ticker, nav_usd, market_price_usd, premium_discount_details
-        ) VALUES (%s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            nav_usd=VALUES(nav_usd), market_price_usd=VALUES(market_price_usd),
-            premium_discount_details=VALUES(premium_discount_details),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        total_inserted = 0
-        total_updated = 0
+        columns = ["timestamp", "ticker", "nav_usd", "market_price_usd", "premium_discount_details"]
+        values = []
 
         try:
             with self.conn.cursor() as cur:
@@ -1529,23 +2166,20 @@ class CoinglassRepository:
                         )
                         continue
 
-                    cur.execute(
-                        sql,
-                        (
-                            timestamp,
-                            final_ticker,  # Use ticker from row or parameter
-                            nav_usd,
-                            market_price_usd,
-                            premium_discount_details,
-                        ),
-                    )
+                    values.append((
+                        timestamp,
+                        final_ticker,  # Use ticker from row or parameter
+                        nav_usd,
+                        market_price_usd,
+                        premium_discount_details,
+                    ))
 
-                    # Get affected rows count (1 = insert, 2 = update)
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
+                total_inserted, total_updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_bitcoin_etf_premium_discount_history", columns, values,
+                    key_columns=["timestamp", "ticker"],
+                    update_columns=["nav_usd", "market_price_usd", "premium_discount_details"],
+                )
+                total_updated += batch_duplicates
 
             self.conn.commit()
 
@@ -1590,67 +2224,41 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_bitcoin_etf_flows_history (
-            timestamp, flow_usd
-        ) VALUES (%s, %s)
-        ON DUPLICATE KEY UPDATE
-            flow_usd=VALUES(flow_usd),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        etf_flows_sql = """
-        INSERT INTO cg_bitcoin_etf_flows_details (
-            timestamp, etf_ticker, flow_usd
-        ) VALUES (%s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            flow_usd=VALUES(flow_usd),
-            updated_at=CURRENT_TIMESTAMP
-        """
+        main_values = []
+        detail_values = []
+        for row in rows:
+            # Process main flows record
+            flow_usd = row.get("flow_usd")
+            if flow_usd is not None and flow_usd != 0:
+                main_values.append((row.get("timestamp"), flow_usd))
+
+            # Individual ETF flows
+            etf_flows = row.get("etf_flows", [])
+            for etf_flow in etf_flows:
+                etf_flow_usd = etf_flow.get("flow_usd")
+                # Skip if flow_usd is None or 0.00000000
+                if etf_flow_usd is not None and etf_flow_usd != 0:
+                    detail_values.append((row.get("timestamp"), etf_flow.get("etf_ticker"), etf_flow_usd))
+
+        # Track records for accurate counting
+        total_main_flow_records = len(main_values)
+        total_detail_records = len(detail_values)
 
         try:
             with self.conn.cursor() as cur:
-                # Track records for accurate counting
-                total_main_flow_records = 0
-                main_flows_inserted = 0
-                main_flows_updated = 0
-
-                total_detail_records = 0
-                details_inserted = 0
-                details_updated = 0
+                main_flows_inserted, main_flows_updated, main_batch_duplicates = self._bulk_upsert(
+                    cur, "cg_bitcoin_etf_flows_history", ["timestamp", "flow_usd"], main_values,
+                    key_columns=["timestamp"],
+                    update_columns=["flow_usd"],
+                )
+                main_flows_updated += main_batch_duplicates
 
-                for row in rows:
-                    # Process main flows record
-                    flow_usd = row.get("flow_usd")
-                    if flow_usd is not None and flow_usd != 0:
-                        timestamp = row.get("timestamp")
-                        total_main_flow_records += 1
-
-                        cur.execute(sql, (timestamp, flow_usd))
-
-                        # Get affected rows count for main flows (1 = insert, 2 = update)
-                        if cur.rowcount == 1:
-                            main_flows_inserted += 1
-                        elif cur.rowcount == 2:
-                            main_flows_updated += 1
-
-                    # Insert individual ETF flows
-                    etf_flows = row.get("etf_flows", [])
-                    for etf_flow in etf_flows:
-                        etf_flow_usd = etf_flow.get("flow_usd")
-                        # Skip if flow_usd is None or 0.00000000
-                        if etf_flow_usd is not None and etf_flow_usd != 0:
-                            timestamp = row.get("timestamp")
-                            etf_ticker = etf_flow.get("etf_ticker")
-                            total_detail_records += 1
-
-                            cur.execute(etf_flows_sql, (timestamp, etf_ticker, etf_flow_usd))
-
-                            # Get affected rows count for details (1 = insert, 2 = update)
-                            if cur.rowcount == 1:
-                                details_inserted += 1
-                            elif cur.rowcount == 2:
-                                details_updated += 1
+                details_inserted, details_updated, details_batch_duplicates = self._bulk_upsert(
+                    cur, "cg_bitcoin_etf_flows_details", ["timestamp", "etf_ticker", "flow_usd"], detail_values,
+                    key_columns=["timestamp", "etf_ticker"],
+                    update_columns=["flow_usd"],
+                )
+                details_updated += details_batch_duplicates
 
             self.conn.commit()
 
@@ -1807,40 +2415,27 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_bitcoin_vs_global_m2_growth (
-            timestamp, price, global_m2_yoy_growth, global_m2_supply
-        )
-        VALUES (%s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            price = VALUES(price),
-            global_m2_yoy_growth = VALUES(global_m2_yoy_growth),
-            global_m2_supply = VALUES(global_m2_supply)
-        """
-
-        total_inserted = 0
-        total_updated = 0
+        columns = ["timestamp", "price", "global_m2_yoy_growth", "global_m2_supply"]
+        values = [
+            (
+                row.get("timestamp"),
+                row.get("price"),
+                row.get("global_m2_yoy_growth"),
+                row.get("global_m2_supply"),
+            )
+            for row in rows
+        ]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(
-                        sql,
-                        (
-                            row.get("timestamp"),
-                            row.get("price"),
-                            row.get("global_m2_yoy_growth"),
-                            row.get("global_m2_supply"),
-                        ),
-                    )
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
+                total_inserted, total_updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_bitcoin_vs_global_m2_growth", columns, values,
+                    key_columns=["timestamp"],
+                    update_columns=columns[1:],
+                )
             self.conn.commit()
             result["bitcoin_vs_global_m2_growth"] = total_inserted
-            result["bitcoin_vs_global_m2_growth_duplicates"] = total_updated
+            result["bitcoin_vs_global_m2_growth_duplicates"] = total_updated + batch_duplicates
             return result
         except pymysql.Error as e:
             self.conn.rollback()
@@ -1852,13 +2447,39 @@ class CoinglassRepository:
             return result
 
     # ========== Options ==========
+    def get_option_exchange_oi_history_at(
+        self, symbol: str, unit: str, range_param: str, at: Optional[int] = None
+    ) -> Optional[Dict]:
+        """Option exchange OI history as it was at `at` (ms; default: latest), in the API response shape."""
+        snapshot = self.get_snapshot(
+            "option_exchange_oi_history", ":".join(self.series_key(symbol, unit, range_param)), at
+        )
+        if not snapshot:
+            return None
+        version_time, sets = snapshot
+        time_list = sets.get("time_list", [])
+        return {
+            "version_time": version_time,
+            "time_list": [row[0] for row in time_list],
+            "price_list": [row[1] for row in time_list],
+            "data_map": {
+                name.split(".", 1)[1]: values for name, values in sets.items() if name.startswith("data_map.")
+            },
+        }
+
     def upsert_option_exchange_oi_history(
         self, symbol: str, unit: str, range_param: str, data: Dict
     ) -> Dict[str, int]:
-        """Upsert Option Exchange OI History data with relational structure."""
+        """
+        Upsert Option Exchange OI History data with relational structure.
+
+        The parent row is upserted and its time list / exchange data children
+        replaced through _upsert_parent and _bulk_replace_children.
+        """
         result = {
             "option_exchange_oi_history": 0,
             "option_exchange_oi_history_duplicates": 0,
+            "option_exchange_oi_history_versions": 0,
         }
 
         # Return early if no data
@@ -1868,79 +2489,55 @@ class CoinglassRepository:
 
         try:
             with self.conn.cursor() as cur:
-                # First, insert/upsert the main record
-                main_sql = """
-                INSERT INTO cg_option_exchange_oi_history (
-                    symbol, unit, `range`
+                # Main record; its id comes back through LAST_INSERT_ID
+                option_exchange_oi_history_id, inserted = self._upsert_parent(
+                    cur, "cg_option_exchange_oi_history", {"symbol": symbol, "unit": unit, "range": range_param}
                 )
-                VALUES (%s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    updated_at = CURRENT_TIMESTAMP
-                """
-
-                cur.execute(main_sql, (symbol, unit, range_param))
-
-                # Get the ID of the main record
-                if cur.rowcount == 1:
-                    # New insert
-                    option_exchange_oi_history_id = cur.lastrowid
+                if inserted:
                     result["option_exchange_oi_history"] = 1
                 else:
-                    # Update - get existing ID
-                    cur.execute(
-                        "SELECT id FROM cg_option_exchange_oi_history WHERE symbol = %s AND unit = %s AND `range` = %s",
-                        (symbol, unit, range_param)
-                    )
-                    option_exchange_oi_history_id = cur.fetchone()[0]
                     result["option_exchange_oi_history_duplicates"] = 1
 
-                # Delete existing child records to refresh data
-                cur.execute(
-                    "DELETE FROM cg_option_exchange_oi_history_time_list WHERE option_exchange_oi_history_id = %s",
-                    (option_exchange_oi_history_id,)
-                )
-                cur.execute(
-                    "DELETE FROM cg_option_exchange_oi_history_exchange_data WHERE option_exchange_oi_history_id = %s",
-                    (option_exchange_oi_history_id,)
-                )
-
                 # Extract data from JSON
                 time_list = data.get("time_list", [])
                 price_list = data.get("price_list", [])
                 data_map = data.get("data_map", {})
 
-                # Insert time list and price data
-                time_list_sql = """
-                INSERT INTO cg_option_exchange_oi_history_time_list (
-                    option_exchange_oi_history_id, timestamp_index, timestamp, price
-                )
-                VALUES (%s, %s, %s, %s)
-                """
-
-                time_list_data = []
-                for i, timestamp in enumerate(time_list):
-                    price = price_list[i] if i < len(price_list) else None
-                    time_list_data.append((option_exchange_oi_history_id, i, timestamp, price))
-
-                if time_list_data:
-                    cur.executemany(time_list_sql, time_list_data)
-
-                # Insert exchange data
-                exchange_data_sql = """
-                INSERT INTO cg_option_exchange_oi_history_exchange_data (
-                    option_exchange_oi_history_id, timestamp_index, exchange, open_interest
+                time_list_data = [
+                    (i, timestamp, price_list[i] if i < len(price_list) else None)
+                    for i, timestamp in enumerate(time_list)
+                ]
+                # Only keep values that have a timestamp
+                exchange_data_list = [
+                    (i, exchange, oi_value)
+                    for exchange, oi_values in data_map.items()
+                    for i, oi_value in enumerate(oi_values[:len(time_list)])
+                ]
+
+                # Refresh child records
+                self._bulk_replace_children(
+                    cur,
+                    option_exchange_oi_history_id,
+                    [
+                        (
+                            "cg_option_exchange_oi_history_time_list", "option_exchange_oi_history_id",
+                            ["timestamp_index", "timestamp", "price"], time_list_data,
+                        ),
+                        (
+                            "cg_option_exchange_oi_history_exchange_data", "option_exchange_oi_history_id",
+                            ["timestamp_index", "exchange", "open_interest"], exchange_data_list,
+                        ),
+                    ],
+                    replace=not inserted,
                 )
-                VALUES (%s, %s, %s, %s)
-                """
 
-                exchange_data_list = []
+                # Version history (delta against the previous version)
+                sets = {"time_list": [[ts, price] for _, ts, price in time_list_data]}
                 for exchange, oi_values in data_map.items():
-                    for i, oi_value in enumerate(oi_values):
-                        if i < len(time_list):  # Only insert if timestamp exists
-                            exchange_data_list.append((option_exchange_oi_history_id, i, exchange, oi_value))
-
-                if exchange_data_list:
-                    cur.executemany(exchange_data_sql, exchange_data_list)
+                    sets[f"data_map.{exchange}"] = list(oi_values[:len(time_list)])
+                result["option_exchange_oi_history_versions"] = self._record_snapshot(
+                    cur, "option_exchange_oi_history", ":".join(self.series_key(symbol, unit, range_param)), sets
+                )
 
             self.conn.commit()
             return result
@@ -1955,12 +2552,52 @@ class CoinglassRepository:
             return result
 
     # ========== Sentiment ==========
+    _fear_greed_dedupe_ready: Optional[bool] = None
+
+    @staticmethod
+    def _fear_greed_value(value: Any) -> Optional[int]:
+        """Render an index value the way the INT column stores it."""
+        return None if value is None else int(round(float(value)))
+
+    def _fear_greed_dedupe_supported(self, cur) -> bool:
+        """Check once per process that migrate_tables.py added the fingerprint columns."""
+        if CoinglassRepository._fear_greed_dedupe_ready is None:
+            cur.execute("SHOW COLUMNS FROM cg_fear_greed_index LIKE 'value_count'")
+            ready = cur.fetchone() is not None
+            if not ready:
+                self.logger.warning(
+                    "⚠️ Fear & greed dedupe unavailable until `python migrate_tables.py` runs; "
+                    "appending full snapshots"
+                )
+            CoinglassRepository._fear_greed_dedupe_ready = ready
+        return CoinglassRepository._fear_greed_dedupe_ready
+
+    def _fear_greed_values(self, cur, parent_id: int, count: Optional[int] = None) -> List[Optional[int]]:
+        """Stored data_list of one snapshot, None where a value was missing; `count` restores trailing gaps."""
+        cur.execute(
+            "SELECT sequence_order, index_value FROM cg_fear_greed_index_data_list "
+            "WHERE fear_greed_index_id=%s ORDER BY sequence_order",
+            (parent_id,),
+        )
+        rows = cur.fetchall()
+        length = rows[-1]["sequence_order"] + 1 if rows else 0
+        values: List[Optional[int]] = [None] * max(length, count or 0)
+        for row in rows:
+            values[row["sequence_order"]] = row["index_value"]
+        return values
+
     def upsert_fear_greed_index(self, data: Dict) -> Dict[str, int]:
         """
         Upsert Fear & Greed Index data with parent-child relationship.
 
         Main table: cg_fear_greed_index
         Child table: cg_fear_greed_index_data_list (linked by fear_greed_index_id)
+
+        The API returns the whole daily history every time, so the latest
+        snapshot is kept current instead of appending a copy per run: an
+        unchanged data_list (same content_hash) only touches updated_at, a
+        changed one rewrites children from the first differing position on,
+        which for a new day is just the appended tail.
         """
         result = {
             "fear_greed_index": 0,
@@ -1974,42 +2611,77 @@ class CoinglassRepository:
             self.logger.warning("No data_list found in fear_greed_index response")
             return result
 
-        import time
         fetch_timestamp = int(time.time() * 1000)  # Current timestamp in milliseconds
-
-        main_sql = """
-        INSERT INTO cg_fear_greed_index (fetch_timestamp)
-        VALUES (%s)
-        """
-
-        child_sql = """
-        INSERT INTO cg_fear_greed_index_data_list (
-            fear_greed_index_id, index_value, sequence_order
-        )
-        VALUES (%s, %s, %s)
-        """
+        values = [self._fear_greed_value(v) for v in data_list]
+        content_hash = self._fingerprint(values)
+        child_table = ("cg_fear_greed_index_data_list", "fear_greed_index_id", ["index_value", "sequence_order"])
 
         try:
             with self.conn.cursor() as cur:
-                # Insert main record
-                cur.execute(main_sql, (fetch_timestamp,))
-                parent_id = cur.lastrowid
-                result["fear_greed_index"] = 1
+                latest = None
+                if self._fear_greed_dedupe_supported(cur):
+                    cur.execute("SELECT id, content_hash, value_count FROM cg_fear_greed_index ORDER BY id DESC LIMIT 1")
+                    latest = cur.fetchone()
 
-                # Insert child records
-                total_inserted = 0
-                for order, index_value in enumerate(data_list):
-                    if index_value is not None:
-                        cur.execute(child_sql, (parent_id, index_value, order))
-                        if cur.rowcount == 1:
-                            total_inserted += 1
+                if latest and latest["content_hash"] == content_hash:
+                    # Unchanged: keep updated_at moving, freshness is tracked by it
+                    cur.execute(
+                        "UPDATE cg_fear_greed_index SET updated_at=CURRENT_TIMESTAMP WHERE id=%s", (latest["id"],)
+                    )
+                    result["fear_greed_index_duplicates"] = 1
+                    result["fear_greed_index_data_list_duplicates"] = len(values)
+                    self.logger.info(f"Fear & Greed Index unchanged: parent_id={latest['id']}, values={len(values)}")
+
+                elif latest:
+                    parent_id = latest["id"]
+                    stored = self._fear_greed_values(cur, parent_id, latest["value_count"])
+                    first_diff = next(
+                        (i for i, (old, new) in enumerate(zip(stored, values)) if old != new),
+                        min(len(stored), len(values)),
+                    )
+                    if first_diff < len(stored):
+                        cur.execute(
+                            "DELETE FROM cg_fear_greed_index_data_list "
+                            "WHERE fear_greed_index_id=%s AND sequence_order >= %s",
+                            (parent_id, first_diff),
+                        )
+                    child_values = [
+                        (value, order)
+                        for order, value in enumerate(values[first_diff:], start=first_diff)
+                        if value is not None
+                    ]
+                    total_inserted = self._bulk_replace_children(
+                        cur, parent_id, [child_table + (child_values,)], replace=False
+                    )
+                    cur.execute(
+                        "UPDATE cg_fear_greed_index SET fetch_timestamp=%s, content_hash=%s, value_count=%s WHERE id=%s",
+                        (fetch_timestamp, content_hash, len(values), parent_id),
+                    )
+                    result["fear_greed_index_duplicates"] = 1
+                    result["fear_greed_index_data_list"] = total_inserted
+                    result["fear_greed_index_data_list_duplicates"] = sum(v is not None for v in values[:first_diff])
+                    self.logger.info(
+                        f"Updated Fear & Greed Index: parent_id={parent_id}, "
+                        f"from_position={first_diff}, data_list_written={total_inserted}"
+                    )
 
-                result["fear_greed_index_data_list"] = total_inserted
+                else:
+                    parent = {"fetch_timestamp": fetch_timestamp}
+                    if self._fear_greed_dedupe_ready:
+                        parent.update(content_hash=content_hash, value_count=len(values))
+                    parent_id, _ = self._upsert_parent(cur, "cg_fear_greed_index", parent)
+                    result["fear_greed_index"] = 1
+
+                    child_values = [(value, order) for order, value in enumerate(values) if value is not None]
+                    total_inserted = self._bulk_replace_children(
+                        cur, parent_id, [child_table + (child_values,)], replace=False
+                    )
+                    result["fear_greed_index_data_list"] = total_inserted
 
-                self.logger.info(
-                    f"Inserted Fear & Greed Index: parent_id={parent_id}, "
-                    f"fetch_timestamp={fetch_timestamp}, data_list_count={total_inserted}"
-                )
+                    self.logger.info(
+                        f"Inserted Fear & Greed Index: parent_id={parent_id}, "
+                        f"fetch_timestamp={fetch_timestamp}, data_list_count={total_inserted}"
+                    )
 
             self.conn.commit()
             return result
@@ -2030,6 +2702,63 @@ class CoinglassRepository:
             )
             return result
 
+    def compact_fear_greed_index(self, chunk_size: int = 50) -> Dict[str, int]:
+        """
+        Collapse the duplicate snapshots left by appending a full data_list per run.
+
+        Snapshots are walked oldest first; one whose values equal, or are a
+        prefix of, the next snapshot's is redundant and deleted (its children
+        cascade). Survivors get content_hash / value_count so the writer can
+        continue from the latest. Deletes commit every `chunk_size` parents.
+        """
+        result = {"snapshots": 0, "removed": 0, "kept": 0, "data_list_removed": 0}
+
+        try:
+            with self.conn.cursor() as cur:
+                if not self._fear_greed_dedupe_supported(cur):
+                    raise RuntimeError("cg_fear_greed_index lacks content_hash/value_count; run migrate_tables.py first")
+
+                cur.execute("SELECT id FROM cg_fear_greed_index ORDER BY id")
+                parent_ids = [row["id"] for row in cur.fetchall()]
+                result["snapshots"] = len(parent_ids)
+
+                redundant: List[int] = []
+                previous_id, previous = None, None
+                for parent_id in parent_ids:
+                    current = self._fear_greed_values(cur, parent_id)
+                    if previous_id is not None:
+                        if current[:len(previous)] == previous:
+                            redundant.append(previous_id)
+                            result["data_list_removed"] += sum(v is not None for v in previous)
+                        else:
+                            self._mark_fear_greed_snapshot(cur, previous_id, previous)
+                            result["kept"] += 1
+                    previous_id, previous = parent_id, current
+                if previous_id is not None:
+                    self._mark_fear_greed_snapshot(cur, previous_id, previous)
+                    result["kept"] += 1
+                self.conn.commit()
+
+                for i in range(0, len(redundant), chunk_size):
+                    chunk = redundant[i:i + chunk_size]
+                    placeholders = ", ".join(["%s"] * len(chunk))
+                    cur.execute(f"DELETE FROM cg_fear_greed_index WHERE id IN ({placeholders})", chunk)
+                    self.conn.commit()
+                    result["removed"] += len(chunk)
+                    self.logger.info(f"🧹 Removed {result['removed']}/{len(redundant)} duplicate fear & greed snapshots")
+
+            return result
+        except pymysql.Error as e:
+            self.conn.rollback()
+            self.logger.error(f"Database error compacting fear_greed_index: {e}")
+            raise
+
+    def _mark_fear_greed_snapshot(self, cur, parent_id: int, values: List[Optional[int]]) -> None:
+        cur.execute(
+            "UPDATE cg_fear_greed_index SET content_hash=%s, value_count=%s, updated_at=updated_at WHERE id=%s",
+            (self._fingerprint(values), len(values), parent_id),
+        )
+
     def upsert_hyperliquid_whale_alert(self, rows: List[Dict]) -> Dict[str, int]:
         """Upsert Hyperliquid Whale Alert data with duplicate detection."""
         result = {
@@ -2040,47 +2769,34 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_hyperliquid_whale_alert (
-            user, symbol, position_size, entry_price, liq_price,
-            position_value_usd, position_action, create_time
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            position_size = VALUES(position_size),
-            entry_price = VALUES(entry_price),
-            liq_price = VALUES(liq_price),
-            position_value_usd = VALUES(position_value_usd),
-            position_action = VALUES(position_action)
-        """
-
-        total_inserted = 0
-        total_updated = 0
+        columns = [
+            "user", "symbol", "position_size", "entry_price", "liq_price",
+            "position_value_usd", "position_action", "create_time"
+        ]
+        values = [
+            (
+                row.get("user"),
+                row.get("symbol"),
+                row.get("position_size"),
+                row.get("entry_price"),
+                row.get("liq_price"),
+                row.get("position_value_usd"),
+                row.get("position_action"),
+                row.get("create_time"),
+            )
+            for row in rows
+        ]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(
-                        sql,
-                        (
-                            row.get("user"),
-                            row.get("symbol"),
-                            row.get("position_size"),
-                            row.get("entry_price"),
-                            row.get("liq_price"),
-                            row.get("position_value_usd"),
-                            row.get("position_action"),
-                            row.get("create_time"),
-                        ),
-                    )
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
+                total_inserted, total_updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_hyperliquid_whale_alert", columns, values,
+                    key_columns=["user", "symbol", "create_time"],
+                    update_columns=["position_size", "entry_price", "liq_price", "position_value_usd", "position_action"],
+                )
             self.conn.commit()
             result["hyperliquid_whale_alert"] = total_inserted
-            result["hyperliquid_whale_alert_duplicates"] = total_updated
+            result["hyperliquid_whale_alert_duplicates"] = total_updated + batch_duplicates
             return result
         except pymysql.Error as e:
             self.conn.rollback()
@@ -2101,51 +2817,35 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_whale_transfer (
-            transaction_hash, amount_usd, asset_quantity, asset_symbol,
-            from_address, to_address, blockchain_name, block_height, block_timestamp
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            amount_usd = VALUES(amount_usd),
-            asset_quantity = VALUES(asset_quantity),
-            asset_symbol = VALUES(asset_symbol),
-            from_address = VALUES(from_address),
-            to_address = VALUES(to_address),
-            blockchain_name = VALUES(blockchain_name),
-            block_height = VALUES(block_height),
-            block_timestamp = VALUES(block_timestamp)
-        """
-
-        total_inserted = 0
-        total_updated = 0
+        columns = [
+            "transaction_hash", "amount_usd", "asset_quantity", "asset_symbol",
+            "from_address", "to_address", "blockchain_name", "block_height", "block_timestamp"
+        ]
+        values = [
+            (
+                row.get("transaction_hash"),
+                row.get("amount_usd"),
+                row.get("asset_quantity"),
+                row.get("asset_symbol"),
+                row.get("from"),
+                row.get("to"),
+                row.get("blockchain_name"),
+                row.get("block_height"),
+                row.get("block_timestamp"),
+            )
+            for row in rows
+        ]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(
-                        sql,
-                        (
-                            row.get("transaction_hash"),
-                            row.get("amount_usd"),
-                            row.get("asset_quantity"),
-                            row.get("asset_symbol"),
-                            row.get("from"),
-                            row.get("to"),
-                            row.get("blockchain_name"),
-                            row.get("block_height"),
-                            row.get("block_timestamp"),
-                        ),
-                    )
-                    affected_rows = cur.rowcount
-                    if affected_rows == 1:
-                        total_inserted += 1
-                    elif affected_rows == 2:
-                        total_updated += 1
+                total_inserted, total_updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_whale_transfer", columns, values,
+                    key_columns=["transaction_hash"],
+                    update_columns=columns[1:],
+                )
             self.conn.commit()
             result["whale_transfer"] = total_inserted
-            result["whale_transfer_duplicates"] = total_updated
+            result["whale_transfer_duplicates"] = total_updated + batch_duplicates
             return result
         except pymysql.Error as e:
             self.conn.rollback()
@@ -2166,32 +2866,28 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_spot_orderbook_history (
-            exchange, pair, `interval`, range_percent, time,
-            bids_usd, bids_quantity, asks_usd, asks_quantity
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            bids_usd=VALUES(bids_usd), bids_quantity=VALUES(bids_quantity),
-            asks_usd=VALUES(asks_usd), asks_quantity=VALUES(asks_quantity),
-            updated_at=CURRENT_TIMESTAMP
-        """
+        columns = [
+            "exchange", "pair", "interval", "range_percent", "time",
+            "bids_usd", "bids_quantity", "asks_usd", "asks_quantity"
+        ]
+        values = [
+            (
+                exchange, pair, interval, range_percent, row.get("time"),
+                row.get("bids_usd"), row.get("bids_quantity"),
+                row.get("asks_usd"), row.get("asks_quantity")
+            )
+            for row in rows
+        ]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange, pair, interval, range_percent, row.get("time"),
-                        row.get("bids_usd"), row.get("bids_quantity"),
-                        row.get("asks_usd"), row.get("asks_quantity")
-                    ))
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["spot_orderbook_history"] += 1
-                    else:
-                        result["spot_orderbook_history_duplicates"] += 1
+                inserted, updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_spot_orderbook_history", columns, values,
+                    key_columns=columns[:5],
+                    update_columns=columns[5:],
+                )
+                result["spot_orderbook_history"] += inserted
+                result["spot_orderbook_history_duplicates"] += updated + batch_duplicates
             self.conn.commit()
             return result
         except pymysql.Error as e:
@@ -2221,33 +2917,29 @@ class CoinglassRepository:
         if not rows:
             return result
 
-        sql = """
-        INSERT INTO cg_spot_orderbook_aggregated (
-            exchange_name, symbol, `interval`, range_percent, time,
-            aggregated_bids_usd, aggregated_bids_quantity,
-            aggregated_asks_usd, aggregated_asks_quantity
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            aggregated_bids_usd=VALUES(aggregated_bids_usd), aggregated_bids_quantity=VALUES(aggregated_bids_quantity),
-            aggregated_asks_usd=VALUES(aggregated_asks_usd), aggregated_asks_quantity=VALUES(aggregated_asks_quantity),
-            updated_at=CURRENT_TIMESTAMP
-        """
+        columns = [
+            "exchange_name", "symbol", "interval", "range_percent", "time",
+            "aggregated_bids_usd", "aggregated_bids_quantity",
+            "aggregated_asks_usd", "aggregated_asks_quantity"
+        ]
+        values = [
+            (
+                exchange_name, symbol, interval, range_percent, row.get("time"),
+                row.get("aggregated_bids_usd"), row.get("aggregated_bids_quantity"),
+                row.get("aggregated_asks_usd"), row.get("aggregated_asks_quantity")
+            )
+            for row in rows
+        ]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange_name, symbol, interval, range_percent, row.get("time"),
-                        row.get("aggregated_bids_usd"), row.get("aggregated_bids_quantity"),
-                        row.get("aggregated_asks_usd"), row.get("aggregated_asks_quantity")
-                    ))
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["spot_orderbook_aggregated"] += 1
-                    else:
-                        result["spot_orderbook_aggregated_duplicates"] += 1
+                inserted, updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_spot_orderbook_aggregated", columns, values,
+                    key_columns=columns[:5],
+                    update_columns=columns[5:],
+                )
+                result["spot_orderbook_aggregated"] += inserted
+                result["spot_orderbook_aggregated_duplicates"] += updated + batch_duplicates
             self.conn.commit()
             return result
         except pymysql.Error as e:
@@ -2255,14 +2947,14 @@ class CoinglassRepository:
             error_code = e.args[0] if e.args else 'unknown'
             error_msg = e.args[1] if len(e.args) > 1 else str(e)
             self.logger.error(
-                f"Database error upserting spot_orderbook_aggregated for {exchange_list}:{symbol}:{interval}:{range_percent} - "
+                f"Database error upserting spot_orderbook_aggregated for {exchange_name}:{symbol}:{interval}:{range_percent} - "
                 f"Error code: {error_code}, Message: {error_msg}"
             )
             return result
         except Exception as e:
             self.conn.rollback()
             self.logger.error(
-                f"Unexpected error upserting spot_orderbook_aggregated for {exchange_list}:{symbol}:{interval}:{range_percent} - "
+                f"Unexpected error upserting spot_orderbook_aggregated for {exchange_name}:{symbol}:{interval}:{range_percent} - "
                 f"Type: {type(e).__name__}, Message: {str(e)}"
             )
             return result
@@ -2306,29 +2998,17 @@ class CoinglassRepository:
             "volume_flow_usd_24h", "volume_flow_usd_1w"
         ]
 
-        placeholders = ", ".join(["%s"] * len(columns))
-        update_clauses = ", ".join([f"{col}=VALUES({col})" for col in columns])
-
-        sql = f"""
-        INSERT INTO cg_spot_coins_markets ({', '.join(columns)})
-        VALUES ({placeholders})
-        ON DUPLICATE KEY UPDATE
-            {update_clauses},
-            updated_at=CURRENT_TIMESTAMP
-        """
+        values = [[row.get(col) for col in columns] for row in rows]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    values = [row.get(col) for col in columns]
-                    cur.execute(sql, values)
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["spot_coins_markets"] += 1
-                    else:
-                        result["spot_coins_markets_duplicates"] += 1
+                inserted, updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_spot_coins_markets", columns, values,
+                    key_columns=["symbol"],
+                    update_columns=columns,
+                )
+                result["spot_coins_markets"] += inserted
+                result["spot_coins_markets_duplicates"] += updated + batch_duplicates
             self.conn.commit()
             return result
         except pymysql.Error as e:
@@ -2379,29 +3059,17 @@ class CoinglassRepository:
             "volume_change_usd_1w", "volume_change_percent_1w", "net_flows_usd_1w"
         ]
 
-        placeholders = ", ".join(["%s"] * len(columns))
-        update_clauses = ", ".join([f"{col}=VALUES({col})" for col in columns])
-
-        sql = f"""
-        INSERT INTO cg_spot_pairs_markets ({', '.join(columns)})
-        VALUES ({placeholders})
-        ON DUPLICATE KEY UPDATE
-            {update_clauses},
-            updated_at=CURRENT_TIMESTAMP
-        """
+        values = [[row.get(col) for col in columns] for row in rows]
 
         try:
             with self.conn.cursor() as cur:
-                for row in rows:
-                    values = [row.get(col) for col in columns]
-                    cur.execute(sql, values)
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["spot_pairs_markets"] += 1
-                    else:
-                        result["spot_pairs_markets_duplicates"] += 1
+                inserted, updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_spot_pairs_markets", columns, values,
+                    key_columns=["symbol", "exchange_name"],
+                    update_columns=columns,
+                )
+                result["spot_pairs_markets"] += inserted
+                result["spot_pairs_markets_duplicates"] += updated + batch_duplicates
             self.conn.commit()
             return result
         except pymysql.Error as e:
@@ -2424,221 +3092,133 @@ class CoinglassRepository:
     # ===== SPOT PRICE HISTORY =====
     def upsert_spot_price_history(self, exchange: str, symbol: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """Upsert spot price history data."""
-        result = {
-            "spot_price_history": 0,
-            "spot_price_history_duplicates": 0
-        }
-
-        if not rows:
-            return result
-
-        sql = """
-        INSERT INTO cg_spot_price_history (
-            exchange, symbol, `interval`, time, open, high, low, close, volume_usd
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open=VALUES(open), high=VALUES(high), low=VALUES(low),
-            close=VALUES(close), volume_usd=VALUES(volume_usd),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange, symbol, interval, row.get("time"),
-                        row.get("open"), row.get("high"),
-                        row.get("low"), row.get("close"),
-                        row.get("volume_usd")
-                    ))
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["spot_price_history"] += 1
-                    else:
-                        result["spot_price_history_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except pymysql.Error as e:
-            self.conn.rollback()
-            error_code = e.args[0] if e.args else 'unknown'
-            error_msg = e.args[1] if len(e.args) > 1 else str(e)
-            self.logger.error(
-                f"Database error upserting spot_price_history for {exchange}:{symbol}:{interval} - "
-                f"Error code: {error_code}, Message: {error_msg}"
+        return self.write_batches([self.build_spot_price_history(exchange, symbol, interval, rows)])[0]
+
+    def build_spot_price_history(self, exchange: str, symbol: str, interval: str, rows: List[Dict]) -> RowBatch:
+        """Spot price history rows for write_batches()."""
+        columns = ["exchange", "symbol", "interval", "time", "open", "high", "low", "close", "volume_usd"]
+        values = [
+            (
+                exchange, symbol, interval, row.get("time"),
+                row.get("open"), row.get("high"),
+                row.get("low"), row.get("close"),
+                row.get("volume_usd")
             )
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(
-                f"Unexpected error upserting spot_price_history for {exchange}:{symbol}:{interval} - "
-                f"Type: {type(e).__name__}, Message: {str(e)}"
-            )
-            return result
+            for row in rows or []
+        ]
+        return RowBatch(
+            "cg_spot_price_history", columns, values,
+            key_columns=columns[:4],
+            update_columns=columns[4:],
+            tally=upsert_counts("spot_price_history"),
+            label=f"spot_price_history for {exchange}:{symbol}:{interval}",
+        )
 
     # ===== OPEN INTEREST AGGREGATED STABLECOIN HISTORY =====
     def upsert_open_interest_aggregated_stablecoin_history(self, exchange_list: str, symbol: str, interval: str, rows: List[Dict]) -> Dict[str, int]:
         """Upsert open interest aggregated stablecoin history (OHLC) data."""
-        result = {
-            "open_interest_aggregated_stablecoin_history": 0,
-            "open_interest_aggregated_stablecoin_history_duplicates": 0
-        }
-
-        if not rows:
-            return result
-
-        sql = """
-        INSERT INTO cg_open_interest_aggregated_stablecoin_history (
-            exchange_list, symbol, `interval`, time, open, high, low, close
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            open=VALUES(open), high=VALUES(high), low=VALUES(low), close=VALUES(close),
-            updated_at=CURRENT_TIMESTAMP
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in rows:
-                    cur.execute(sql, (
-                        exchange_list, symbol, interval, row.get("time"),
-                        row.get("open"), row.get("high"),
-                        row.get("low"), row.get("close")
-                    ))
-                    # Get affected rows count
-                    affected = cur.rowcount
-                    # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                    if affected == 1:
-                        result["open_interest_aggregated_stablecoin_history"] += 1
-                    else:
-                        result["open_interest_aggregated_stablecoin_history_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except pymysql.Error as e:
-            self.conn.rollback()
-            error_code = e.args[0] if e.args else 'unknown'
-            error_msg = e.args[1] if len(e.args) > 1 else str(e)
-            self.logger.error(
-                f"Database error upserting open_interest_aggregated_stablecoin_history for {exchange_list}:{symbol}:{interval} - "
-                f"Error code: {error_code}, Message: {error_msg}"
+        return self.write_batches([
+            self.build_open_interest_aggregated_stablecoin_history(exchange_list, symbol, interval, rows)
+        ])[0]
+
+    def build_open_interest_aggregated_stablecoin_history(
+        self, exchange_list: str, symbol: str, interval: str, rows: List[Dict]
+    ) -> RowBatch:
+        """Open interest aggregated stablecoin history rows for write_batches()."""
+        columns = ["exchange_list", "symbol", "interval", "time", "open", "high", "low", "close"]
+        values = [
+            (
+                exchange_list, symbol, interval, row.get("time"),
+                row.get("open"), row.get("high"),
+                row.get("low"), row.get("close")
             )
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(
-                f"Unexpected error upserting open_interest_aggregated_stablecoin_history for {exchange_list}:{symbol}:{interval} - "
-                f"Type: {type(e).__name__}, Message: {str(e)}"
-            )
-            return result
+            for row in rows or []
+        ]
+        return RowBatch(
+            "cg_open_interest_aggregated_stablecoin_history", columns, values,
+            key_columns=columns[:4],
+            update_columns=columns[4:],
+            tally=upsert_counts("open_interest_aggregated_stablecoin_history"),
+            label=f"open_interest_aggregated_stablecoin_history for {exchange_list}:{symbol}:{interval}",
+        )
 
     
     # ===== NEW ENDPOINTS REPOSITORY METHODS =====
 
     def insert_futures_footprint_history(self, exchange: str, symbol: str, interval: str, data: List[List]) -> Dict[str, int]:
         """Insert futures footprint history data with duplicate checking."""
-        result = {
-            "futures_footprint_history": 0,
-            "futures_footprint_history_duplicates": 0
-        }
+        return self.write_batches([self.build_futures_footprint_history(exchange, symbol, interval, data)])[0]
 
-        if not data:
-            return result
+    def build_futures_footprint_history(self, exchange: str, symbol: str, interval: str, data: List[List]) -> RowBatch:
+        """Futures footprint rows (one per price range of each candle) for write_batches()."""
+        columns = [
+            "exchange", "symbol", "interval", "time", "price_start", "price_end",
+            "taker_buy_volume", "taker_sell_volume", "taker_buy_volume_usd",
+            "taker_sell_volume_usd", "taker_buy_trades", "taker_sell_trades"
+        ]
 
-        sql = """
-        INSERT INTO cg_futures_footprint_history (
-            exchange, symbol, `interval`, time, price_start, price_end,
-            taker_buy_volume, taker_sell_volume, taker_buy_volume_usd,
-            taker_sell_volume_usd, taker_buy_trades, taker_sell_trades
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            taker_buy_volume=VALUES(taker_buy_volume),
-            taker_sell_volume=VALUES(taker_sell_volume),
-            taker_buy_volume_usd=VALUES(taker_buy_volume_usd),
-            taker_sell_volume_usd=VALUES(taker_sell_volume_usd),
-            taker_buy_trades=VALUES(taker_buy_trades),
-            taker_sell_trades=VALUES(taker_sell_trades)
-        """
+        values = []
+        for timestamp, price_ranges in data or []:
+            for price_range in price_ranges:
+                if len(price_range) >= 8:
+                    values.append((
+                        exchange, symbol, interval, timestamp,
+                        price_range[0],  # price_start
+                        price_range[1],  # price_end
+                        price_range[2],  # taker_buy_volume
+                        price_range[3],  # taker_sell_volume
+                        price_range[4],  # taker_buy_volume_usd
+                        price_range[5],  # taker_sell_volume_usd
+                        price_range[7],  # taker_buy_trades (index 6 is duplicate)
+                        price_range[8] if len(price_range) > 8 else 0  # taker_sell_trades
+                    ))
 
-        try:
-            with self.conn.cursor() as cur:
-                for timestamp, price_ranges in data:
-                    for price_range in price_ranges:
-                        if len(price_range) >= 8:
-                            cur.execute(sql, (
-                                exchange, symbol, interval, timestamp,
-                                price_range[0],  # price_start
-                                price_range[1],  # price_end
-                                price_range[2],  # taker_buy_volume
-                                price_range[3],  # taker_sell_volume
-                                price_range[4],  # taker_buy_volume_usd
-                                price_range[5],  # taker_sell_volume_usd
-                                price_range[7],  # taker_buy_trades (index 6 is duplicate)
-                                price_range[8] if len(price_range) > 8 else 0  # taker_sell_trades
-                            ))
-                            # Get affected rows count
-                            affected = cur.rowcount
-                            # rowcount = 1 for INSERT, 2 for UPDATE (but may vary)
-                            if affected == 1:
-                                result["futures_footprint_history"] += 1
-                            else:
-                                result["futures_footprint_history_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error inserting futures footprint history: {e}")
-            return result
+        return RowBatch(
+            "cg_futures_footprint_history", columns, values,
+            key_columns=columns[:6],
+            update_columns=columns[6:],
+            tally=upsert_counts("futures_footprint_history"),
+            label=f"futures footprint history for {exchange}:{symbol}:{interval}",
+        )
 
     def insert_spot_large_orderbook_history(self, exchange: str, symbol: str, state: str, data: List[Dict]) -> Dict[str, int]:
         """Insert spot large orderbook history data."""
-        result = {
-            "saved": 0,
-            "duplicates": 0
-        }
-
-        if not data:
-            return result
+        return self.write_batches([self.build_spot_large_orderbook_history(exchange, symbol, state, data)])[0]
 
-        sql = """
-        INSERT INTO cg_spot_large_orderbook_history (
-            order_id, exchange_name, symbol, base_asset, quote_asset, limit_price,
-            start_time, start_quantity, start_usd_value, current_quantity,
-            current_usd_value, `current_time`, executed_volume, executed_usd_value,
-            trade_count, order_side, order_state, order_end_time
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            current_quantity=VALUES(current_quantity),
-            current_usd_value=VALUES(current_usd_value),
-            `current_time`=VALUES(`current_time`),
-            executed_volume=VALUES(executed_volume),
-            executed_usd_value=VALUES(executed_usd_value),
-            trade_count=VALUES(trade_count),
-            order_state=VALUES(order_state),
-            order_end_time=VALUES(order_end_time)
+    def build_spot_large_orderbook_history(self, exchange: str, symbol: str, state: str, data: List[Dict]) -> RowBatch:
         """
+        Spot large orderbook history rows for write_batches().
 
-        try:
-            with self.conn.cursor() as cur:
-                for row in data:
-                    cur.execute(sql, (
-                        row.get("id"), row.get("exchange_name"), row.get("symbol"),
-                        row.get("base_asset"), row.get("quote_asset"), row.get("limit_price"),
-                        row.get("start_time"), row.get("start_quantity"), row.get("start_usd_value"),
-                        row.get("current_quantity"), row.get("current_usd_value"), row.get("current_time"),
-                        row.get("executed_volume"), row.get("executed_usd_value"), row.get("trade_count"),
-                        row.get("order_side"), row.get("order_state"), row.get("order_end_time")
-                    ))
-                    # Get affected rows count (1 = insert, 2 = update)
-                    if cur.rowcount == 1:
-                        result["saved"] += 1
-                    elif cur.rowcount == 2:
-                        result["duplicates"] += 1
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error inserting spot large orderbook history: {e}")
-            return result
+        Without key_columns the batch is written on its own (counts come from
+        affected rows), but it still shares the commit with the others.
+        """
+        columns = [
+            "order_id", "exchange_name", "symbol", "base_asset", "quote_asset", "limit_price",
+            "start_time", "start_quantity", "start_usd_value", "current_quantity",
+            "current_usd_value", "current_time", "executed_volume", "executed_usd_value",
+            "trade_count", "order_side", "order_state", "order_end_time"
+        ]
+        values = [
+            (
+                row.get("id"), row.get("exchange_name"), row.get("symbol"),
+                row.get("base_asset"), row.get("quote_asset"), row.get("limit_price"),
+                row.get("start_time"), row.get("start_quantity"), row.get("start_usd_value"),
+                row.get("current_quantity"), row.get("current_usd_value"), row.get("current_time"),
+                row.get("executed_volume"), row.get("executed_usd_value"), row.get("trade_count"),
+                row.get("order_side"), row.get("order_state"), row.get("order_end_time")
+            )
+            for row in data or []
+        ]
+        return RowBatch(
+            "cg_spot_large_orderbook_history", columns, values,
+            key_columns=None,
+            update_columns=[
+                "current_quantity", "current_usd_value", "current_time", "executed_volume",
+                "executed_usd_value", "trade_count", "order_state", "order_end_time"
+            ],
+            tally=lambda inserted, updated, _: {"saved": inserted, "duplicates": updated},
+            label=f"spot large orderbook history for {exchange}:{symbol}:{state}",
+        )
 
     def insert_spot_large_orderbook(self, exchange: str, symbol: str, data: List[Dict]) -> Dict[str, int]:
         """Insert current spot large orderbook data."""
@@ -2650,39 +3230,36 @@ class CoinglassRepository:
         if not data:
             return result
 
-        sql = """
-        INSERT INTO cg_spot_large_orderbook (
-            order_id, exchange_name, symbol, base_asset, quote_asset, limit_price,
-            start_time, start_quantity, start_usd_value, current_quantity,
-            current_usd_value, `current_time`, executed_volume, executed_usd_value,
-            trade_count, order_side, order_state
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            current_quantity=VALUES(current_quantity),
-            current_usd_value=VALUES(current_usd_value),
-            `current_time`=VALUES(`current_time`),
-            executed_volume=VALUES(executed_volume),
-            executed_usd_value=VALUES(executed_usd_value),
-            trade_count=VALUES(trade_count),
-            order_state=VALUES(order_state)
-        """
+        columns = [
+            "order_id", "exchange_name", "symbol", "base_asset", "quote_asset", "limit_price",
+            "start_time", "start_quantity", "start_usd_value", "current_quantity",
+            "current_usd_value", "current_time", "executed_volume", "executed_usd_value",
+            "trade_count", "order_side", "order_state"
+        ]
+        values = [
+            (
+                row.get("id"), row.get("exchange_name"), row.get("symbol"),
+                row.get("base_asset"), row.get("quote_asset"), row.get("limit_price"),
+                row.get("start_time"), row.get("start_quantity"), row.get("start_usd_value"),
+                row.get("current_quantity"), row.get("current_usd_value"), row.get("current_time"),
+                row.get("executed_volume"), row.get("executed_usd_value"), row.get("trade_count"),
+                row.get("order_side"), row.get("order_state")
+            )
+            for row in data
+        ]
 
         try:
             with self.conn.cursor() as cur:
-                for row in data:
-                    cur.execute(sql, (
-                        row.get("id"), row.get("exchange_name"), row.get("symbol"),
-                        row.get("base_asset"), row.get("quote_asset"), row.get("limit_price"),
-                        row.get("start_time"), row.get("start_quantity"), row.get("start_usd_value"),
-                        row.get("current_quantity"), row.get("current_usd_value"), row.get("current_time"),
-                        row.get("executed_volume"), row.get("executed_usd_value"), row.get("trade_count"),
-                        row.get("order_side"), row.get("order_state")
-                    ))
-                    # Get affected rows count (1 = insert, 2 = update)
-                    if cur.rowcount == 1:
-                        result["saved"] += 1
-                    elif cur.rowcount == 2:
-                        result["duplicates"] += 1
+                inserted, updated, batch_duplicates = self._bulk_upsert(
+                    cur, "cg_spot_large_orderbook", columns, values,
+                    key_columns=["order_id"],
+                    update_columns=[
+                        "current_quantity", "current_usd_value", "current_time", "executed_volume",
+                        "executed_usd_value", "trade_count", "order_state"
+                    ],
+                )
+                result["saved"] += inserted
+                result["duplicates"] += updated + batch_duplicates
             self.conn.commit()
             return result
         except Exception as e:
@@ -2692,226 +3269,150 @@ class CoinglassRepository:
 
     def insert_spot_aggregated_taker_volume_history(self, exchange_name: str, symbol: str, interval: str, unit: str, data: List[Dict]) -> Dict[str, int]:
         """Insert spot aggregated taker volume history data for individual exchanges."""
-        result = {
-            "saved": 0,
-            "duplicates": 0
-        }
+        return self.write_batches([
+            self.build_spot_aggregated_taker_volume_history(exchange_name, symbol, interval, unit, data)
+        ])[0]
 
-        if not data:
-            return result
-
-        sql = """
-        INSERT INTO cg_spot_aggregated_taker_volume_history (
-            exchange_name, symbol, `interval`, unit, time,
-            aggregated_buy_volume_usd, aggregated_sell_volume_usd
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            aggregated_buy_volume_usd=VALUES(aggregated_buy_volume_usd),
-            aggregated_sell_volume_usd=VALUES(aggregated_sell_volume_usd)
+    def build_spot_aggregated_taker_volume_history(
+        self, exchange_name: str, symbol: str, interval: str, unit: str, data: List[Dict]
+    ) -> RowBatch:
         """
+        Spot aggregated taker volume rows for write_batches().
 
-        try:
-            with self.conn.cursor() as cur:
-                # Track unique timestamps to calculate duplicates correctly
-                unique_timestamps = set()
-
-                for row in data:
-                    timestamp = row.get("time")
-
-                    # Track unique timestamps regardless of insert/update
-                    unique_timestamps.add(timestamp)
-
-                    cur.execute(sql, (
-                        exchange_name, symbol, interval, unit,
-                        timestamp,
-                        row.get("aggregated_buy_volume_usd"),
-                        row.get("aggregated_sell_volume_usd")
-                    ))
-
-                # Calculate the correct number of records based on unique timestamps
-                total_records = len(data)
-                unique_records = len(unique_timestamps)
-
-                # All unique records are either new or updated, count them as "saved"
-                result["saved"] = unique_records
-                # The rest are duplicates
-                result["duplicates"] = total_records - unique_records
-
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error inserting spot aggregated taker volume history: {e}")
-            return result
+        All unique records are either new or updated and count as "saved";
+        repeated timestamps within the batch are duplicates.
+        """
+        columns = [
+            "exchange_name", "symbol", "interval", "unit", "time",
+            "aggregated_buy_volume_usd", "aggregated_sell_volume_usd"
+        ]
+        values = [
+            (
+                exchange_name, symbol, interval, unit,
+                row.get("time"),
+                row.get("aggregated_buy_volume_usd"),
+                row.get("aggregated_sell_volume_usd")
+            )
+            for row in data or []
+        ]
+        return RowBatch(
+            "cg_spot_aggregated_taker_volume_history", columns, values,
+            key_columns=["exchange_name", "symbol", "interval", "time"],
+            update_columns=columns[5:],
+            tally=lambda inserted, updated, batch_duplicates: {
+                "saved": inserted + updated, "duplicates": batch_duplicates
+            },
+            label=f"spot aggregated taker volume history for {exchange_name}:{symbol}:{interval}",
+        )
 
     def insert_spot_taker_volume_history(self, exchange: str, symbol: str, interval: str, unit: str, data: List[Dict]) -> Dict[str, int]:
         """Insert spot taker volume history data."""
-        result = {
-            "saved": 0,
-            "duplicates": 0
-        }
-
-        if not data:
-            return result
+        return self.write_batches([self.build_spot_taker_volume_history(exchange, symbol, interval, unit, data)])[0]
 
-        sql = """
-        INSERT INTO cg_spot_taker_volume_history (
-            exchange, symbol, `interval`, unit, time,
-            aggregated_buy_volume_usd, aggregated_sell_volume_usd
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            aggregated_buy_volume_usd=VALUES(aggregated_buy_volume_usd),
-            aggregated_sell_volume_usd=VALUES(aggregated_sell_volume_usd)
+    def build_spot_taker_volume_history(
+        self, exchange: str, symbol: str, interval: str, unit: str, data: List[Dict]
+    ) -> RowBatch:
         """
+        Spot taker volume rows for write_batches().
 
-        try:
-            with self.conn.cursor() as cur:
-                # Track unique timestamps to calculate duplicates correctly
-                unique_timestamps = set()
-
-                for row in data:
-                    timestamp = row.get("time")
-
-                    # Track unique timestamps regardless of insert/update
-                    unique_timestamps.add(timestamp)
-
-                    cur.execute(sql, (
-                        exchange, symbol, interval, unit,
-                        timestamp,
-                        row.get("aggregated_buy_volume_usd"),
-                        row.get("aggregated_sell_volume_usd")
-                    ))
-
-                # Calculate the correct number of records based on unique timestamps
-                total_records = len(data)
-                unique_records = len(unique_timestamps)
-
-                # All unique records are either new or updated, count them as "saved"
-                result["saved"] = unique_records
-                # The rest are duplicates
-                result["duplicates"] = total_records - unique_records
-
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error inserting spot taker volume history: {e}")
-            return result
+        All unique records are either new or updated and count as "saved";
+        repeated timestamps within the batch are duplicates.
+        """
+        columns = [
+            "exchange", "symbol", "interval", "unit", "time",
+            "aggregated_buy_volume_usd", "aggregated_sell_volume_usd"
+        ]
+        values = [
+            (
+                exchange, symbol, interval, unit,
+                row.get("time"),
+                row.get("aggregated_buy_volume_usd"),
+                row.get("aggregated_sell_volume_usd")
+            )
+            for row in data or []
+        ]
+        return RowBatch(
+            "cg_spot_taker_volume_history", columns, values,
+            key_columns=["exchange", "symbol", "interval", "time"],
+            update_columns=columns[5:],
+            tally=lambda inserted, updated, batch_duplicates: {
+                "saved": inserted + updated, "duplicates": batch_duplicates
+            },
+            label=f"spot taker volume history for {exchange}:{symbol}:{interval}",
+        )
 
     def upsert_spot_ask_bids_history_batch(self, exchange: str, symbol: str, interval: str, range_percent: str, data: List[Dict]) -> Dict[str, int]:
         """Upsert spot ask bids history data in batch."""
-        result = {
-            "spot_ask_bids_history": 0,
-            "spot_ask_bids_history_duplicates": 0,
-        }
-
-        if not data:
-            return result
-
-        sql = """
-        INSERT INTO cg_spot_ask_bids_history (
-            exchange_name, symbol, base_asset, quote_asset, `interval`, range_percent,
-            time, bids_usd, bids_quantity, asks_usd, asks_quantity
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            bids_usd=VALUES(bids_usd),
-            bids_quantity=VALUES(bids_quantity),
-            asks_usd=VALUES(asks_usd),
-            asks_quantity=VALUES(asks_quantity)
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                # Track unique timestamps to calculate duplicates correctly
-                unique_timestamps = set()
-
-                for row in data:
-                    # For now, use simple parsing - this could be improved later
-                    base_asset = symbol.replace('USDT', '').replace('USD', '')
-                    quote_asset = 'USDT'
-                    if 'USD' not in symbol:
-                        quote_asset = 'BTC'
-
-                    timestamp = row.get("time")
-
-                    # Check if this timestamp is unique
-                    is_new_record = timestamp not in unique_timestamps
-                    unique_timestamps.add(timestamp)
-
-                    cur.execute(sql, (
-                        exchange, symbol, base_asset, quote_asset, interval, range_percent,
-                        timestamp,
-                        row.get("bids_usd"),
-                        row.get("bids_quantity"),
-                        row.get("asks_usd"),
-                        row.get("asks_quantity")
-                    ))
-
-                    # Get affected rows count (1 = insert, 2 = update)
-                    if cur.rowcount == 1:
-                        result["spot_ask_bids_history"] += 1
-                    elif cur.rowcount == 2:
-                        result["spot_ask_bids_history_duplicates"] += 1
-
-                # Calculate the correct number of duplicates
-                total_records = len(data)
-                unique_records = len(unique_timestamps)
-                actual_duplicates = total_records - unique_records
-
-                # Update the duplicates count to reflect the real number of duplicate records
-                result["spot_ask_bids_history_duplicates"] = actual_duplicates
+        return self.write_batches([self.build_spot_ask_bids_history(exchange, symbol, interval, range_percent, data)])[0]
+
+    def build_spot_ask_bids_history(
+        self, exchange: str, symbol: str, interval: str, range_percent: str, data: List[Dict]
+    ) -> RowBatch:
+        """Spot ask bids history rows for write_batches(); duplicates are repeated timestamps within the batch."""
+        # For now, use simple parsing - this could be improved later
+        base_asset = symbol.replace('USDT', '').replace('USD', '')
+        quote_asset = 'USDT'
+        if 'USD' not in symbol:
+            quote_asset = 'BTC'
 
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error upserting spot ask bids history batch: {e}")
-            return result
+        columns = [
+            "exchange_name", "symbol", "base_asset", "quote_asset", "interval", "range_percent",
+            "time", "bids_usd", "bids_quantity", "asks_usd", "asks_quantity"
+        ]
+        values = [
+            (
+                exchange, symbol, base_asset, quote_asset, interval, range_percent,
+                row.get("time"),
+                row.get("bids_usd"),
+                row.get("bids_quantity"),
+                row.get("asks_usd"),
+                row.get("asks_quantity")
+            )
+            for row in data or []
+        ]
+        return RowBatch(
+            "cg_spot_ask_bids_history", columns, values,
+            key_columns=["exchange_name", "symbol", "interval", "range_percent", "time"],
+            update_columns=columns[7:],
+            tally=lambda inserted, _, batch_duplicates: {
+                "spot_ask_bids_history": inserted, "spot_ask_bids_history_duplicates": batch_duplicates
+            },
+            label=f"spot ask bids history batch for {exchange}:{symbol}:{interval}:{range_percent}",
+        )
 
     def upsert_spot_aggregated_ask_bids_history_batch(self, exchange_name: str, symbol: str, interval: str, range_percent: str, data: List[Dict]) -> Dict[str, int]:
         """Upsert spot aggregated ask bids history data in batch."""
-        result = {
-            "spot_aggregated_ask_bids_history": 0,
-            "spot_aggregated_ask_bids_history_duplicates": 0,
-        }
+        return self.write_batches([
+            self.build_spot_aggregated_ask_bids_history(exchange_name, symbol, interval, range_percent, data)
+        ])[0]
 
-        if not data:
-            return result
+    def build_spot_aggregated_ask_bids_history(
+        self, exchange_name: str, symbol: str, interval: str, range_percent: str, data: List[Dict]
+    ) -> RowBatch:
+        """Spot aggregated ask bids history rows for write_batches()."""
+        # For now, use simple parsing - this could be improved later
+        base_asset = symbol.replace('USDT', '').replace('USD', '')
 
-        sql = """
-        INSERT INTO cg_spot_aggregated_ask_bids_history (
-            exchange_name, symbol, base_asset, `interval`, range_percent,
-            time, aggregated_bids_usd, aggregated_bids_quantity, aggregated_asks_usd, aggregated_asks_quantity
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            aggregated_bids_usd=VALUES(aggregated_bids_usd),
-            aggregated_bids_quantity=VALUES(aggregated_bids_quantity),
-            aggregated_asks_usd=VALUES(aggregated_asks_usd),
-            aggregated_asks_quantity=VALUES(aggregated_asks_quantity)
-        """
-
-        try:
-            with self.conn.cursor() as cur:
-                for row in data:
-                    # For now, use simple parsing - this could be improved later
-                    base_asset = symbol.replace('USDT', '').replace('USD', '')
-
-                    cur.execute(sql, (
-                        exchange_name, symbol, base_asset, interval, range_percent,
-                        row.get("time"),
-                        row.get("aggregated_bids_usd"),
-                        row.get("aggregated_bids_quantity"),
-                        row.get("aggregated_asks_usd"),
-                        row.get("aggregated_asks_quantity")
-                    ))
-                    # Get affected rows count (1 = insert, 2 = update)
-                    if cur.rowcount == 1:
-                        result["spot_aggregated_ask_bids_history"] += 1
-                    elif cur.rowcount == 2:
-                        result["spot_aggregated_ask_bids_history_duplicates"] += 1
-            self.conn.commit()
-            return result
-        except Exception as e:
-            self.conn.rollback()
-            self.logger.error(f"Error upserting spot aggregated ask bids history batch: {e}")
-            return result
+        columns = [
+            "exchange_name", "symbol", "base_asset", "interval", "range_percent",
+            "time", "aggregated_bids_usd", "aggregated_bids_quantity",
+            "aggregated_asks_usd", "aggregated_asks_quantity"
+        ]
+        values = [
+            (
+                exchange_name, symbol, base_asset, interval, range_percent,
+                row.get("time"),
+                row.get("aggregated_bids_usd"),
+                row.get("aggregated_bids_quantity"),
+                row.get("aggregated_asks_usd"),
+                row.get("aggregated_asks_quantity")
+            )
+            for row in data or []
+        ]
+        return RowBatch(
+            "cg_spot_aggregated_ask_bids_history", columns, values,
+            key_columns=["exchange_name", "symbol", "interval", "range_percent", "time"],
+            update_columns=columns[6:],
+            tally=upsert_counts("spot_aggregated_ask_bids_history"),
+            label=f"spot aggregated ask bids history batch for {exchange_name}:{symbol}:{interval}:{range_percent}",
+        )
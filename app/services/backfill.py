@@ -0,0 +1,208 @@
+# app/services/backfill.py
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.database.connection import get_connection
+from app.providers.coinglass.fanout import param_grid
+
+logger = logging.getLogger(__name__)
+
+# List-valued pipeline params that select a series; each work item gets one value of each
+SERIES_PARAM_KEYS = ("exchanges", "exchange_lists", "symbols", "pairs", "states", "ranges", "units", "timeframes", "intervals")
+
+# Candle timeframes worth backfilling in windows (sub-hour history is too short to page through)
+BATCH_TIMEFRAMES = ["1h", "4h", "6h", "8h", "12h", "1d", "1w"]
+
+# Pipeline summary counters that count calls rather than rows
+NON_ROW_COUNTERS = ("fetches", "errors", "_filtered")
+
+
+def time_windows(start_ts: int, end_ts: int, days: int) -> List[Dict[str, int]]:
+    """Split [start_ts, end_ts) (seconds) into windows of `days`, as API start_time/end_time in ms."""
+    windows = []
+    step = days * 24 * 60 * 60
+    current = start_ts
+    while current < end_ts:
+        window_end = min(current + step, end_ts)
+        windows.append({"start_time": current * 1000, "end_time": window_end * 1000})
+        current = window_end
+    return windows
+
+
+@dataclass
+class BackfillItem:
+    """One pipeline call: a single series over a single time window."""
+
+    pipeline: str
+    series: Tuple[Tuple[str, Any], ...]
+    window: Dict[str, int]
+
+    @property
+    def label(self) -> str:
+        series = "/".join(str(value) for _, value in self.series)
+        start = datetime.fromtimestamp(self.window["start_time"] // 1000).strftime("%Y-%m-%d")
+        end = datetime.fromtimestamp(self.window["end_time"] // 1000).strftime("%Y-%m-%d")
+        return f"{self.pipeline}[{series}] {start}→{end}"
+
+
+class BackfillEngine:
+    """
+    Concurrent executor for --historical backfills.
+
+    The job is expanded into (pipeline, series, time-window) work items: one
+    series per combination of the pipeline's SERIES_PARAM_KEYS values, one
+    window per BACKFILL_WINDOW_DAYS. Windows of a series form a chain from
+    newest to oldest, so each item depends on the window after it; series
+    are independent and run concurrently on `workers` threads, each item on
+    its own pooled connection. API calls go through the shared client and
+    its rate limiter, so more workers never exceed the plan budget.
+
+    After BACKFILL_PRUNE_AFTER_EMPTY consecutive windows without any rows
+    the series' history is taken to start later, and its remaining (older)
+    windows are pruned instead of spending requests on them. Pipelines log
+    and swallow their own fetch errors, so a single empty window is not
+    enough. Progress is logged every BACKFILL_PROGRESS_SECONDS.
+    """
+
+    def __init__(self, service, workers: Optional[int] = None, window_days: Optional[int] = None):
+        self.service = service
+        self.workers = max(1, workers or settings.BACKFILL_WORKERS)
+        self.window_days = max(1, window_days or settings.BACKFILL_WINDOW_DAYS)
+        self.prune_after = settings.BACKFILL_PRUNE_AFTER_EMPTY
+        self.progress_seconds = settings.BACKFILL_PROGRESS_SECONDS
+
+    def _series(self, pipeline: str) -> List[Tuple[Tuple[str, Any], ...]]:
+        params = self.service.pipelines[pipeline]["params"]
+        axes = {}
+        for key in SERIES_PARAM_KEYS:
+            values = params.get(key)
+            if not isinstance(values, list) or not values:
+                continue
+            if key == "timeframes":
+                values = [value for value in values if value in BATCH_TIMEFRAMES]
+            axes[key] = values
+        if not axes:
+            return [()]
+        return [tuple(combo.items()) for combo in param_grid(**axes)]
+
+    def plan(self, pipelines: List[str], start_ts: int, end_ts: int) -> List[List[BackfillItem]]:
+        """Work item chains, one per (pipeline, series), each ordered newest window first."""
+        windows = list(reversed(time_windows(start_ts, end_ts, self.window_days)))
+        chains = []
+        for pipeline in pipelines:
+            for series in self._series(pipeline):
+                chains.append([BackfillItem(pipeline, series, window) for window in windows])
+        return chains
+
+    def _run_item(self, item: BackfillItem) -> Tuple[int, int, int]:
+        """Run one work item; returns (records inserted, rows seen, fetch errors)."""
+        params = self.service.pipelines[item.pipeline]["params"].copy()
+        for key, value in item.series:
+            params[key] = [value]
+        params.update(item.window)
+        params["snapshots"] = False
+
+        conn = get_connection()
+        if not conn:
+            raise ConnectionError("Failed to connect to database")
+        try:
+            result = self.service.pipelines[item.pipeline]["func"](
+                conn=conn, client=self.service.client, params=params
+            )
+        finally:
+            conn.close()
+
+        if not isinstance(result, dict):
+            records = int(result) if isinstance(result, (int, float)) else 0
+            return records, records, 0
+        counts = {
+            str(k): v for k, v in result.items()
+            if isinstance(v, int) and not isinstance(v, bool) and not str(k).endswith(NON_ROW_COUNTERS)
+        }
+        records = sum(v for k, v in counts.items() if not k.endswith("_duplicates"))
+        return records, sum(counts.values()), int(result.get("errors", 0) or 0)
+
+    def run(self, pipelines: List[str], start_ts: int, end_ts: int) -> Dict[str, Dict[str, int]]:
+        """Run the backfill; returns {pipeline: {records, batches, errors, pruned}}."""
+        chains = self.plan(pipelines, start_ts, end_ts)
+        total = sum(len(chain) for chain in chains)
+        results = {name: {"records": 0, "batches": 0, "errors": 0, "pruned": 0} for name in pipelines}
+        logger.info(
+            f"🧩 Backfill plan: {total} work items ({len(chains)} series x up to "
+            f"{max((len(c) for c in chains), default=0)} windows of {self.window_days}d), {self.workers} workers"
+        )
+        if not total:
+            return results
+
+        started = time.time()
+        last_report = started
+        finished = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill")
+        futures = {}
+        empty_streak = [0] * len(chains)
+
+        def _submit(chain_idx: int, pos: int) -> None:
+            item = chains[chain_idx][pos]
+            futures[executor.submit(self._run_item, item)] = (chain_idx, pos)
+
+        try:
+            for chain_idx in range(len(chains)):
+                _submit(chain_idx, 0)
+
+            while futures:
+                done, _ = wait(list(futures), timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chain_idx, pos = futures.pop(future)
+                    chain = chains[chain_idx]
+                    item = chain[pos]
+                    summary = results[item.pipeline]
+                    finished += 1
+                    has_more = pos + 1 < len(chain)
+                    try:
+                        records, seen, fetch_errors = future.result()
+                        summary["records"] += records
+                        summary["batches"] += 1
+                        summary["errors"] += fetch_errors
+                        empty_streak[chain_idx] = 0 if seen or fetch_errors else empty_streak[chain_idx] + 1
+                        if self.prune_after and empty_streak[chain_idx] >= self.prune_after and has_more:
+                            pruned = len(chain) - pos - 1
+                            summary["pruned"] += pruned
+                            finished += pruned
+                            has_more = False
+                            logger.info(f"   ⏭️ {item.label}: no data, skipping {pruned} older windows")
+                    except Exception as e:
+                        summary["errors"] += 1
+                        # Funding rate history rejects windows older than the API keeps
+                        if item.pipeline == "funding_rate" and "time error" in str(e):
+                            logger.warning(f"   ⚠️ {item.label}: API time limitation (expected for old data)")
+                        else:
+                            logger.error(f"   ❌ {item.label}: {e}")
+                    if has_more:
+                        _submit(chain_idx, pos + 1)
+
+                now = time.time()
+                if now - last_report >= self.progress_seconds or not futures:
+                    last_report = now
+                    self._log_progress(results, finished, total, now - started)
+        except KeyboardInterrupt:
+            logger.warning(f"⏹️ Backfill interrupted after {finished}/{total} work items")
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+        return results
+
+    def _log_progress(self, results: Dict[str, Dict[str, int]], finished: int, total: int, elapsed: float) -> None:
+        records = sum(r["records"] for r in results.values())
+        errors = sum(r["errors"] for r in results.values())
+        eta = ""
+        if 0 < finished < total:
+            eta = f", ETA {(elapsed / finished * (total - finished)) / 60:.1f}m"
+        logger.info(
+            f"📦 Backfill progress: {finished}/{total} ({finished / total:.0%}), "
+            f"{records} records, {errors} errors, {elapsed / 60:.1f}m elapsed{eta}"
+        )
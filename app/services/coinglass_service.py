@@ -1,6 +1,8 @@
 # app/services/coinglass_service.py
+import functools
 import logging
 import os
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from app.database.connection import get_connection
@@ -53,7 +55,8 @@ from app.providers.coinglass.pipelines import (
 )
 from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.config import settings
-from app.monitoring.freshness_monitor import DataFreshnessMonitor
+from app.core.parallel import run_with_deadline
+from app.monitoring.freshness_monitor import DataFreshnessMonitor, load_freshness_snapshot, save_freshness_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -382,9 +385,9 @@ class CoinglassService:
         repository.ensure_schema()
 
     def run_pipeline(
-        self, pipeline_name: str, custom_params: Optional[Dict[str, Any]] = None
+        self, pipeline_name: str, custom_params: Optional[Dict[str, Any]] = None, conn=None
     ) -> Dict[str, Any]:
-        """Run a single pipeline with optional custom parameters."""
+        """Run a single pipeline with optional custom parameters (on `conn`, default: the service connection)."""
         if pipeline_name not in self.pipelines:
             raise ValueError(
                 f"Unknown pipeline: {pipeline_name}. "
@@ -422,7 +425,7 @@ class CoinglassService:
         logger.info(f"Running pipeline '{pipeline_name}'{f' for exchange {exchange_filter}' if exchange_filter else ''}")
 
         try:
-            result = pipeline_func(self.conn, self.client, params)
+            result = pipeline_func(conn or self.conn, self.client, params)
             logger.info(f"Pipeline '{pipeline_name}' completed successfully")
             return result
         except Exception as e:
@@ -430,18 +433,63 @@ class CoinglassService:
             return {"error": str(e)}
 
     def run_selected_pipelines(self, pipeline_names: List[str]) -> Dict[str, Any]:
-        """Run selected pipelines."""
-        results = {}
-        for name in pipeline_names:
-            try:
-                results[name] = self.run_pipeline(name)
-            except Exception as e:
-                logger.error(f"Failed to run pipeline {name}: {e}")
-                results[name] = {"error": str(e)}
+        """Run selected pipelines (concurrently when PIPELINE_MAX_PARALLEL > 1)."""
+        max_parallel = min(settings.PIPELINE_MAX_PARALLEL, len(pipeline_names))
+        if max_parallel > 1:
+            results = self._run_parallel(pipeline_names, max_parallel, settings.PIPELINE_TIMEOUT_SECONDS)
+        else:
+            results = {}
+            for name in pipeline_names:
+                try:
+                    results[name] = self.run_pipeline(name)
+                except Exception as e:
+                    logger.error(f"Failed to run pipeline {name}: {e}")
+                    results[name] = {"error": str(e)}
+
+        stats = self.client.pool_stats()
+        logger.info(
+            f"🔌 HTTP pool: requests={stats['requests']}, reused={stats['hits']}, new connections={stats['misses']}"
+        )
         return results
 
-    def run_all_pipelines(self, check_freshness: bool = True) -> Dict[str, Any]:
-        """Run all pipelines with optional freshness monitoring."""
+    def _run_on_own_connection(self, name: str) -> Dict[str, Any]:
+        conn = get_connection()
+        if not conn:
+            return {"error": "Failed to connect to database"}
+        try:
+            return self.run_pipeline(name, conn=conn)
+        finally:
+            conn.close()
+
+    def _run_parallel(self, pipeline_names: List[str], max_parallel: int, timeout: float) -> Dict[str, Any]:
+        """
+        Run pipelines on a thread pool, each on its own pooled connection.
+
+        A pipeline still running `timeout` seconds after it started is reported
+        as an error and abandoned; its thread finishes in the background and
+        returns its connection to the pool. Pipelines that cannot start before
+        the run's deadline are cancelled and reported as errors, and one still
+        running from an earlier run is skipped instead of started twice.
+        Results keep `pipeline_names` order.
+        """
+        logger.info(f"⚡ Running {len(pipeline_names)} pipelines with up to {max_parallel} in parallel")
+        return run_with_deadline(
+            "pipeline",
+            {name: functools.partial(self._run_on_own_connection, name) for name in pipeline_names},
+            max_parallel,
+            timeout,
+            on_error=lambda name, message: {"error": message},
+            on_skip=lambda name, message: {"skipped": message},
+            log=logger,
+        )
+
+    def run_all_pipelines(self, check_freshness: bool = False) -> Dict[str, Any]:
+        """
+        Run all pipelines, optionally followed by a synchronous freshness sweep.
+
+        Freshness normally runs on its own cadence (FreshnessRunner), so the
+        sweep no longer delays the next ingestion cycle.
+        """
         logger.info("Running all pipelines...")
 
         # Run pipelines
@@ -516,10 +564,15 @@ class CoinglassService:
                     ("bitcoin_etf_premium_discount_history", "cg_bitcoin_etf_premium_discount_history"),
                 ]
 
+                # Row counts and latest times from the ingestion stats ledger; untracked tables are scanned
+                ledger = CoinglassRepository(self.conn).get_ingestion_stats([table for _, table in tables])
+
                 for key, table in tables:
                     try:
+                        if table in ledger:
+                            row = {"count": ledger[table]["row_count"], "latest_time": ledger[table]["max_time"]}
                         # Different tables have different time columns, so handle them separately
-                        if table == "cg_bitcoin_etf_list":
+                        elif table == "cg_bitcoin_etf_list":
                             cur.execute(f"SELECT COUNT(*) as count, MAX(update_timestamp) as latest_time FROM {table}")
                         # elif table == "cg_bitcoin_etf_history":  # DISABLED - Endpoint not documented in API markdown
                         #     cur.execute(f"SELECT COUNT(*) as count, MAX(assets_date) as latest_time FROM {table}")
@@ -536,7 +589,7 @@ class CoinglassService:
                         #     cur.execute(f"SELECT COUNT(*) as count, MAX(UNIX_TIMESTAMP(updated_at) * 1000) as latest_time FROM {table}")
                         elif table in ["cg_spot_coins_markets", "cg_spot_pairs_markets"]:
                             # These tables don't have a time column, use updated_at instead
-                            cur.execute(f"SELECT COUNT(*) as count, MAX(UNIX_TIMESTAMP(updated_at) * 1000) as latest_time FROM {table}")
+                            cur.execute(f"SELECT COUNT(*) as count, UNIX_TIMESTAMP(MAX(updated_at)) * 1000 as latest_time FROM {table}")
                         elif table == "cg_spot_large_orderbook_history":
                             # Uses start_time as the primary time column
                             cur.execute(f"SELECT COUNT(*) as count, MAX(start_time) as latest_time FROM {table}")
@@ -546,7 +599,8 @@ class CoinglassService:
                         else:
                             cur.execute(f"SELECT COUNT(*) as count, MAX(time) as latest_time FROM {table}")
 
-                        row = cur.fetchone()
+                        if table not in ledger:
+                            row = cur.fetchone()
                         status[key] = {
                             "count": row["count"],
                             "latest_time": row["latest_time"],
@@ -569,19 +623,37 @@ class CoinglassService:
             logger.error(f"Failed to get status: {e}")
             return {"error": str(e)}
 
-    def check_and_log_freshness(self) -> Dict[str, Any]:
-        """Check and log freshness for all data streams."""
+    def compact_fear_greed_index(self) -> Dict[str, int]:
+        """Collapse duplicate fear & greed snapshots into the latest one (one-off cleanup)."""
+        return CoinglassRepository(self.conn, logger).compact_fear_greed_index()
+
+    def check_and_log_freshness(self, use_cache: bool = False) -> Dict[str, Any]:
+        """
+        Check and log freshness for all data streams.
+
+        With use_cache, the latest snapshot published by the background
+        freshness sweep is reported when it is recent enough; otherwise the
+        streams are checked live and the snapshot is refreshed.
+        """
         try:
+            if use_cache:
+                snapshot = load_freshness_snapshot()
+                if snapshot:
+                    checked_at, results = snapshot
+                    logger.info(f"📦 Freshness snapshot from {time.time() - checked_at:.0f}s ago")
+                    self.freshness_monitor.log_freshness_status(results)
+                    self.freshness_monitor.log_freshness_alerts(results)
+                    return results
+                logger.info("No recent freshness snapshot, checking live")
+
             logger.info("🔍 Checking data freshness...")
             results = self.freshness_monitor.check_all_streams_freshness()
             self.freshness_monitor.log_freshness_status(results)
-
-            # Generate and log alerts
-            alerts = self.freshness_monitor.get_freshness_alerts(results)
-            if alerts:
-                logger.warning("🚨 FRESHNESS ALERTS:")
-                for alert in alerts:
-                    logger.warning(f"   {alert}")
+            self.freshness_monitor.log_freshness_alerts(results)
+            try:
+                save_freshness_snapshot(results)
+            except Exception as e:
+                logger.warning(f"Could not publish freshness snapshot: {e}")
 
             return results
         except Exception as e:
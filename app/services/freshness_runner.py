@@ -0,0 +1,76 @@
+# app/services/freshness_runner.py
+import logging
+import signal
+import threading
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.database.connection import get_connection
+from app.monitoring.freshness_monitor import DataFreshnessMonitor, FreshnessResult, save_freshness_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class FreshnessRunner:
+    """
+    Freshness sweep on its own cadence, off the ingestion path.
+
+    Every `interval_seconds` it checks all streams on a pooled connection,
+    logs the report and alerts, and publishes the results to
+    FRESHNESS_CACHE_PATH, where `--freshness` reads them. Runs either as a
+    sidecar process (run_forever, `--freshness-loop`) or as a daemon thread
+    next to the pipelines (start/stop).
+    """
+
+    def __init__(self, interval_seconds: Optional[float] = None):
+        self.interval_seconds = interval_seconds or settings.FRESHNESS_INTERVAL_SECONDS
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, FreshnessResult]:
+        conn = get_connection()
+        if not conn:
+            logger.error("❌ Freshness sweep skipped: failed to connect to database")
+            return {}
+        try:
+            started = time.time()
+            monitor = DataFreshnessMonitor(conn)
+            results = monitor.check_all_streams_freshness()
+            monitor.log_freshness_status(results)
+            monitor.log_freshness_alerts(results)
+            try:
+                save_freshness_snapshot(results)
+            except Exception as e:
+                logger.warning(f"Could not publish freshness snapshot: {e}")
+            logger.info(f"🔍 Freshness sweep finished in {time.time() - started:.1f}s")
+            return results
+        finally:
+            conn.close()
+
+    def _loop(self) -> None:
+        logger.info(f"🔍 Freshness monitor running every {self.interval_seconds:g}s")
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Freshness sweep failed: {e}", exc_info=True)
+            self._stop.wait(self.interval_seconds)
+        logger.info("⏹️  Freshness monitor stopped")
+
+    def start(self) -> "FreshnessRunner":
+        """Run the sweep loop on a daemon thread."""
+        self._thread = threading.Thread(target=self._loop, name="freshness", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        """Run the sweep loop on the calling thread until SIGTERM or Ctrl+C."""
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            self._loop()
+        except KeyboardInterrupt:
+            self.stop()
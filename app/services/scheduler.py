@@ -0,0 +1,148 @@
+# app/services/scheduler.py
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.intervals import interval_to_ms
+
+logger = logging.getLogger(__name__)
+
+# Pipeline params that hold the candle intervals a pipeline loops over
+INTERVAL_PARAM_KEYS = ("timeframes", "intervals")
+
+# Weekly candles open on Monday 00:00 UTC; the epoch was a Thursday
+WEEK_OFFSET_SECONDS = 4 * 24 * 60 * 60
+
+
+class CadenceScheduler:
+    """
+    Runs CoinglassService pipelines on candle boundaries instead of a fixed delay.
+
+    Every (pipeline, interval) pair is a job. A job becomes due when a new
+    candle of its interval has opened, plus `settle_seconds` for Coinglass to
+    publish it, so a 1w series is fetched once a week instead of every cycle.
+    Pipelines without candle intervals run every `default_seconds`.
+
+    Due jobs sit in a priority queue keyed by due time; jobs of one pipeline
+    that fall due together run as a single call restricted to those intervals.
+    """
+
+    def __init__(
+        self,
+        service,
+        pipelines: Optional[List[str]] = None,
+        settle_seconds: Optional[float] = None,
+        default_seconds: Optional[float] = None,
+    ):
+        self.service = service
+        self.pipeline_names = pipelines or list(service.pipelines.keys())
+        self.settle_seconds = settings.SCHEDULER_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self.default_seconds = default_seconds or settings.SCHEDULER_DEFAULT_SECONDS
+        self._queue: List[Tuple[float, int, str, Optional[str]]] = []
+        self._seq = itertools.count()
+
+        unknown = [name for name in self.pipeline_names if name not in service.pipelines]
+        if unknown:
+            raise ValueError(
+                f"Unknown pipeline(s): {unknown}. Available: {list(service.pipelines.keys())}"
+            )
+
+    def _interval_key(self, pipeline: str) -> Optional[str]:
+        params = self.service.pipelines[pipeline]["params"]
+        for key in INTERVAL_PARAM_KEYS:
+            if params.get(key):
+                return key
+        return None
+
+    def jobs(self) -> List[Tuple[str, Optional[str]]]:
+        """(pipeline, interval) pairs; interval is None for pipelines without candles."""
+        jobs = []
+        for pipeline in self.pipeline_names:
+            key = self._interval_key(pipeline)
+            if key is None:
+                jobs.append((pipeline, None))
+                continue
+            for interval in self.service.pipelines[pipeline]["params"][key]:
+                if interval_to_ms(interval) is None:
+                    logger.warning(f"⚠️ {pipeline}: unknown interval '{interval}', using default cadence")
+                jobs.append((pipeline, interval))
+        return jobs
+
+    def next_due(self, interval: Optional[str], now: float) -> float:
+        """Epoch seconds at which the next candle of `interval` can be fetched."""
+        interval_ms = interval_to_ms(interval) if interval else None
+        if not interval_ms:
+            return now + self.default_seconds
+
+        period = interval_ms / 1000.0
+        offset = WEEK_OFFSET_SECONDS if period % (7 * 86400) == 0 else 0
+        boundary = ((now - offset) // period + 1) * period + offset
+        return boundary + self.settle_seconds
+
+    def _push(self, due: float, pipeline: str, interval: Optional[str]) -> None:
+        heapq.heappush(self._queue, (due, next(self._seq), pipeline, interval))
+
+    def _pop_due(self, now: float) -> Dict[str, List[Optional[str]]]:
+        due: Dict[str, List[Optional[str]]] = {}
+        while self._queue and self._queue[0][0] <= now:
+            _, _, pipeline, interval = heapq.heappop(self._queue)
+            due.setdefault(pipeline, []).append(interval)
+        return due
+
+    def run_due(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Run every job that is due at `now` and queue its next occurrence."""
+        now = time.time() if now is None else now
+        results = {}
+        for pipeline, intervals in self._pop_due(now).items():
+            key = self._interval_key(pipeline)
+            custom_params = None
+            if key is not None and None not in intervals:
+                custom_params = {key: intervals}
+
+            logger.info(f"⏰ {pipeline}: due {', '.join(i or 'cycle' for i in intervals)}")
+            self._ping()
+            try:
+                results[pipeline] = self.service.run_pipeline(pipeline, custom_params)
+            except Exception as e:
+                logger.error(f"Failed to run pipeline {pipeline}: {e}")
+                results[pipeline] = {"error": str(e)}
+
+            finished = time.time()
+            for interval in intervals:
+                self._push(self.next_due(interval, finished), pipeline, interval)
+        return results
+
+    def _ping(self) -> None:
+        # Long-lived process: reopen the MySQL connection if the server dropped it
+        try:
+            self.service.conn.ping(reconnect=True)
+        except Exception as e:
+            logger.warning(f"Database ping failed: {e}")
+
+    def run_forever(self) -> None:
+        """Run every job once, then keep running jobs as their candles close."""
+        start = time.time()
+        for pipeline, interval in self.jobs():
+            self._push(start, pipeline, interval)
+
+        logger.info(
+            f"📅 Cadence scheduler: {len(self._queue)} jobs across {len(self.pipeline_names)} pipelines "
+            f"(settle: {self.settle_seconds:g}s, default: {self.default_seconds:g}s)"
+        )
+
+        while True:
+            self.run_due()
+            if not self._queue:
+                return
+            next_time = self._queue[0][0]
+            wait = max(next_time - time.time(), 0)
+            if wait > 0:
+                logger.info(
+                    f"💤 Next job: {self._queue[0][2]}[{self._queue[0][3] or 'cycle'}] at "
+                    f"{datetime.fromtimestamp(next_time).strftime('%H:%M:%S')} (in {wait:.0f}s)"
+                )
+                time.sleep(wait)
@@ -0,0 +1,169 @@
+# app/services/worker.py
+import heapq
+import itertools
+import logging
+import signal
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.services.coinglass_service import CoinglassService
+from app.services.cryptoquant_service import CryptoQuantService
+from app.services.freshness_runner import FreshnessRunner
+from app.services.scheduler import CadenceScheduler
+
+logger = logging.getLogger(__name__)
+
+CRYPTOQUANT_PIPELINES = ("exchange_inflow_cdd",)
+
+
+def parse_pipeline_spec(items: Sequence[str], default_delay: float) -> Dict[str, float]:
+    """
+    Parse worker pipeline arguments into {pipeline: delay_seconds}.
+
+    Items may be separated by spaces or commas and carry their own delay:
+    ["funding_rate:30", "futures_basis,fear_greed_index:300"].
+    """
+    pipelines: Dict[str, float] = {}
+    for item in items:
+        for entry in item.replace(",", " ").split():
+            name, _, delay = entry.partition(":")
+            try:
+                pipelines[name] = float(delay) if delay else default_delay
+            except ValueError:
+                raise ValueError(f"Invalid delay in pipeline spec: {entry}")
+    return pipelines
+
+
+class PipelineWorker:
+    """
+    Resident process that hosts any subset of pipelines.
+
+    The CoinglassService (MySQL connection, HTTP session pool, rate limiter)
+    is created once and reused for every cycle, instead of paying interpreter
+    startup, module imports and a new connection per run. Each pipeline
+    reruns `delay` seconds after its previous run finished, matching the old
+    entrypoint.sh loop; with `schedule=True` the Coinglass pipelines run on
+    their candle cadence through CadenceScheduler instead.
+    """
+
+    def __init__(self, pipelines: Dict[str, float], default_delay: float = 10.0, schedule: bool = False):
+        self.service = CoinglassService(ensure_tables=False)
+        self.pipelines = dict(pipelines) or {name: default_delay for name in self.service.pipelines}
+        self.schedule = schedule
+        self._stop = threading.Event()
+        self._cryptoquant: Optional[CryptoQuantService] = None
+
+        known = set(self.service.pipelines) | set(CRYPTOQUANT_PIPELINES)
+        unknown = [name for name in self.pipelines if name not in known]
+        if unknown:
+            raise ValueError(f"Unknown pipeline(s): {unknown}. Available: {sorted(known)}")
+
+    def stop(self, *_args) -> None:
+        logger.info("⏹️  Worker stopping after the current pipeline...")
+        self._stop.set()
+
+    def _ping(self) -> None:
+        # The connection lives for days; reopen it if MySQL dropped it in between
+        try:
+            self.service.conn.ping(reconnect=True)
+        except Exception as e:
+            logger.warning(f"Database ping failed: {e}")
+
+    def run_once(self, name: str) -> Dict[str, Any]:
+        """Run one pipeline on the shared service and log its summary."""
+        started = time.time()
+        try:
+            if name in CRYPTOQUANT_PIPELINES:
+                if self._cryptoquant is None:
+                    self._cryptoquant = CryptoQuantService()
+                result = self._cryptoquant.run_pipeline(name)
+            else:
+                self._ping()
+                result = self.service.run_pipeline(name)
+        except Exception as e:
+            logger.error(f"Failed to run pipeline {name}: {e}", exc_info=True)
+            result = {"error": str(e)}
+
+        elapsed = time.time() - started
+        if isinstance(result, dict) and "error" in result:
+            logger.error(f"❌ {name}: {result['error']} ({elapsed:.1f}s)")
+        else:
+            fresh, duplicates = _count_records(result)
+            logger.info(f"✅ {name}: {fresh} fresh records, {duplicates} duplicates ({elapsed:.1f}s)")
+        return result
+
+    def run_forever(self) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        # Freshness sweep on its own thread and connection (FRESHNESS_IN_WORKER)
+        freshness = FreshnessRunner().start() if settings.FRESHNESS_IN_WORKER else None
+        try:
+            if self.schedule:
+                self._run_scheduled()
+            else:
+                self._run_fixed_delay()
+        finally:
+            if freshness:
+                freshness.stop()
+            self.service.close()
+
+    def _run_fixed_delay(self) -> None:
+        logger.info(
+            "🧵 Worker hosting: "
+            + ", ".join(f"{name} (every {delay:g}s)" for name, delay in self.pipelines.items())
+        )
+        queue: List = []
+        seq = itertools.count()
+        now = time.time()
+        for name in self.pipelines:
+            heapq.heappush(queue, (now, next(seq), name))
+
+        cycle = 0
+        while not self._stop.is_set():
+            due, _, name = queue[0]
+            wait = due - time.time()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+
+            heapq.heappop(queue)
+            cycle += 1
+            logger.info(f"🔄 Run #{cycle}: {name}")
+            self.run_once(name)
+            heapq.heappush(queue, (time.time() + self.pipelines[name], next(seq), name))
+
+        logger.info(f"⏹️  Worker stopped after {cycle} runs")
+
+    def _run_scheduled(self) -> None:
+        coinglass = [name for name in self.pipelines if name not in CRYPTOQUANT_PIPELINES]
+        skipped = [name for name in self.pipelines if name in CRYPTOQUANT_PIPELINES]
+        if skipped:
+            logger.warning(f"⚠️ Not candle-scheduled, run them in a fixed-delay worker: {', '.join(skipped)}")
+
+        if not coinglass:
+            return
+
+        scheduler = CadenceScheduler(self.service, pipelines=coinglass)
+        # The scheduler sleeps in time.sleep(); turn SIGTERM into KeyboardInterrupt to stop it
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            logger.info("⏹️  Worker stopped")
+
+
+def _count_records(result: Any):
+    """Fresh and duplicate counts from a pipeline summary dict."""
+    fresh = 0
+    duplicates = 0
+    if not isinstance(result, dict):
+        return fresh, duplicates
+    for key, value in result.items():
+        if not isinstance(value, int) or isinstance(value, bool):
+            continue
+        if key.endswith("_duplicates") or key == "duplicates":
+            duplicates += value
+        elif key not in ("fetches", "errors") and not key.endswith(("_filtered", "_fetches", "_skipped")):
+            fresh += value
+    return fresh, duplicates
@@ -5,6 +5,9 @@ set -e
 DELAY=${DELAY:-10}
 PIPELINE=${PIPELINE:-""}
 EXCHANGE_FILTER=${EXCHANGE_FILTER:-""}
+SCHEDULE=${SCHEDULE:-"false"}
+# Resident worker: one long-lived process reusing its DB connection and HTTP pool
+WORKER=${WORKER:-"true"}
 
 echo "=========================================="
 echo "🚀 Starting Coinglass Pipeline Runner"
@@ -12,8 +15,28 @@ echo "=========================================="
 echo "Pipeline: ${PIPELINE}"
 echo "Exchange Filter: ${EXCHANGE_FILTER}"
 echo "Delay: ${DELAY} seconds"
+echo "Schedule: ${SCHEDULE}"
+echo "Worker: ${WORKER}"
 echo "=========================================="
 
+# Freshness sidecar: sweep on its own cadence, publishing snapshots for --freshness
+if [ "${FRESHNESS_MONITOR:-false}" = "true" ]; then
+    exec python main.py --freshness-loop
+fi
+
+# PIPELINE may list several pipelines ("funding_rate:30 futures_basis:20")
+if [ "${WORKER}" = "true" ]; then
+    if [ "${SCHEDULE}" = "true" ]; then
+        exec python main.py --worker --schedule ${PIPELINE}
+    fi
+    exec python main.py --worker --delay "${DELAY}" ${PIPELINE}
+fi
+
+# Candle-aligned cadence: one resident process, each timeframe runs when its candle closes
+if [ "${SCHEDULE}" = "true" ]; then
+    exec python main.py --schedule ${PIPELINE}
+fi
+
 # Run the pipeline in a loop with the specified delay
 while true; do
     echo ""
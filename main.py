@@ -7,12 +7,16 @@ COMMAND CATEGORIES:
 🔧 SYSTEM ADMINISTRATION:
     --setup                          Setup database tables and schema
     --status                         Check ingestion status and record counts
+    --compact-fear-greed             Collapse duplicate fear & greed snapshots (one-off)
     --freshness                      Check data freshness for all pipelines
+    --freshness-loop                 Run the freshness sweep on its own cadence (sidecar)
 
 📊 DATA COLLECTION MODES:
     --continuous                     Run continuous automation (10s intervals)
     --dev                            Run development mode (10s intervals)
     --server                         Run server automation mode (1s intervals)
+    --schedule                       Run each timeframe when its next candle closes
+    --worker [--delay N]             Host pipelines in one resident process (name:delay per pipeline)
     --initial-scrape --months N      Fetch N months of historical data
 
 📈 DERIVATIVES MARKET:
@@ -72,13 +76,17 @@ Usage Examples:
     # System Administration
     python main.py --setup
     python main.py --status
+    python main.py --compact-fear-greed
     python main.py --freshness
+    python main.py --freshness-loop
 
     # Data Collection
     python main.py --initial-scrape --months 12
     python main.py --continuous
     python main.py --dev
     python main.py --server
+    python main.py --schedule funding_rate futures_basis
+    python main.py --worker funding_rate:30 futures_basis:20 fear_greed_index:300
 
     # Historical Data Collection
     python main.py --historical 3        # 3 years of historical data (all time-based pipelines)
@@ -103,6 +111,7 @@ import platform
 import os
 from datetime import datetime
 from app.controllers.ingestion_controller import IngestionController
+from app.services.freshness_runner import FreshnessRunner
 
 # Setup logging
 logging.basicConfig(
@@ -155,7 +164,7 @@ def initial_scrape(months: int = 1):
             pipeline_duplicates = 0
 
             for key, value in result.items():
-                if isinstance(value, int) and not key.endswith("_duplicates") and not key.endswith("_filtered"):
+                if isinstance(value, int) and not key.endswith(("_duplicates", "_filtered", "_fetches", "_skipped")):
                     pipeline_fresh += value
                 elif key.endswith("_duplicates"):
                     pipeline_duplicates += value
@@ -293,6 +302,9 @@ def continuous_mode(dev_mode: bool = False, server_mode: bool = False, pipelines
         logger.info("   - High-frequency data collection")
     logger.info("=" * 60)
 
+    # Freshness runs on its own thread and cadence instead of after every cycle
+    freshness = FreshnessRunner().start()
+
     # Run initial collection
     logger.info("Running initial collection...")
     run_pipelines(pipelines=pipelines)
@@ -319,11 +331,48 @@ def continuous_mode(dev_mode: bool = False, server_mode: bool = False, pipelines
             logger.info(f"✅ Cycle #{cycle_count} completed. Next cycle in {cycle_delay}s...")
             time.sleep(cycle_delay)
     except KeyboardInterrupt:
+        freshness.stop()
         logger.info("\n" + "=" * 60)
         logger.info(f"⏹️  {mode_name} stopped after {cycle_count} cycles")
         logger.info("=" * 60)
 
 
+def schedule_mode(pipelines: list = None):
+    """Run pipelines on candle boundaries: each (pipeline, timeframe) runs once per new candle."""
+    logger.info("=" * 60)
+    logger.info("SCHEDULE MODE: Candle-aligned cadence")
+    logger.info("=" * 60)
+    if pipelines:
+        logger.info(f"📊 Pipelines: {', '.join(pipelines)}")
+    else:
+        logger.info("📊 Pipelines: All Coinglass pipelines")
+    logger.info("=" * 60)
+
+    controller = IngestionController()
+    result = controller.run_scheduler(pipelines=pipelines)
+    if "error" in result:
+        logger.error(f"❌ Scheduler failed: {result['error']}")
+        sys.exit(1)
+
+
+def worker_mode(pipelines: list = None, delay: float = 10.0, schedule: bool = False):
+    """Run pipelines in one long-lived process instead of one `python main.py` per cycle."""
+    logger.info("=" * 60)
+    logger.info(f"WORKER MODE: {'candle-aligned cadence' if schedule else f'default delay {delay:g}s'}")
+    logger.info("=" * 60)
+    if pipelines:
+        logger.info(f"📊 Pipelines: {', '.join(pipelines)}")
+    else:
+        logger.info("📊 Pipelines: All Coinglass pipelines")
+    logger.info("=" * 60)
+
+    controller = IngestionController()
+    result = controller.run_worker(pipelines=pipelines, delay=delay, schedule=schedule)
+    if "error" in result:
+        logger.error(f"❌ Worker failed: {result['error']}")
+        sys.exit(1)
+
+
 def show_status():
     """Show ingestion status."""
     logger.info("=" * 60)
@@ -345,8 +394,42 @@ def show_status():
     logger.info("\n" + "=" * 60)
 
 
+def compact_fear_greed():
+    """Collapse duplicate fear & greed snapshots left by earlier runs."""
+    logger.info("=" * 60)
+    logger.info("COMPACT: fear & greed index snapshots")
+    logger.info("=" * 60)
+
+    controller = IngestionController()
+    result = controller.compact_fear_greed()
+
+    if "error" in result:
+        logger.error(f"❌ Compaction failed: {result['error']}")
+        return False
+
+    logger.info(
+        f"✅ {result['snapshots']} snapshots: removed {result['removed']} duplicates "
+        f"({result['data_list_removed']:,} data_list rows), kept {result['kept']}"
+    )
+    logger.info("=" * 60)
+    return True
+
+
+def freshness_loop_mode():
+    """Run the freshness sweep on its own cadence, publishing snapshots for --freshness."""
+    logger.info("=" * 80)
+    logger.info("🔍 FRESHNESS MONITOR: background sweep")
+    logger.info("=" * 80)
+
+    controller = IngestionController()
+    result = controller.run_freshness_loop()
+    if "error" in result:
+        logger.error(f"❌ Freshness monitor failed: {result['error']}")
+        sys.exit(1)
+
+
 def show_freshness():
-    """Show data freshness status for all pipelines."""
+    """Show data freshness status for all pipelines (latest background snapshot when recent)."""
     logger.info("=" * 80)
     logger.info("🔍 DATA FRESHNESS ANALYSIS")
     logger.info("=" * 80)
@@ -363,28 +446,9 @@ def show_freshness():
     logger.info("=" * 80)
 
 
-def create_time_batches(start_ts, end_ts, batch_days=30):
-    """Create time batches for historical data retrieval to avoid API limits."""
-    from datetime import datetime, timedelta
-    import math
-
-    batches = []
-    current_start = start_ts
-    batch_duration = batch_days * 24 * 60 * 60  # Convert days to seconds
-
-    while current_start < end_ts:
-        current_end = min(current_start + batch_duration, end_ts)
-        batches.append({
-            'start_time': current_start * 1000,  # Convert to milliseconds for API
-            'end_time': current_end * 1000
-        })
-        current_start = current_end
-
-    return batches
-
-
 def run_historical_mode(historical_args, pipelines=None):
-    """Run historical data collection with custom time parameters and batch processing."""
+    """Run historical data collection with custom time parameters on the concurrent backfill engine."""
+    from app.services.backfill import BATCH_TIMEFRAMES, BackfillEngine
     from app.services.coinglass_service import CoinglassService
     from datetime import datetime, timedelta
     import logging
@@ -470,18 +534,6 @@ def run_historical_mode(historical_args, pipelines=None):
     logger.info(f"🕐 Time Range: {start_time.strftime('%Y-%m-%d %H:%M:%S')} to {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"🔢 Timestamps: {start_timestamp} to {end_timestamp}")
 
-    # Define intervals that support batch processing (1 hour and above)
-    batch_timeframes = ["1h", "4h", "6h", "8h", "12h", "1d", "1w"]
-    all_time_intervals = ["1m", "3m", "5m", "15m", "30m", "1h", "4h", "6h", "8h", "12h", "1d", "1w"]
-
-    # Create time batches for historical data
-    time_batches = create_time_batches(start_timestamp, end_timestamp, batch_days=30)
-    logger.info(f"📦 Created {len(time_batches)} time batches (30-day chunks)")
-    for i, batch in enumerate(time_batches):
-        start_dt = datetime.fromtimestamp(batch['start_time'] // 1000)
-        end_dt = datetime.fromtimestamp(batch['end_time'] // 1000)
-        logger.info(f"   Batch {i+1}: {start_dt.strftime('%Y-%m-%d')} to {end_dt.strftime('%Y-%m-%d')}")
-
     # Default pipelines if none specified - only pipelines that support time-based parameters
     if not pipelines:
         pipelines = [
@@ -507,90 +559,19 @@ def run_historical_mode(historical_args, pipelines=None):
         logger.info(f"📊 Using default pipelines: {', '.join(pipelines)}")
 
     logger.info(f"🎯 Running pipelines: {', '.join(pipelines)}")
-    logger.info(f"⚡ Batch processing enabled for timeframes: {', '.join(batch_timeframes)}")
+    logger.info(f"⚡ Batch processing enabled for timeframes: {', '.join(BATCH_TIMEFRAMES)}")
     logger.info("=" * 80)
 
-    # Run with batch processing
+    # Run as (pipeline, series, window) work items on the backfill engine
     try:
         service = CoinglassService(ensure_tables=False)
-        results = {}
 
-        for pipeline_name in pipelines:
-            if pipeline_name not in service.pipelines:
-                logger.warning(f"⚠️ {pipeline_name}: Not found in service pipelines")
-                continue
-
-            logger.info(f"\n🔄 Running {pipeline_name} with batch processing...")
-            pipeline_total = {"records": 0, "batches": 0, "errors": 0}
-
-            # Process each time batch
-            for batch_idx, batch in enumerate(time_batches):
-                logger.info(f"   📦 Processing batch {batch_idx + 1}/{len(time_batches)} "
-                           f"({datetime.fromtimestamp(batch['start_time'] // 1000).strftime('%Y-%m-%d')} to "
-                           f"{datetime.fromtimestamp(batch['end_time'] // 1000).strftime('%Y-%m-%d')})")
-
-                # Merge batch params with pipeline default params
-                pipeline_params = service.pipelines[pipeline_name]["params"].copy()
-
-                # Apply batch time parameters
-                batch_params = {
-                    "start_time": batch['start_time'],
-                    "end_time": batch['end_time']
-                }
-                pipeline_params.update(batch_params)
-
-                # Filter timeframes/intervals based on batch processing rules
-                if "intervals" in pipeline_params:
-                    original_intervals = pipeline_params["intervals"]
-                    if isinstance(original_intervals, list):
-                        # For batch processing: use all intervals for non-batch timeframes, filter for batch timeframes
-                        filtered_intervals = [interval for interval in original_intervals
-                                            if interval in all_time_intervals]
-                        pipeline_params["intervals"] = filtered_intervals
-                        logger.info(f"      📝 Intervals: {pipeline_params['intervals']}")
-                elif "timeframes" in pipeline_params:
-                    original_timeframes = pipeline_params["timeframes"]
-                    if isinstance(original_timeframes, list):
-                        # For batch processing: only use 1h+ timeframes
-                        filtered_timeframes = [timeframe for timeframe in original_timeframes
-                                             if timeframe in batch_timeframes]
-                        pipeline_params["timeframes"] = filtered_timeframes
-                        logger.info(f"      📝 Timeframes (batch-only): {pipeline_params['timeframes']}")
-                else:
-                    # Pipeline doesn't use intervals/timeframes (e.g., whale_transfer)
-                    # Time parameters are already applied via batch_params
-                    logger.info(f"      📝 Direct time parameters applied (no intervals/timeframes)")
-
-                try:
-                    result = service.pipelines[pipeline_name]["func"](
-                        conn=service.conn,
-                        client=service.client,
-                        params=pipeline_params
-                    )
-
-                    # Count records from this batch
-                    if isinstance(result, dict):
-                        batch_records = sum(v for k, v in result.items()
-                                          if isinstance(v, int) and not str(k).endswith("_duplicates"))
-                    else:
-                        batch_records = int(result) if isinstance(result, (int, float)) else 0
-
-                    pipeline_total["records"] += batch_records
-                    pipeline_total["batches"] += 1
-
-                    logger.info(f"      ✅ Batch {batch_idx + 1} completed: {batch_records} records")
-
-                except Exception as pipeline_error:
-                    pipeline_total["errors"] += 1
-                    # Special handling for funding_rate time errors
-                    if pipeline_name == "funding_rate" and "time error" in str(pipeline_error):
-                        logger.warning(f"      ⚠️ Batch {batch_idx + 1}: API time limitation (expected for old data)")
-                    else:
-                        logger.error(f"      ❌ Batch {batch_idx + 1}: {pipeline_error}")
-
-            results[pipeline_name] = pipeline_total
-            logger.info(f"✅ {pipeline_name} completed: {pipeline_total['records']} total records "
-                       f"({pipeline_total['batches']} batches, {pipeline_total['errors']} errors)")
+        unknown = [name for name in pipelines if name not in service.pipelines]
+        for name in unknown:
+            logger.warning(f"⚠️ {name}: Not found in service pipelines")
+        pipelines = [name for name in pipelines if name not in unknown]
+
+        results = BackfillEngine(service).run(pipelines, start_timestamp, end_timestamp)
 
         logger.info("=" * 80)
         logger.info("📊 HISTORICAL COLLECTION SUMMARY")
@@ -606,10 +587,11 @@ def run_historical_mode(historical_args, pipelines=None):
                 total_batches += result["batches"]
                 total_errors += result["errors"]
 
+                pruned = f", {result['pruned']} empty windows skipped" if result.get("pruned") else ""
                 if result["errors"] > 0:
-                    logger.info(f"✅ {pipeline_name}: {result['records']} records ({result['batches']} batches, {result['errors']} errors)")
+                    logger.info(f"✅ {pipeline_name}: {result['records']} records ({result['batches']} batches, {result['errors']} errors{pruned})")
                 else:
-                    logger.info(f"✅ {pipeline_name}: {result['records']} records ({result['batches']} batches)")
+                    logger.info(f"✅ {pipeline_name}: {result['records']} records ({result['batches']} batches{pruned})")
             else:
                 logger.info(f"✅ {pipeline_name}: Completed")
 
@@ -650,13 +632,17 @@ def show_help():
     logger.info("\n🔧 SYSTEM ADMINISTRATION:")
     logger.info("  --setup                     Setup database tables and schema")
     logger.info("  --status                    Show ingestion status and record counts")
+    logger.info("  --compact-fear-greed        Collapse duplicate fear & greed snapshots (one-off)")
     logger.info("  --freshness                 Check data freshness for all pipelines")
+    logger.info("  --freshness-loop            Run the freshness sweep on its own cadence (sidecar)")
 
     # Data Collection Modes
     logger.info("\n📊 DATA COLLECTION MODES:")
     logger.info("  --continuous                Run continuous automation (10s intervals)")
     logger.info("  --dev                       Run development mode (10s intervals)")
     logger.info("  --server                    Run server automation mode (1s intervals)")
+    logger.info("  --schedule                  Run each timeframe when its next candle closes")
+    logger.info("  --worker [--delay N]        Host pipelines in one resident process (name:delay per pipeline)")
     logger.info("  --initial-scrape --months N  Fetch N months of historical data")
 
     # Derivatives Market
@@ -735,13 +721,17 @@ def show_help():
     logger.info("\n🔧 System Administration:")
     logger.info("  python main.py --setup")
     logger.info("  python main.py --status")
+    logger.info("  python main.py --compact-fear-greed")
     logger.info("  python main.py --freshness")
+    logger.info("  python main.py --freshness-loop")
 
     logger.info("\n📊 Data Collection:")
     logger.info("  python main.py --initial-scrape --months 12")
     logger.info("  python main.py --continuous")
     logger.info("  python main.py --dev")
     logger.info("  python main.py --server    # High-frequency (1s) for Docker deployment")
+    logger.info("  python main.py --schedule  # Candle-aligned cadence per pipeline/timeframe")
+    logger.info("  python main.py --worker funding_rate:30 futures_basis:20  # One process, reused connections")
 
     logger.info("\n📅 Historical Data Collection:")
     logger.info("  python main.py --historical 3        # 3 years of historical data")
@@ -889,12 +879,36 @@ def main():
     parser.add_argument(
         "--server", action="store_true", help="Run server automation mode (1s intervals)"
     )
+    parser.add_argument(
+        "--schedule", action="store_true", help="Run each timeframe when its next candle closes"
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="Host the given pipelines in one resident process (name or name:delay_seconds)",
+    )
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=float(os.getenv("DELAY", "10")),
+        help="Default seconds between runs of a pipeline in --worker mode (default: $DELAY or 10)",
+    )
     parser.add_argument(
         "--status", action="store_true", help="Show ingestion status"
     )
+    parser.add_argument(
+        "--compact-fear-greed",
+        action="store_true",
+        help="Collapse duplicate fear & greed snapshots into the latest one",
+    )
     parser.add_argument(
         "--freshness", action="store_true", help="Check data freshness for all pipelines"
     )
+    parser.add_argument(
+        "--freshness-loop",
+        action="store_true",
+        help="Run the freshness sweep every FRESHNESS_INTERVAL_SECONDS and publish snapshots",
+    )
     parser.add_argument(
         "--historical",
         nargs="*",
@@ -939,9 +953,25 @@ def main():
     elif args.server:
         continuous_mode(dev_mode=False, server_mode=True, pipelines=args.pipelines if args.pipelines else None)
 
+    elif args.worker:
+        worker_mode(
+            pipelines=args.pipelines or os.getenv("WORKER_PIPELINES", "").split(),
+            delay=args.delay,
+            schedule=args.schedule,
+        )
+
+    elif args.schedule:
+        schedule_mode(pipelines=args.pipelines if args.pipelines else None)
+
     elif args.status:
         show_status()
 
+    elif args.compact_fear_greed:
+        sys.exit(0 if compact_fear_greed() else 1)
+
+    elif args.freshness_loop:
+        freshness_loop_mode()
+
     elif args.freshness:
         show_freshness()
 
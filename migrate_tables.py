@@ -5,6 +5,10 @@ Migration Script for Coinglass Database Tables
 This script handles migrations for:
 1. fear_greed_index: Change from JSON structure to parent-child relational structure
 2. long_short_ratio_top: Rename table from cg_long_short_account_ratio_history to cg_long_short_top_account_ratio_history
+3. updated_at indexes: Index updated_at on tables whose freshness is tracked by it
+4. ingestion_stats: Create cg_ingestion_stats and seed it from the existing tables
+5. liquidation_heatmap diff refresh: Fingerprint columns and (heatmap, sequence_order) keys
+6. fear_greed_index dedupe: Content hash and value count on each snapshot
 
 Usage:
     python migrate_tables.py
@@ -12,6 +16,8 @@ Usage:
 
 import pymysql
 from app.database.connection import get_connection
+from app.models.coinglass import COINGLASS_TABLES
+from app.repositories.coinglass_repository import CoinglassRepository
 from app.core.logging import setup_logger
 
 logger = setup_logger(__name__)
@@ -103,6 +109,153 @@ def migrate_long_short_ratio_top(conn):
         raise
 
 
+# Tables whose freshness/status is read from updated_at range filters and MAX(updated_at)
+UPDATED_AT_INDEX_TABLES = [
+    "cg_spot_coins_markets",
+    "cg_spot_pairs_markets",
+    "cg_fear_greed_index",
+    "cg_option_exchange_oi_history",
+]
+
+
+def migrate_updated_at_indexes(conn):
+    """
+    Add idx_updated_at to tables created before it was part of their schema.
+    """
+    try:
+        with conn.cursor() as cur:
+            for table in UPDATED_AT_INDEX_TABLES:
+                cur.execute(f"SHOW TABLES LIKE '{table}'")
+                if not cur.fetchone():
+                    logger.info(f"✓ {table} doesn't exist, will be created with the index")
+                    continue
+
+                cur.execute(f"SHOW INDEX FROM {table} WHERE Key_name = 'idx_updated_at'")
+                if cur.fetchone():
+                    logger.info(f"✓ {table} already has idx_updated_at")
+                    continue
+
+                logger.info(f"🔄 Adding idx_updated_at to {table}...")
+                cur.execute(f"ALTER TABLE {table} ADD INDEX idx_updated_at (updated_at)")
+                logger.info(f"✓ idx_updated_at added to {table}")
+
+        conn.commit()
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Error adding updated_at indexes: {e}")
+        raise
+
+
+def migrate_ingestion_stats(conn):
+    """
+    Create the cg_ingestion_stats ledger and seed it with one grouped scan per tracked table.
+
+    Pipelines only tally tables seeded here (or by rebuild_ingestion_stats());
+    until then status and freshness keep scanning the table.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(COINGLASS_TABLES["cg_ingestion_stats"])
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Error creating cg_ingestion_stats: {e}")
+        raise
+
+    seeded = CoinglassRepository(conn, logger).rebuild_ingestion_stats()
+    for table, series in seeded.items():
+        logger.info(f"✓ {table}: {series} series")
+
+
+HEATMAP_HASH_COLUMNS = ["y_axis_hash", "leverage_data_hash", "price_candlesticks_hash"]
+HEATMAP_CHILD_TABLES = [
+    "cg_liquidation_heatmap_y_axis",
+    "cg_liquidation_heatmap_leverage_data",
+    "cg_liquidation_heatmap_price_candlesticks",
+]
+
+
+def migrate_liquidation_heatmap_diff(conn):
+    """
+    Prepare liquidation heatmap tables for diff-based child refresh.
+
+    Adds the per-child-set fingerprint columns to cg_liquidation_heatmap and
+    replaces idx_liquidation_heatmap_id on each child table with
+    uk_heatmap_sequence (liquidation_heatmap_id, sequence_order), which
+    changed rows are upserted on. Child sets were always rewritten whole, so
+    existing rows hold no duplicate sequence_order per heatmap.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW TABLES LIKE 'cg_liquidation_heatmap'")
+            if not cur.fetchone():
+                logger.info("✓ liquidation_heatmap tables don't exist, will be created with diff support")
+                return
+
+            for column in HEATMAP_HASH_COLUMNS:
+                cur.execute(f"SHOW COLUMNS FROM cg_liquidation_heatmap LIKE '{column}'")
+                if cur.fetchone():
+                    logger.info(f"✓ cg_liquidation_heatmap already has {column}")
+                    continue
+                logger.info(f"🔄 Adding {column} to cg_liquidation_heatmap...")
+                cur.execute(f"ALTER TABLE cg_liquidation_heatmap ADD COLUMN {column} CHAR(40) NULL AFTER `range`")
+
+            for table in HEATMAP_CHILD_TABLES:
+                cur.execute(f"SHOW INDEX FROM {table} WHERE Key_name = 'uk_heatmap_sequence'")
+                if cur.fetchone():
+                    logger.info(f"✓ {table} already has uk_heatmap_sequence")
+                    continue
+
+                logger.info(f"🔄 Adding uk_heatmap_sequence to {table}...")
+                cur.execute(
+                    f"ALTER TABLE {table} ADD UNIQUE KEY uk_heatmap_sequence (liquidation_heatmap_id, sequence_order)"
+                )
+                cur.execute(f"SHOW INDEX FROM {table} WHERE Key_name = 'idx_liquidation_heatmap_id'")
+                if cur.fetchone():
+                    # The foreign key is served by the new key's leading column
+                    cur.execute(f"ALTER TABLE {table} DROP INDEX idx_liquidation_heatmap_id")
+                logger.info(f"✓ uk_heatmap_sequence added to {table}")
+
+        conn.commit()
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Error migrating liquidation_heatmap for diff refresh: {e}")
+        raise
+
+
+def migrate_fear_greed_dedupe(conn):
+    """
+    Add the snapshot fingerprint columns used by the fear & greed dedupe.
+
+    content_hash / value_count describe the values stored under a parent.
+    Existing snapshots keep NULLs until `python main.py --compact-fear-greed`
+    collapses them; the writer compares values directly until then.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW TABLES LIKE 'cg_fear_greed_index'")
+            if not cur.fetchone():
+                logger.info("✓ fear_greed_index table doesn't exist, will be created with dedupe support")
+                return
+
+            for column, definition in (("content_hash", "CHAR(40) NULL"), ("value_count", "INT NULL")):
+                cur.execute(f"SHOW COLUMNS FROM cg_fear_greed_index LIKE '{column}'")
+                if cur.fetchone():
+                    logger.info(f"✓ cg_fear_greed_index already has {column}")
+                    continue
+                logger.info(f"🔄 Adding {column} to cg_fear_greed_index...")
+                cur.execute(f"ALTER TABLE cg_fear_greed_index ADD COLUMN {column} {definition} AFTER fetch_timestamp")
+
+        conn.commit()
+
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"❌ Error migrating fear_greed_index for dedupe: {e}")
+        raise
+
+
 def main():
     """Run all migrations."""
     logger.info("=" * 60)
@@ -120,6 +273,18 @@ def main():
         logger.info("\n2️⃣  Migrating long_short_ratio_top...")
         migrate_long_short_ratio_top(conn)
 
+        logger.info("\n3️⃣  Adding updated_at indexes...")
+        migrate_updated_at_indexes(conn)
+
+        logger.info("\n4️⃣  Seeding ingestion stats ledger...")
+        migrate_ingestion_stats(conn)
+
+        logger.info("\n5️⃣  Preparing liquidation_heatmap diff refresh...")
+        migrate_liquidation_heatmap_diff(conn)
+
+        logger.info("\n6️⃣  Preparing fear_greed_index dedupe...")
+        migrate_fear_greed_dedupe(conn)
+
         logger.info("\n" + "=" * 60)
         logger.info("✅ All migrations completed successfully!")
         logger.info("=" * 60)
@@ -0,0 +1,44 @@
+import os
+import sys
+from pathlib import Path
+
+# app.core.config reads these at import time; the tests never reach MySQL or Coinglass.
+os.environ.setdefault("DB_PORT", "3306")
+os.environ.setdefault("COINGLASS_API_KEY", "test")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+from app.repositories.coinglass_repository import CoinglassRepository  # noqa: E402
+
+from tests.fakes import FakeConnection, FakeCursor  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_repository_caches(monkeypatch):
+    """Forget the per-process schema/ledger probes CoinglassRepository caches on the class."""
+    monkeypatch.setattr(CoinglassRepository, "_ledger_seeded", set())
+    monkeypatch.setattr(CoinglassRepository, "_ledger_disabled", False)
+    monkeypatch.setattr(CoinglassRepository, "_snapshot_disabled", False)
+    monkeypatch.setattr(CoinglassRepository, "_heatmap_diff_ready", None)
+    monkeypatch.setattr(CoinglassRepository, "_fear_greed_dedupe_ready", None)
+
+
+@pytest.fixture
+def make_repo():
+    """
+    Factory for a CoinglassRepository on a FakeConnection; returns (repo, cursor).
+
+        repo, cur = make_repo({TABLE: FakeTable(KEYS, rows)})   # FakeCursor over these tables
+        repo, cur = make_repo(results={"SELECT 1": [...]})      # canned answers (FakeCursor.results)
+        repo, cur = make_repo(cursor=FearGreedCursor())         # any other fake cursor
+
+    The connection is repo.conn (commit / rollback counters).
+    """
+    def _make(tables=None, results=None, cursor=None):
+        cur = cursor if cursor is not None else FakeCursor(tables)
+        cur.results.update(results or {})
+        return CoinglassRepository(FakeConnection(cur)), cur
+
+    return _make
@@ -0,0 +1,205 @@
+"""In-memory stand-ins for the pymysql connection / DictCursor the repository uses."""
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import pymysql
+
+from app.repositories.coinglass_repository import CoinglassRepository
+
+
+def fold(value: Any) -> Any:
+    """Compare values like the tables do: case-insensitive strings, numeric numbers."""
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return Decimal(str(value)).normalize()
+    return value
+
+
+class FakeTable:
+    """Rows of one table, unique on `key_columns`."""
+
+    def __init__(self, key_columns: List[str], rows: Optional[List[Dict[str, Any]]] = None):
+        self.key_columns = list(key_columns)
+        self.rows: Dict[tuple, Dict[str, Any]] = {}
+        for row in rows or []:
+            self.rows[self.key(row)] = dict(row)
+
+    def key(self, row: Dict[str, Any]) -> tuple:
+        return tuple(fold(row[col]) for col in self.key_columns)
+
+
+class FakeCursor:
+    """
+    Understands the statements _bulk_upsert and _existing_keys send:
+    row-constructor IN probes and multi-row INSERT [... ON DUPLICATE KEY UPDATE].
+    Anything else is recorded and answered with `results` (or nothing).
+    `errors` maps a SQL fragment to the exception its statement raises.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, FakeTable]] = None):
+        self.tables = tables or {}
+        self.statements: List[str] = []
+        self.params: List[List[Any]] = []
+        self.results: Dict[str, List[Dict[str, Any]]] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.lastrowid = None
+        self._rows: List[Dict[str, Any]] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def statements_like(self, fragment: str) -> List[str]:
+        return [sql for sql in self.statements if fragment in sql]
+
+    def params_like(self, fragment: str) -> List[List[Any]]:
+        return [params for sql, params in zip(self.statements, self.params) if fragment in sql]
+
+    def execute(self, sql: str, params=None) -> int:
+        sql = " ".join(sql.split())
+        params = list(params or [])
+        self.statements.append(sql)
+        self.params.append(params)
+        self._rows = []
+        for fragment, error in self.errors.items():
+            if fragment in sql:
+                raise error
+
+        probe = re.match(r"SELECT (.+?) FROM (\w+) WHERE \(.+?\) IN", sql)
+        insert = re.match(r"INSERT INTO (\w+) \((.+?)\) VALUES", sql)
+        if probe and probe.group(2) in self.tables:
+            return self._probe(self.tables[probe.group(2)], self._columns(probe.group(1)), params)
+        if insert and insert.group(1) in self.tables:
+            return self._insert(
+                self.tables[insert.group(1)], self._columns(insert.group(2)), params, "ON DUPLICATE KEY UPDATE" in sql
+            )
+        for fragment, rows in self.results.items():
+            if fragment in sql:
+                self._rows = [dict(row) for row in rows]
+        return len(self._rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    @staticmethod
+    def _columns(sql: str) -> List[str]:
+        return [col.strip(" `") for col in sql.split(",")]
+
+    def _probe(self, table: FakeTable, columns: List[str], params: List[Any]) -> int:
+        width = len(columns)
+        for start in range(0, len(params), width):
+            key = tuple(fold(value) for value in params[start:start + width])
+            if key in table.rows:
+                row = table.rows[key]
+                self._rows.append({col: row[col] for col in columns})
+        return len(self._rows)
+
+    def _insert(self, table: FakeTable, columns: List[str], params: List[Any], upsert: bool) -> int:
+        affected = 0
+        width = len(columns)
+        for start in range(0, len(params), width):
+            row = dict(zip(columns, params[start:start + width]))
+            key = table.key(row)
+            if key not in table.rows:
+                table.rows[key] = row
+                affected += 1
+            elif upsert:
+                # Every upsert also sets updated_at, so the row always changes
+                table.rows[key].update({col: value for col, value in row.items() if col not in table.key_columns})
+                affected += 2
+            else:
+                raise pymysql.err.IntegrityError(1062, f"Duplicate entry for key {key}")
+        return affected
+
+
+class FearGreedCursor(FakeCursor):
+    """cg_fear_greed_index parents and their data_list children, in memory."""
+
+    def __init__(self, migrated: bool = True):
+        super().__init__()
+        self.migrated = migrated
+        self.parents: Dict[int, Dict[str, Any]] = {}
+        self.children: Dict[int, Dict[int, Any]] = {}
+        self.deletes: List[tuple] = []
+
+    def add_snapshot(self, values, marked=False):
+        parent_id = max(self.parents, default=0) + 1
+        self.parents[parent_id] = {"content_hash": None, "value_count": None}
+        self.children[parent_id] = {order: value for order, value in enumerate(values) if value is not None}
+        if marked:
+            self.parents[parent_id].update(
+                content_hash=CoinglassRepository._fingerprint(list(values)), value_count=len(values)
+            )
+        return parent_id
+
+    def values(self, parent_id):
+        return [self.children[parent_id].get(i) for i in range(self.parents[parent_id]["value_count"])]
+
+    def execute(self, sql: str, args=None) -> int:
+        sql = " ".join(sql.split())
+        args = list(args or [])
+        self.statements.append(sql)
+        self.params.append(args)
+        self._rows = []
+        affected = 0
+        if sql.startswith("SHOW COLUMNS"):
+            self._rows = [{"Field": "value_count"}] if self.migrated else []
+        elif sql.startswith("SELECT id, content_hash"):
+            if self.parents:
+                latest = max(self.parents)
+                self._rows = [dict(self.parents[latest], id=latest)]
+        elif sql.startswith("SELECT id FROM cg_fear_greed_index"):
+            self._rows = [{"id": parent_id} for parent_id in sorted(self.parents)]
+        elif sql.startswith("SELECT sequence_order"):
+            children = self.children[args[0]]
+            self._rows = [{"sequence_order": order, "index_value": children[order]} for order in sorted(children)]
+        elif sql.startswith("INSERT INTO cg_fear_greed_index "):
+            columns = [col.strip("` ") for col in re.search(r"\((.*?)\)", sql).group(1).split(",")]
+            parent_id = max(self.parents, default=0) + 1
+            self.parents[parent_id] = {"content_hash": None, "value_count": None, **dict(zip(columns, args))}
+            self.children[parent_id] = {}
+            self.lastrowid = parent_id
+            affected = 1
+        elif sql.startswith("INSERT INTO cg_fear_greed_index_data_list"):
+            for i in range(0, len(args), 3):
+                parent_id, value, order = args[i:i + 3]
+                assert order not in self.children[parent_id], "child row written twice"
+                self.children[parent_id][order] = value
+                affected += 1
+        elif sql.startswith("DELETE FROM cg_fear_greed_index_data_list"):
+            parent_id, first = args
+            self.deletes.append((parent_id, first))
+            self.children[parent_id] = {o: v for o, v in self.children[parent_id].items() if o < first}
+        elif sql.startswith("DELETE FROM cg_fear_greed_index WHERE id IN"):
+            for parent_id in args:
+                del self.parents[parent_id], self.children[parent_id]
+        elif sql.startswith("UPDATE cg_fear_greed_index SET fetch_timestamp"):
+            self.parents[args[3]].update(fetch_timestamp=args[0], content_hash=args[1], value_count=args[2])
+        elif sql.startswith("UPDATE cg_fear_greed_index SET content_hash"):
+            self.parents[args[2]].update(content_hash=args[0], value_count=args[1])
+        elif not sql.startswith("UPDATE cg_fear_greed_index SET updated_at"):
+            raise AssertionError(f"unexpected statement: {sql}")
+        return affected
+
+
+class FakeConnection:
+    def __init__(self, cursor: FakeCursor):
+        self._cursor = cursor
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
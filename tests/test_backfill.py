@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from app.services import backfill
+from app.services.backfill import BackfillEngine, time_windows
+
+DAY = 24 * 60 * 60
+START = 1_700_000_000
+END = START + 10 * DAY
+
+
+class FakeConn:
+    def close(self):
+        pass
+
+
+class FakeService:
+    """One pipeline whose rows per call come from `rows(params)`."""
+
+    def __init__(self, rows, params=None):
+        self.client = object()
+        self.calls = []
+        self._lock = threading.Lock()
+        self._rows = rows
+        self.pipelines = {
+            "funding_rate": {
+                "func": self._run,
+                "params": params or {"exchanges": ["Binance", "OKX"], "timeframes": ["1h", "5m"], "symbols": "BTC"},
+            }
+        }
+
+    def _run(self, conn, client, params):
+        with self._lock:
+            self.calls.append(params)
+        return self._rows(params)
+
+
+@pytest.fixture(autouse=True)
+def fake_connection(monkeypatch):
+    monkeypatch.setattr(backfill, "get_connection", FakeConn)
+
+
+def make_engine(service, prune_after=2):
+    engine = BackfillEngine(service, workers=2, window_days=2)
+    engine.prune_after = prune_after
+    engine.progress_seconds = 3600
+    return engine
+
+
+def test_time_windows_cover_the_range_in_ms():
+    assert time_windows(START, START + 5 * DAY, 2) == [
+        {"start_time": START * 1000, "end_time": (START + 2 * DAY) * 1000},
+        {"start_time": (START + 2 * DAY) * 1000, "end_time": (START + 4 * DAY) * 1000},
+        {"start_time": (START + 4 * DAY) * 1000, "end_time": (START + 5 * DAY) * 1000},
+    ]
+
+
+def test_plan_builds_one_newest_first_chain_per_series():
+    engine = make_engine(FakeService(lambda params: {}))
+
+    chains = engine.plan(["funding_rate"], START, END)
+
+    # sub-hour timeframes are not backfilled; scalar params are not series axes
+    assert [chain[0].series for chain in chains] == [
+        (("exchanges", "Binance"), ("timeframes", "1h")),
+        (("exchanges", "OKX"), ("timeframes", "1h")),
+    ]
+    assert all(len(chain) == 5 for chain in chains)
+    assert chains[0][0].window["end_time"] == END * 1000
+    assert chains[0][-1].window["start_time"] == START * 1000
+
+
+def test_series_is_pruned_after_consecutive_empty_windows():
+    # Binance has data only in the newest window; OKX has data everywhere
+    newest = (END - 2 * DAY) * 1000
+
+    def rows(params):
+        if params["exchanges"] == ["OKX"] or params["start_time"] == newest:
+            return {"funding_rate": 3, "funding_rate_duplicates": 1, "fetches": 1}
+        return {"funding_rate": 0, "funding_rate_duplicates": 0, "fetches": 1}
+
+    service = FakeService(rows)
+
+    result = make_engine(service).run(["funding_rate"], START, END)
+
+    binance = [c for c in service.calls if c["exchanges"] == ["Binance"]]
+    assert len(binance) == 3
+    assert result == {"funding_rate": {"records": 18, "batches": 8, "errors": 0, "pruned": 2}}
+    assert all(call["snapshots"] is False for call in service.calls)
+
+
+def test_windows_with_fetch_errors_do_not_count_as_empty():
+    service = FakeService(lambda params: {"funding_rate": 0, "errors": 1})
+
+    result = make_engine(service).run(["funding_rate"], START, END)
+
+    assert result["funding_rate"]["pruned"] == 0
+    assert result["funding_rate"]["errors"] == 10
+    assert len(service.calls) == 10
+
+
+def test_pruning_can_be_disabled():
+    service = FakeService(lambda params: {"funding_rate": 0})
+
+    result = make_engine(service, prune_after=0).run(["funding_rate"], START, END)
+
+    assert result["funding_rate"]["pruned"] == 0
+    assert len(service.calls) == 10
+
+
+def test_failed_item_is_counted_and_its_chain_continues():
+    def rows(params):
+        if params["exchanges"] == ["OKX"]:
+            raise RuntimeError("boom")
+        return {"funding_rate": 1}
+
+    service = FakeService(rows)
+
+    result = make_engine(service).run(["funding_rate"], START, END)
+
+    assert result["funding_rate"] == {"records": 5, "batches": 5, "errors": 5, "pruned": 0}
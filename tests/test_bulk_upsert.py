@@ -0,0 +1,70 @@
+from tests.fakes import FakeTable
+
+TABLE = "test_history"
+COLUMNS = ["exchange", "symbol", "time", "value"]
+KEYS = ["exchange", "symbol", "time"]
+
+
+def upsert(repo, cur, rows, key_columns=KEYS, update_columns=("value",), chunk_size=None):
+    return repo._bulk_upsert(
+        cur, TABLE, COLUMNS, rows, key_columns=key_columns,
+        update_columns=list(update_columns) if update_columns else None, chunk_size=chunk_size,
+    )
+
+
+def test_new_rows_count_as_inserted(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)})
+
+    assert upsert(repo, cur, [("Binance", "BTC", t, 1.0) for t in (1, 2, 3)]) == (3, 0, 0)
+    assert len(cur.tables[TABLE].rows) == 3
+
+
+def test_stored_keys_count_as_updated(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "time": 1, "value": 1.0}])})
+
+    result = upsert(repo, cur, [("Binance", "BTC", 1, 2.0), ("Binance", "BTC", 2, 3.0)])
+
+    assert result == (1, 1, 0)
+    assert cur.tables[TABLE].rows[("binance", "btc", 1)]["value"] == 2.0
+
+
+def test_repeated_keys_in_batch_are_collapsed_last_wins(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)})
+
+    result = upsert(repo, cur, [("OKX", "ETH", 1, 1.0), ("OKX", "ETH", 2, 1.0), ("OKX", "ETH", 1, 9.0)])
+
+    assert result == (2, 0, 1)
+    assert cur.tables[TABLE].rows[("okx", "eth", 1)]["value"] == 9.0
+
+
+def test_rows_are_written_in_chunks(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "time": 4, "value": 0}])})
+
+    result = upsert(repo, cur, [("Binance", "BTC", t, 1.0) for t in range(5)], chunk_size=2)
+
+    assert result == (4, 1, 0)
+    assert len(cur.statements_like("INSERT INTO test_history")) == 3
+    assert len(cur.statements_like("SELECT `exchange`, `symbol`, `time` FROM test_history")) == 3
+
+
+def test_without_key_columns_counts_come_from_affected_rows(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "time": 1, "value": 1.0}])})
+
+    result = upsert(repo, cur, [("Binance", "BTC", 1, 2.0), ("Binance", "BTC", 2, 2.0)], key_columns=None)
+
+    assert result == (1, 1, 0)
+    assert not cur.statements_like("SELECT")
+
+
+def test_without_update_columns_sends_plain_insert(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)})
+
+    assert upsert(repo, cur, [("Binance", "BTC", 1, 1.0)], key_columns=None, update_columns=None) == (1, 0, 0)
+    assert not cur.statements_like("ON DUPLICATE KEY UPDATE")
+
+
+def test_empty_batch_sends_nothing(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)})
+
+    assert upsert(repo, cur, []) == (0, 0, 0)
+    assert cur.statements == []
@@ -0,0 +1,152 @@
+import itertools
+
+import pymysql
+import pytest
+
+from app.database import connection
+from app.database.connection import ConnectionPool
+
+
+class FakeRawCursor:
+    def __init__(self, raw):
+        self.raw = raw
+
+    def execute(self, query, args=None):
+        if self.raw.fail_queries:
+            raise pymysql.err.OperationalError(2013, "Lost connection to MySQL server during query")
+        return 1
+
+    def close(self):
+        pass
+
+
+class FakeRaw:
+    def __init__(self, number):
+        self.number = number
+        self.open = True
+        self.alive = True
+        self.fail_queries = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeRawCursor(self)
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def commit(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    opened = []
+    numbers = itertools.count(1)
+
+    def fake_connect():
+        raw = FakeRaw(next(numbers))
+        opened.append(raw)
+        return raw
+
+    monkeypatch.setattr(connection, "_connect", fake_connect)
+    return opened
+
+
+def test_prewarm_opens_min_size_connections(opened):
+    pool = ConnectionPool(min_size=3, max_size=5)
+
+    pool.prewarm()
+    pool.prewarm()
+
+    assert len(opened) == 3
+    assert pool.stats() == {"in_use": 0, "idle": 3, "max_size": 5}
+
+
+def test_returned_connections_are_reused_and_rolled_back(opened):
+    pool = ConnectionPool(min_size=0, max_size=2)
+
+    conn = pool.acquire()
+    conn.close()
+    again = pool.acquire()
+
+    assert len(opened) == 1
+    assert opened[0].rollbacks == 1
+    assert pool.stats()["in_use"] == 1
+    again.close()
+
+
+def test_closed_pooled_connection_cannot_be_used(opened):
+    pool = ConnectionPool(min_size=0, max_size=1)
+    conn = pool.acquire()
+    conn.close()
+
+    with pytest.raises(pymysql.err.InterfaceError):
+        conn.cursor()
+
+
+def test_exhausted_pool_times_out(opened):
+    pool = ConnectionPool(min_size=0, max_size=1)
+    conn = pool.acquire()
+
+    with pytest.raises(pymysql.err.OperationalError):
+        pool.acquire(timeout=0.01)
+    conn.close()
+
+
+def test_stale_idle_connection_is_replaced_on_borrow(opened):
+    pool = ConnectionPool(min_size=1, max_size=2)
+    pool.prewarm()
+    opened[0].alive = False
+
+    conn = pool.acquire()
+
+    assert len(opened) == 2
+    assert not opened[0].open
+    conn.close()
+
+
+def test_connection_whose_query_failed_is_replaced(opened):
+    pool = ConnectionPool(min_size=1, max_size=2)
+    conn = pool.acquire()
+    opened[0].fail_queries = True
+
+    with pytest.raises(pymysql.err.OperationalError):
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+    conn.close()
+
+    assert not opened[0].open
+    assert len(opened) == 2
+    assert pool.stats() == {"in_use": 0, "idle": 1, "max_size": 2}
+
+
+def test_idle_connections_above_min_size_are_evicted(opened, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(connection.time, "time", lambda: clock[0])
+    pool = ConnectionPool(min_size=1, max_size=3, idle_timeout=60)
+    first, second = pool.acquire(), pool.acquire()
+    first.close()
+    second.close()
+
+    clock[0] += 61
+    conn = pool.acquire()
+
+    assert [raw.open for raw in opened] == [False, True]
+    assert pool.stats() == {"in_use": 1, "idle": 0, "max_size": 3}
+    conn.close()
+
+
+def test_thread_connection_is_pinned_until_released(opened):
+    pool = ConnectionPool(min_size=0, max_size=2)
+
+    assert pool.thread_connection() is pool.thread_connection()
+    pool.release_thread_connection()
+
+    assert pool.stats()["in_use"] == 0
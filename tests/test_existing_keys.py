@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from tests.fakes import FakeTable
+
+TABLE = "test_history"
+KEYS = ["exchange", "symbol", "range_percent"]
+
+
+def test_existing_keys_are_probed_in_chunks(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "range_percent": 1}])})
+    keys = [("Binance", "BTC", 1), ("Binance", "ETH", 1), ("OKX", "BTC", 1)]
+
+    existing = repo._existing_keys(cur, TABLE, KEYS, keys, chunk_size=2)
+
+    assert existing == {("binance", "btc", "1")}
+    assert len(cur.statements) == 2
+
+
+def test_existing_keys_match_case_insensitively(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "range_percent": 1}])})
+
+    result = repo.check_existing_records(
+        TABLE, [{"exchange": "binance", "symbol": "btc", "range_percent": 1}]
+    )
+
+    assert result == {"binance|btc|1": True}
+
+
+def test_numeric_keys_match_across_python_and_mysql_types(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "range_percent": Decimal("1.50")}])})
+
+    result = repo.check_existing_records(
+        TABLE,
+        [
+            {"exchange": "Binance", "symbol": "BTC", "range_percent": 1.5},
+            {"exchange": "Binance", "symbol": "BTC", "range_percent": 2},
+        ],
+    )
+
+    assert result == {"Binance|BTC|1.5": True, "Binance|BTC|2": False}
+
+
+def test_upsert_treats_case_variants_as_one_row(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [{"exchange": "Binance", "symbol": "BTC", "range_percent": 1}])})
+
+    result = repo._bulk_upsert(
+        cur, TABLE, KEYS + ["value"], [("binance", "btc", 1, 2.0), ("OKX", "BTC", 1, 1.0), ("okx", "btc", 1, 3.0)],
+        key_columns=KEYS, update_columns=["value"],
+    )
+
+    assert result == (1, 1, 1)
+
+
+def test_failed_probe_reports_every_record_as_new(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS, [])})
+    cur.errors["SELECT"] = RuntimeError("server gone")
+
+    assert repo.check_existing_records(TABLE, [{"exchange": "Binance", "symbol": "BTC", "range_percent": 1}]) == {
+        "Binance|BTC|1": False
+    }
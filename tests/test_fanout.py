@@ -0,0 +1,74 @@
+from app.providers.coinglass.fanout import WriteStage, fan_out
+
+
+def test_process_hands_waiting_items_to_one_consume_call():
+    flushed = []
+    stage = WriteStage(flushed.append, maxsize=10, max_batch=3)
+    for item in range(5):
+        stage.put(item)
+
+    assert stage.process(timeout=0) == 3
+    assert stage.process(timeout=0) == 2
+    assert stage.process(timeout=0) == 0
+    assert flushed == [[0, 1, 2], [3, 4]]
+    assert stage.stats()["flushes"] == 2
+
+
+def test_consume_error_is_reported_with_the_whole_flush():
+    failed = []
+
+    def consume(items):
+        raise RuntimeError("down")
+
+    stage = WriteStage(consume, maxsize=5, on_error=lambda items, e: failed.append((items, str(e))))
+    stage.put("a")
+    stage.put("b")
+    stage.process(timeout=0)
+
+    assert failed == [(["a", "b"], "down")]
+    assert stage.stats()["errors"] == 1
+
+
+def run_fan_out(tasks, max_workers):
+    flushes, recorded, errors = [], {}, {}
+
+    def fetch(task):
+        if task == "bad":
+            raise RuntimeError("fetch failed")
+        return [] if task == "empty" else [task]
+
+    def build(task, rows):
+        return f"batch-{task}" if rows else None
+
+    def flush(batches):
+        flushes.append(list(batches))
+        return [{"saved": batch} for batch in batches]
+
+    fan_out(
+        tasks, fetch, build,
+        record=lambda task, rows, saved: recorded.__setitem__(task, saved),
+        flush=flush,
+        on_error=lambda task, e: errors.__setitem__(task, str(e)),
+        max_workers=max_workers,
+    )
+    return flushes, recorded, errors
+
+
+def test_every_task_is_recorded_with_its_own_result():
+    tasks = ["a", "b", "empty", "bad", "c"]
+
+    flushes, recorded, errors = run_fan_out(tasks, max_workers=3)
+
+    assert recorded == {
+        "a": {"saved": "batch-a"}, "b": {"saved": "batch-b"}, "c": {"saved": "batch-c"}, "empty": None,
+    }
+    assert errors == {"bad": "fetch failed"}
+    assert sorted(batch for flush in flushes for batch in flush) == ["batch-a", "batch-b", "batch-c"]
+
+
+def test_serial_path_flushes_one_task_at_a_time():
+    flushes, recorded, errors = run_fan_out(["a", "empty", "bad", "b"], max_workers=1)
+
+    assert flushes == [["batch-a"], ["batch-b"]]
+    assert recorded == {"a": {"saved": "batch-a"}, "empty": None, "b": {"saved": "batch-b"}}
+    assert errors == {"bad": "fetch failed"}
@@ -0,0 +1,92 @@
+from tests.fakes import FearGreedCursor
+
+
+def upsert(repo, values):
+    return repo.upsert_fear_greed_index({"data_list": values})
+
+
+def counts(inserted=0, duplicates=0, written=0, unchanged=0):
+    return {
+        "fear_greed_index": inserted,
+        "fear_greed_index_duplicates": duplicates,
+        "fear_greed_index_data_list": written,
+        "fear_greed_index_data_list_duplicates": unchanged,
+    }
+
+
+def test_first_snapshot_is_inserted_with_its_fingerprint(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+
+    assert upsert(repo, [10, 20.4, 30]) == counts(inserted=1, written=3)
+    assert cur.parents[1]["value_count"] == 3
+    assert cur.values(1) == [10, 20, 30]
+
+
+def test_unchanged_snapshot_writes_no_children(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+    upsert(repo, [10, 20, 30])
+
+    # 30.2 rounds to the stored INT
+    assert upsert(repo, [10, 20, 30.2]) == counts(duplicates=1, unchanged=3)
+    assert list(cur.parents) == [1]
+    assert cur.deletes == []
+
+
+def test_new_day_appends_only_the_tail(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+    upsert(repo, [10, 20, 30])
+
+    assert upsert(repo, [10, 20, 30, 40]) == counts(duplicates=1, written=1, unchanged=3)
+    assert cur.deletes == []
+    assert cur.values(1) == [10, 20, 30, 40]
+
+
+def test_revised_value_rewrites_from_the_first_difference(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+    upsert(repo, [10, 20, 30, 40])
+
+    assert upsert(repo, [10, 25, 30, 40, 50]) == counts(duplicates=1, written=4, unchanged=1)
+    assert cur.deletes == [(1, 1)]
+    assert cur.values(1) == [10, 25, 30, 40, 50]
+
+
+def test_shorter_list_drops_the_stored_tail(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+    upsert(repo, [10, 20, 30])
+
+    assert upsert(repo, [10, 20]) == counts(duplicates=1, unchanged=2)
+    assert cur.deletes == [(1, 2)]
+    assert cur.values(1) == [10, 20]
+
+
+def test_gaps_are_compared_by_position(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+    upsert(repo, [10, None, 30, None])
+
+    assert upsert(repo, [10, None, 30, 35]) == counts(duplicates=1, written=1, unchanged=2)
+    assert cur.deletes == [(1, 3)]
+    assert cur.values(1) == [10, None, 30, 35]
+
+
+def test_unmigrated_schema_appends_full_snapshots(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor(migrated=False))
+    upsert(repo, [10, 20])
+
+    assert upsert(repo, [10, 20]) == counts(inserted=1, written=2)
+    assert list(cur.parents) == [1, 2]
+    assert cur.parents[2]["value_count"] is None
+
+
+def test_compaction_removes_snapshots_contained_in_their_successor(make_repo):
+    repo, cur = make_repo(cursor=FearGreedCursor())
+    for values in ([1, 2], [1, 2], [1, 2, 3], [5, 2, 3], [5, 2, 3]):
+        cur.add_snapshot(values)
+
+    result = repo.compact_fear_greed_index(chunk_size=1)
+
+    assert result == {"snapshots": 5, "removed": 3, "kept": 2, "data_list_removed": 7}
+    assert sorted(cur.parents) == [3, 5]
+    assert cur.values(5) == [5, 2, 3]
+
+    # The writer continues from the compacted latest snapshot
+    assert upsert(repo, [5, 2, 3]) == counts(duplicates=1, unchanged=3)
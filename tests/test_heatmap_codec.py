@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from app.core.heatmap_codec import (
+    LEVERAGE_COLUMNS,
+    decode_heatmap,
+    encode_heatmap,
+    pack_columns,
+    unpack_columns,
+)
+
+CHILD_ROWS = {
+    "y_axis": [(0, 100.5), (1, 101.25), (2, 102.0)],
+    "liquidation_leverage_data": [(0, 0, 0, 1234.12345678), (1, 1, 2, 5.0), (2, 1, 1, None), (3, None, 0, 7.5)],
+    "price_candlesticks": [(0, 1700000000000, 1.0, 2.0, 0.5, 1.5, 10.0), (1, 1700003600000, 1.5, 3.0, 1.0, 2.5, None)],
+}
+
+
+def decode(counts, blobs):
+    return decode_heatmap("BTC", "3d", 1700007200000, counts, blobs)
+
+
+def test_round_trip_restores_every_column():
+    matrix = decode(*encode_heatmap(CHILD_ROWS))
+
+    assert (matrix.symbol, matrix.range, matrix.fetch_time) == ("BTC", "3d", 1700007200000)
+    assert list(matrix.y_axis) == [100.5, 101.25, 102.0]
+    assert list(matrix.x_position) == [0, 1, 1, -1]
+    assert list(matrix.y_position) == [0, 2, 1, 0]
+    assert list(matrix.liquidation_amount)[:2] == [1234.12345678, 5.0]
+    assert list(matrix.candles["timestamp"]) == [1700000000000, 1700003600000]
+    assert list(matrix.candles["close_price"]) == [1.5, 2.5]
+
+
+def test_nulls_come_back_as_nan_and_minus_one():
+    matrix = decode(*encode_heatmap(CHILD_ROWS))
+
+    assert math.isnan(matrix.liquidation_amount[2])
+    assert matrix.x_position[3] == -1
+    assert math.isnan(matrix.candles["volume"][1])
+
+
+def test_dense_matrix_skips_nulls_and_missing_cells():
+    matrix = decode(*encode_heatmap(CHILD_ROWS))
+
+    assert matrix.shape == (3, 2)
+    assert matrix.dense() == [[1234.12345678, 0.0], [0.0, 0.0], [0.0, 5.0]]
+
+
+def test_empty_heatmap_round_trips():
+    counts, blobs = encode_heatmap({})
+    matrix = decode(counts, blobs)
+
+    assert counts == (0, 0, 0)
+    assert matrix.shape == (0, 0)
+    assert matrix.dense() == []
+
+
+def test_columns_are_typed_views():
+    columns = unpack_columns(pack_columns(CHILD_ROWS["liquidation_leverage_data"], LEVERAGE_COLUMNS), 4, LEVERAGE_COLUMNS)
+
+    assert {name: view.format for name, view in columns.items()} == {
+        "liquidation_amount": "d",
+        "x_position": "i",
+        "y_position": "i",
+    }
+
+
+def test_count_mismatch_is_rejected():
+    blob = pack_columns(CHILD_ROWS["liquidation_leverage_data"], LEVERAGE_COLUMNS)
+
+    with pytest.raises(ValueError):
+        unpack_columns(blob, 3, LEVERAGE_COLUMNS)
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from app.core.config import settings
+from app.repositories.coinglass_repository import CoinglassRepository
+
+TABLE = "cg_liquidation_heatmap_leverage_data"
+COLUMNS = ["x_position", "y_position", "liquidation_amount"]
+
+
+def stored(rows):
+    """FakeCursor.results answering the stored child rows read-back."""
+    return {"SELECT sequence_order": [dict(zip(["sequence_order", *COLUMNS], row)) for row in rows]}
+
+
+def test_child_rows_are_parsed_and_rounded(make_repo):
+    rows = CoinglassRepository._heatmap_child_rows({
+        "y_axis": ["100.5", 101],
+        "liquidation_leverage_data": [[0, 1, 1234.123456789], [1, None, None], [2, 3]],
+        "price_candlesticks": [[1700000000, "1", "2", "0.5", "1.5", "10"]],
+    })
+
+    assert rows["y_axis"] == [(0, 100.5), (1, 101.0)]
+    assert rows["liquidation_leverage_data"] == [(0, 0, 1, 1234.12345679), (1, 1, None, None)]
+    assert rows["price_candlesticks"] == [(0, 1700000000, 1.0, 2.0, 0.5, 1.5, 10.0)]
+
+
+def test_unchanged_set_writes_nothing(make_repo):
+    # DECIMAL(.., 8) columns come back as Decimal
+    repo, cur = make_repo(results=stored([(0, 0, 1, Decimal("1234.12345679")), (1, 0, 2, Decimal("5.00000000"))]))
+
+    written = repo._sync_heatmap_children(cur, TABLE, COLUMNS, 7, [(0, 0, 1, 1234.12345679), (1, 0, 2, 5.0)])
+
+    assert written == 0
+    assert cur.statements_like("INSERT") == []
+    assert cur.statements_like("DELETE") == []
+
+
+def test_only_changed_and_new_rows_are_upserted(make_repo):
+    repo, cur = make_repo(results=stored([(0, 0, 1, Decimal("1")), (1, 0, 2, Decimal("2"))]))
+
+    written = repo._sync_heatmap_children(
+        cur, TABLE, COLUMNS, 7, [(0, 0, 1, 1.0), (1, 0, 2, 2.5), (2, 0, 3, 3.0)]
+    )
+
+    assert written == 2
+    assert cur.params_like("INSERT INTO") == [[7, 1, 0, 2, 2.5, 7, 2, 0, 3, 3.0]]
+    assert "ON DUPLICATE KEY UPDATE" in cur.statements_like("INSERT INTO")[0]
+    assert cur.statements_like("DELETE") == []
+
+
+def test_rows_past_the_new_set_are_deleted(make_repo):
+    repo, cur = make_repo(results=stored([(0, 0, 1, Decimal("1")), (1, 0, 2, Decimal("2")), (2, 0, 3, Decimal("3"))]))
+
+    written = repo._sync_heatmap_children(cur, TABLE, COLUMNS, 7, [(0, 0, 1, 1.0)])
+
+    assert written == 2
+    assert cur.statements_like("INSERT") == []
+    assert cur.params_like("DELETE FROM") == [[7, 1, 2]]
+
+
+def test_changed_rows_are_written_in_chunks(make_repo, monkeypatch):
+    monkeypatch.setattr(settings, "DB_BULK_CHUNK_SIZE", 2)
+    repo, cur = make_repo(results=stored([]))
+
+    written = repo._sync_heatmap_children(cur, TABLE, COLUMNS, 7, [(i, 0, i, float(i)) for i in range(5)])
+
+    assert written == 5
+    assert [len(params) // 5 for params in cur.params_like("INSERT INTO")] == [2, 2, 1]
@@ -0,0 +1,80 @@
+import pymysql
+import pytest
+
+from app.repositories.coinglass_repository import CoinglassRepository
+
+from tests.fakes import FakeTable
+
+TABLE = "cg_futures_basis_history"
+COLUMNS = ["exchange", "pair", "interval", "time", "open_basis"]
+KEYS = ["exchange", "pair", "interval", "time"]
+# Ledger rows exist for the table (seeded by migrate_tables.py)
+SEEDED = {"SELECT 1 FROM cg_ingestion_stats": [{"1": 1}]}
+
+
+def upsert(repo, cur, rows):
+    return repo._bulk_upsert(cur, TABLE, COLUMNS, rows, key_columns=KEYS, update_columns=["open_basis"])
+
+
+def test_seeded_table_tallies_new_rows_per_series(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)}, SEEDED)
+
+    upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 2000, 0.1), ("Binance", "BTCUSDT", "1h", 1000, 0.2),
+                       ("OKX", "BTC-USDT", "1h", 3000, 0.3)])
+    upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 2000, 0.4)])
+
+    assert cur.params_like("INSERT INTO cg_ingestion_stats") == [
+        [TABLE, "Binance:BTCUSDT:1h", 2, 1000, 2000, TABLE, "OKX:BTC-USDT:1h", 1, 3000, 3000],
+        [TABLE, "Binance:BTCUSDT:1h", 0, 2000, 2000],
+    ]
+    assert cur.statements_like("SAVEPOINT ingestion_stats")
+    assert TABLE in CoinglassRepository._ledger_seeded
+
+
+def test_unseeded_table_is_not_tallied(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)})
+
+    assert upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 1000, 0.1)]) == (1, 0, 0)
+    assert not cur.statements_like("INSERT INTO cg_ingestion_stats")
+    assert TABLE not in CoinglassRepository._ledger_seeded
+
+
+def test_failed_ledger_write_rolls_back_to_the_savepoint(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)}, SEEDED)
+    cur.errors["INSERT INTO cg_ingestion_stats"] = pymysql.err.OperationalError(1205, "Lock wait timeout exceeded")
+
+    assert upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 1000, 0.1)]) == (1, 0, 0)
+    assert cur.statements_like("ROLLBACK TO SAVEPOINT ingestion_stats")
+    assert not CoinglassRepository._ledger_disabled
+
+
+@pytest.mark.parametrize("code", [1213, 2006, 2013])
+def test_errors_that_abort_the_transaction_reach_the_caller(make_repo, code):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)}, SEEDED)
+    cur.errors["INSERT INTO cg_ingestion_stats"] = pymysql.err.OperationalError(code, "aborted")
+
+    with pytest.raises(pymysql.err.OperationalError):
+        upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 1000, 0.1)])
+    assert not cur.statements_like("ROLLBACK TO SAVEPOINT")
+
+
+def test_missing_ledger_table_disables_the_ledger(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)}, SEEDED)
+    cur.errors["INSERT INTO cg_ingestion_stats"] = pymysql.err.ProgrammingError(1146, "Table doesn't exist")
+
+    upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 1000, 0.1)])
+    cur.statements.clear()
+    upsert(repo, cur, [("Binance", "BTCUSDT", "1h", 2000, 0.1)])
+
+    assert CoinglassRepository._ledger_disabled
+    assert not cur.statements_like("ingestion_stats")
+
+
+def test_seeding_an_empty_table_writes_a_marker_row(make_repo):
+    repo, cur = make_repo({TABLE: FakeTable(KEYS)})
+    cur.results["COALESCE(SUM(row_count > 0), 0) AS series"] = [{"series": 0}]
+
+    assert repo.rebuild_ingestion_stats([TABLE]) == {TABLE: 0}
+    assert cur.params_like("INSERT INTO cg_ingestion_stats") == [[TABLE, "", 0, None, None]]
+    assert "ON DUPLICATE KEY UPDATE" in cur.statements_like("INSERT INTO cg_ingestion_stats")[0]
+    assert TABLE in CoinglassRepository._ledger_seeded
@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+from app.core.parallel import in_flight, run_with_deadline
+
+
+@pytest.fixture
+def release():
+    """Event that hung tasks wait on; set at teardown so no thread outlives the test."""
+    event = threading.Event()
+    yield event
+    event.set()
+    deadline = time.time() + 5
+    while in_flight("test") and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def error(name, message):
+    return {"error": message}
+
+
+def hang(event):
+    return lambda: event.wait(10) and {"late": 1}
+
+
+def test_results_keep_task_order():
+    tasks = {"slow": lambda: time.sleep(0.05) or {"rows": 1}, "fast": lambda: {"rows": 2}}
+
+    results = run_with_deadline("test", tasks, 2, 5, on_error=error)
+
+    assert list(results) == ["slow", "fast"]
+    assert results == {"slow": {"rows": 1}, "fast": {"rows": 2}}
+    assert in_flight("test") == set()
+
+
+def test_task_exception_is_reported_through_on_error():
+    def boom():
+        raise RuntimeError("boom")
+
+    assert run_with_deadline("test", {"a": boom}, 2, 5, on_error=error) == {"a": {"error": "boom"}}
+
+
+def test_queued_tasks_behind_hung_workers_are_cancelled(release):
+    started = []
+    tasks = {
+        "hung": hang(release),
+        "queued": lambda: started.append("queued") or {"rows": 1},
+    }
+
+    began = time.time()
+    results = run_with_deadline("test", tasks, 1, 0.2, on_error=error)
+
+    assert time.time() - began < 3
+    assert results == {
+        "hung": {"error": "Timed out after 0.2s"},
+        "queued": {"error": "Not started before the deadline"},
+    }
+    assert started == []
+    assert in_flight("test") == {"hung"}
+
+
+def test_task_still_running_from_an_earlier_call_is_skipped(release):
+    run_with_deadline("test", {"hung": hang(release)}, 2, 0.2, on_error=error)
+
+    results = run_with_deadline(
+        "test",
+        {"hung": lambda: {"rows": 1}, "other": lambda: {"rows": 2}},
+        2,
+        0.2,
+        on_error=error,
+        on_skip=lambda name, message: {"skipped": message},
+    )
+
+    assert results == {"hung": {"skipped": "Still running from a previous run"}, "other": {"rows": 2}}
+
+    release.set()
+    deadline = time.time() + 5
+    while in_flight("test") and time.time() < deadline:
+        time.sleep(0.01)
+    assert run_with_deadline("test", {"hung": lambda: {"rows": 1}}, 2, 0.2, on_error=error) == {"hung": {"rows": 1}}
+
+
+def test_groups_do_not_block_each_other(release):
+    run_with_deadline("test", {"hung": hang(release)}, 1, 0.2, on_error=error)
+
+    assert run_with_deadline("other", {"hung": lambda: 1}, 1, 0.2, on_error=error) == {"hung": 1}
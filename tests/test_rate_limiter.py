@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core import rate_limiter
+from app.core.rate_limiter import TokenBucketRateLimiter, _parse_weights
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "time", clock.time)
+    return clock
+
+
+def make_limiter(tmp_path, **kwargs):
+    kwargs.setdefault("rate_per_minute", 60)
+    return TokenBucketRateLimiter(name="test", db_path=str(tmp_path / "limits.db"), **kwargs)
+
+
+def test_bucket_starts_full_and_drains(tmp_path, clock):
+    limiter = make_limiter(tmp_path, capacity=3)
+
+    assert [limiter.try_acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.try_acquire("a") == pytest.approx(1.0)
+
+
+def test_refill_follows_elapsed_time(tmp_path, clock):
+    limiter = make_limiter(tmp_path, capacity=2)
+    limiter.try_acquire()
+    limiter.try_acquire()
+
+    clock.now += 0.5
+    assert limiter.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert limiter.try_acquire() == 0.0
+
+
+def test_refill_never_exceeds_capacity(tmp_path, clock):
+    limiter = make_limiter(tmp_path, capacity=2)
+
+    clock.now += 3600
+    assert [limiter.try_acquire() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.try_acquire() > 0
+
+
+def test_weighted_endpoint_takes_more_tokens(tmp_path, clock):
+    limiter = make_limiter(tmp_path, capacity=5, weights={"api/heavy": 3})
+
+    assert limiter.weight("/api/heavy/") == 3
+    assert limiter.weight("api/light") == 1.0
+    assert limiter.try_acquire("/api/heavy") == 0.0
+    assert limiter.try_acquire("/api/heavy") == pytest.approx(1.0)
+    assert limiter.try_acquire("/api/light") == 0.0
+
+
+def test_weight_is_capped_at_capacity(tmp_path, clock):
+    limiter = make_limiter(tmp_path, capacity=2, weights={"huge": 10})
+
+    assert limiter.try_acquire("huge") == 0.0
+    assert limiter.try_acquire("huge") == pytest.approx(2.0)
+
+
+def test_limiters_on_same_file_share_one_budget(tmp_path, clock):
+    first = make_limiter(tmp_path, capacity=1)
+    second = make_limiter(tmp_path, capacity=1)
+
+    assert first.try_acquire() == 0.0
+    assert second.try_acquire() == pytest.approx(1.0)
+
+
+def test_acquire_async_sleeps_for_the_refill(tmp_path, clock, monkeypatch):
+    limiter = make_limiter(tmp_path, capacity=1)
+    limiter.try_acquire()
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+
+    waited = asyncio.run(limiter.acquire_async())
+
+    assert sleeps == [pytest.approx(1.0)]
+    assert waited == pytest.approx(1.0)
+
+
+def test_parse_weights_skips_invalid_items():
+    assert _parse_weights("/api/a=2, b=0.5,broken,c=x") == {"api/a": 2.0, "b": 0.5}
+    assert _parse_weights(None) == {}
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services import scheduler
+from app.services.scheduler import CadenceScheduler
+
+
+def utc(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+class FakeConn:
+    def ping(self, reconnect=True):
+        pass
+
+
+class FakeService:
+    def __init__(self, pipelines):
+        self.pipelines = {name: {"params": params} for name, params in pipelines.items()}
+        self.conn = FakeConn()
+        self.calls = []
+
+    def run_pipeline(self, name, custom_params=None):
+        self.calls.append((name, custom_params))
+        return {"ok": 1}
+
+
+def make_scheduler(pipelines=None, settle_seconds=0, default_seconds=300):
+    service = FakeService(pipelines or {"funding_rate": {"intervals": ["1h", "4h"]}, "etf_flows": {}})
+    return CadenceScheduler(service, settle_seconds=settle_seconds, default_seconds=default_seconds), service
+
+
+@pytest.mark.parametrize(
+    "interval, now, expected",
+    [
+        ("1m", utc(2024, 5, 15, 10, 7, 30), utc(2024, 5, 15, 10, 8)),
+        ("1h", utc(2024, 5, 15, 10, 7), utc(2024, 5, 15, 11)),
+        ("4h", utc(2024, 5, 15, 10, 7), utc(2024, 5, 15, 12)),
+        ("1d", utc(2024, 5, 15, 10, 7), utc(2024, 5, 16)),
+        # 2024-05-15 is a Wednesday; weekly candles open on Monday
+        ("1w", utc(2024, 5, 15, 10, 7), utc(2024, 5, 20)),
+        ("1w", utc(2024, 5, 20), utc(2024, 5, 27)),
+    ],
+)
+def test_next_due_lands_on_the_next_candle_open(interval, now, expected):
+    sched, _ = make_scheduler()
+
+    assert sched.next_due(interval, now) == expected
+
+
+def test_next_due_adds_settle_seconds():
+    sched, _ = make_scheduler(settle_seconds=15)
+
+    assert sched.next_due("1h", utc(2024, 5, 15, 10, 7)) == utc(2024, 5, 15, 11, 0, 15)
+
+
+def test_next_due_on_a_boundary_waits_for_the_following_candle():
+    sched, _ = make_scheduler()
+
+    assert sched.next_due("1h", utc(2024, 5, 15, 11)) == utc(2024, 5, 15, 12)
+
+
+def test_pipelines_without_intervals_use_the_default_cadence():
+    sched, _ = make_scheduler(default_seconds=300)
+    now = utc(2024, 5, 15, 10, 7)
+
+    assert sched.next_due(None, now) == now + 300
+    assert sched.next_due("7x", now) == now + 300
+
+
+def test_unknown_pipeline_is_rejected():
+    with pytest.raises(ValueError):
+        CadenceScheduler(FakeService({"funding_rate": {}}), pipelines=["nope"])
+
+
+def test_due_intervals_of_a_pipeline_run_as_one_call(monkeypatch):
+    sched, service = make_scheduler()
+    now = utc(2024, 5, 15, 12)
+    monkeypatch.setattr(scheduler.time, "time", lambda: now)
+    for pipeline, interval in sched.jobs():
+        sched._push(now, pipeline, interval)
+
+    sched.run_due(now)
+
+    assert service.calls == [("funding_rate", {"intervals": ["1h", "4h"]}), ("etf_flows", None)]
+    assert sorted((due, interval) for due, _, _, interval in sched._queue) == [
+        (now + 300, None),
+        (utc(2024, 5, 15, 13), "1h"),
+        (utc(2024, 5, 15, 16), "4h"),
+    ]
@@ -0,0 +1,69 @@
+import pytest
+
+from app.core.snapshot_delta import apply_delta, decode_payload, diff_snapshot, encode_payload, snapshot_hash
+
+BASE = {
+    "y_axis": [100.0, 101.0, 102.0],
+    "price_candlesticks": [[1, 1.0, 2.0], [2, 2.0, 3.0]],
+    "option_oi": [["Deribit", 10.5]],
+}
+
+
+@pytest.mark.parametrize(
+    "current",
+    [
+        BASE,
+        {**BASE, "y_axis": [100.0, 101.5, 102.0]},
+        {**BASE, "y_axis": [100.0, 101.0, 102.0, 103.0]},
+        {**BASE, "y_axis": [100.0]},
+        {**BASE, "price_candlesticks": [[1, 1.0, 2.0], [2, 2.0, 3.5], [3, 3.0, 4.0]]},
+        {"y_axis": BASE["y_axis"], "new_set": [1, None, 3]},
+        {},
+    ],
+)
+def test_delta_round_trips(current):
+    delta = diff_snapshot(BASE, current)
+
+    assert apply_delta(BASE, delta) == current
+    assert apply_delta(BASE, decode_payload(encode_payload(delta))) == current
+
+
+def test_delta_holds_only_changed_entries():
+    delta = diff_snapshot(BASE, {"y_axis": [100.0, 101.5, 102.0, 103.0], "option_oi": []})
+
+    assert delta == {
+        "sets": {
+            "y_axis": {"n": 4, "c": [[1, 101.5], [3, 103.0]]},
+            "option_oi": {"n": 0, "c": []},
+        },
+        "drop": ["price_candlesticks"],
+    }
+
+
+def test_unchanged_snapshot_gives_an_empty_delta():
+    assert diff_snapshot(BASE, dict(BASE)) == {"sets": {}, "drop": []}
+
+
+def test_apply_delta_leaves_the_previous_state_untouched():
+    previous = {"y_axis": [1.0, 2.0]}
+
+    apply_delta(previous, diff_snapshot(previous, {"y_axis": [1.0, 3.0]}))
+
+    assert previous == {"y_axis": [1.0, 2.0]}
+
+
+def test_chained_deltas_rebuild_every_version():
+    versions = [BASE, {**BASE, "y_axis": [99.0, 101.0, 102.0]}, {"y_axis": [99.0], "option_oi": [["OKX", 1.0]]}]
+    deltas = [diff_snapshot(before, after) for before, after in zip(versions, versions[1:])]
+
+    state = versions[0]
+    for delta, expected in zip(deltas, versions[1:]):
+        state = apply_delta(state, delta)
+        assert state == expected
+
+
+def test_snapshot_hash_ignores_set_order():
+    reordered = dict(reversed(list(BASE.items())))
+
+    assert snapshot_hash(reordered) == snapshot_hash(BASE)
+    assert snapshot_hash({**BASE, "y_axis": [100.0]}) != snapshot_hash(BASE)
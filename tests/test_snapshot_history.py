@@ -0,0 +1,55 @@
+import pymysql
+import pytest
+
+from app.core.config import settings
+from app.repositories.coinglass_repository import CoinglassRepository
+
+SETS = {"y_axis": [100.0, 101.0], "option_oi": [["Deribit", 10.5]]}
+
+
+@pytest.fixture(autouse=True)
+def enable_snapshots(monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_HISTORY_ENABLED", True)
+
+
+def record(repo, cur):
+    return repo._record_snapshot(cur, "liquidation_heatmap", "BTC:3d", SETS)
+
+
+def test_first_version_is_written_under_a_savepoint(make_repo):
+    repo, cur = make_repo()
+
+    assert record(repo, cur) == 1
+    assert cur.statements[0] == "SAVEPOINT snapshot_history"
+    assert cur.statements_like("INSERT INTO cg_snapshot_history")
+
+
+def test_failed_version_write_rolls_back_to_the_savepoint(make_repo):
+    repo, cur = make_repo()
+    cur.errors["INSERT INTO cg_snapshot_history"] = pymysql.err.OperationalError(1205, "Lock wait timeout exceeded")
+
+    assert record(repo, cur) == 0
+    assert cur.statements_like("ROLLBACK TO SAVEPOINT snapshot_history")
+    assert not CoinglassRepository._snapshot_disabled
+
+
+@pytest.mark.parametrize("code", [1213, 2006, 2013])
+def test_errors_that_abort_the_transaction_reach_the_caller(make_repo, code):
+    repo, cur = make_repo()
+    cur.errors["INSERT INTO cg_snapshot_history"] = pymysql.err.OperationalError(code, "aborted")
+
+    with pytest.raises(pymysql.err.OperationalError):
+        record(repo, cur)
+    assert not cur.statements_like("ROLLBACK TO SAVEPOINT")
+
+
+def test_missing_history_table_disables_snapshots(make_repo):
+    repo, cur = make_repo()
+    cur.errors["FROM cg_snapshot_history"] = pymysql.err.ProgrammingError(1146, "Table doesn't exist")
+
+    assert record(repo, cur) == 0
+    cur.statements.clear()
+    assert record(repo, cur) == 0
+
+    assert CoinglassRepository._snapshot_disabled
+    assert cur.statements == []
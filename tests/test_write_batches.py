@@ -0,0 +1,81 @@
+import pymysql
+
+from app.repositories.coinglass_repository import RowBatch, upsert_counts
+
+from tests.fakes import FakeTable
+
+TABLE = "test_history"
+OTHER = "other_history"
+COLUMNS = ["exchange", "symbol", "time", "value"]
+KEYS = ["exchange", "symbol", "time"]
+
+
+def tables(rows=None):
+    return {TABLE: FakeTable(KEYS, rows), OTHER: FakeTable(KEYS)}
+
+
+def batch(symbol, times, table=TABLE, value=1.0):
+    return RowBatch(
+        table, COLUMNS, [("Binance", symbol, t, value) for t in times],
+        key_columns=KEYS, update_columns=["value"], tally=upsert_counts("history"), label=f"history {symbol}",
+    )
+
+
+def test_same_table_batches_share_one_insert_and_commit(make_repo):
+    repo, cur = make_repo(tables([{"exchange": "Binance", "symbol": "ETH", "time": 1, "value": 0}]))
+
+    results = repo.write_batches([batch("BTC", [1, 2, 2]), batch("ETH", [1, 2])])
+
+    assert results == [
+        {"history": 2, "history_duplicates": 1},
+        {"history": 1, "history_duplicates": 1},
+    ]
+    assert len(cur.statements_like("INSERT INTO test_history")) == 1
+    assert repo.conn.commits == 1
+
+
+def test_key_repeated_across_batches_is_owned_by_the_last_one(make_repo):
+    repo, cur = make_repo(tables())
+
+    results = repo.write_batches([batch("BTC", [1, 2]), batch("BTC", [2, 3], value=2.0)])
+
+    assert results == [
+        {"history": 1, "history_duplicates": 1},
+        {"history": 2, "history_duplicates": 0},
+    ]
+    assert cur.tables[TABLE].rows[("binance", "btc", 2)]["value"] == 2.0
+
+
+def test_other_tables_are_written_separately_in_the_same_commit(make_repo):
+    repo, cur = make_repo(tables())
+
+    results = repo.write_batches([batch("BTC", [1]), batch("BTC", [1], table=OTHER), batch("ETH", [1])])
+
+    assert [r["history"] for r in results] == [1, 1, 1]
+    assert len(cur.statements_like("INSERT INTO test_history")) == 1
+    assert len(cur.statements_like("INSERT INTO other_history")) == 1
+    assert repo.conn.commits == 1
+
+
+def test_failed_combined_write_is_retried_batch_by_batch(make_repo):
+    repo, cur = make_repo(tables())
+    cur.errors["INSERT INTO other_history"] = pymysql.err.OperationalError(1205, "Lock wait timeout")
+
+    results = repo.write_batches([batch("BTC", [1, 2]), batch("BTC", [1], table=OTHER)])
+
+    # The fake keeps rows across rollback, so the retry sees the first attempt's rows as stored
+    assert results[0]["history"] + results[0]["history_duplicates"] == 2
+    assert results[1] == {"history": 0, "history_duplicates": 0}
+    assert len(cur.statements_like("INSERT INTO test_history")) == 2
+    assert repo.conn.rollbacks == 2
+    assert repo.conn.commits == 1
+
+
+def test_empty_batches_get_zero_counts_without_statements(make_repo):
+    repo, cur = make_repo(tables())
+    empty = batch("BTC", [])
+    empty.result = {"history_filtered": 3}
+
+    assert repo.write_batches([empty]) == [{"history": 0, "history_duplicates": 0, "history_filtered": 3}]
+    assert cur.statements == []
+    assert repo.conn.commits == 0